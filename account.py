@@ -31,7 +31,7 @@ class Account:
             name=d["name"],
             age=int(d["age"]),
             balance=float(d["balance"]),
-            account_type=d.get("type", "Savings"),
+            account_type=d.get("type") or d.get("account_type") or "Savings",  # data_handler.py wrote account_type
             status=d.get("status", "Active"),
             pin=int(d["pin"]) if d.get("pin") not in (None, "", "None") else None
         )
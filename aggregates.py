@@ -0,0 +1,170 @@
+# aggregates.py
+# Running book statistics kept up to date on every account change, so the dashboard
+# options (active count, average balance, youngest/oldest, top N by balance) are
+# O(1) or O(k) reads instead of full scans and sorts.
+import threading
+from bisect import bisect_left, insort
+from typing import Dict, List, Tuple
+
+class SortedKeyList:
+    # sorted list split into buckets of at most 2*load keys: add/remove cost
+    # O(log N + load) and the smallest k keys are read in O(k)
+    def __init__(self, load=1000):
+        self._load = load
+        self._lists: List[list] = []
+        self._maxes: list = []
+        self._len = 0
+
+    def __len__(self):
+        return self._len
+
+    def add(self, key):
+        if not self._maxes:
+            self._lists.append([key])
+            self._maxes.append(key)
+        else:
+            i = bisect_left(self._maxes, key)
+            if i == len(self._maxes):
+                i -= 1
+                self._lists[i].append(key)
+                self._maxes[i] = key
+            else:
+                insort(self._lists[i], key)
+            if len(self._lists[i]) > 2 * self._load:
+                bucket = self._lists[i]
+                self._lists[i:i + 1] = [bucket[:self._load], bucket[self._load:]]
+                self._maxes[i:i + 1] = [bucket[self._load - 1], bucket[-1]]
+        self._len += 1
+
+    def remove(self, key):
+        i = bisect_left(self._maxes, key)
+        if i == len(self._maxes):
+            raise ValueError(f"{key!r} not in list")
+        bucket = self._lists[i]
+        j = bisect_left(bucket, key)
+        if j == len(bucket) or bucket[j] != key:
+            raise ValueError(f"{key!r} not in list")
+        del bucket[j]
+        self._len -= 1
+        if not bucket:
+            del self._lists[i]
+            del self._maxes[i]
+        elif j == len(bucket):
+            self._maxes[i] = bucket[-1]
+
+    def update(self, keys):
+        # bulk load: one sort instead of one insort per key
+        keys = sorted(list(self._iter_all()) + list(keys))
+        self._lists = [keys[i:i + self._load] for i in range(0, len(keys), self._load)]
+        self._maxes = [bucket[-1] for bucket in self._lists]
+        self._len = len(keys)
+
+    def _iter_all(self):
+        for bucket in self._lists:
+            yield from bucket
+
+    def iter_from(self, key):
+        # keys >= key, in order
+        i = bisect_left(self._maxes, key)
+        if i == len(self._maxes):
+            return
+        bucket = self._lists[i]
+        yield from bucket[bisect_left(bucket, key):]
+        for bucket in self._lists[i + 1:]:
+            yield from bucket
+
+    def head(self, k):
+        out = []
+        for bucket in self._lists:
+            if len(out) >= k:
+                break
+            out.extend(bucket[:k - len(out)])
+        return out
+
+    def clear(self):
+        self._lists.clear()
+        self._maxes.clear()
+        self._len = 0
+
+class BookStats:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.clear()
+
+    def clear(self):
+        self.accounts = 0
+        self.active = 0
+        self.balance_cents = 0  # exact sum of balances in paise, so it never drifts
+        # account number -> (-balance, book position, is active); the first two form
+        # the leaderboard key, ordered like sorted(..., reverse=True) on balance
+        self._state: Dict[int, Tuple[float, int, bool]] = {}
+        self._leaderboard = SortedKeyList()
+        # age -> account number of the first account in book order with that age
+        # (ages never change and accounts are only ever added, so this never moves)
+        self._first_by_age: Dict[int, int] = {}
+        self._next_position = 0
+
+    @property
+    def closed(self):
+        return self.accounts - self.active
+
+    def load(self, accounts):
+        # same result as upserting each account in turn, but the leaderboard is built
+        # with one sort instead of one insort per account
+        with self._lock:
+            self.clear()
+            state = self._state
+            first_by_age = self._first_by_age
+            cents = 0
+            for acc in accounts:
+                number = acc.account_number
+                if number in state:
+                    continue
+                active = acc.status == "Active"
+                state[number] = (-acc.balance, len(state), active)
+                first_by_age.setdefault(acc.age, number)
+                self.active += active
+                cents += round(acc.balance * 100)
+            self.accounts = self._next_position = len(state)
+            self.balance_cents = cents
+            self._leaderboard.update((key_balance, position, number)
+                                     for number, (key_balance, position, _) in state.items())
+
+    def upsert(self, acc):
+        number = acc.account_number
+        key_balance = -acc.balance
+        active = acc.status == "Active"
+        with self._lock:
+            old = self._state.get(number)
+            if old is None:
+                position = self._next_position
+                self._next_position += 1
+                self.accounts += 1
+                self._first_by_age.setdefault(acc.age, number)
+                old_cents = 0
+            else:
+                old_balance, position, old_active = old
+                if old_balance == key_balance and old_active == active:
+                    return
+                self.active -= old_active
+                old_cents = round(-old_balance * 100)
+                self._leaderboard.remove((old_balance, position, number))
+            self.active += active
+            self.balance_cents += round(acc.balance * 100) - old_cents
+            self._state[number] = (key_balance, position, active)
+            self._leaderboard.add((key_balance, position, number))
+
+    def average_balance(self):
+        if not self.accounts:
+            return 0.0
+        return self.balance_cents / 100.0 / self.accounts
+
+    def youngest(self):
+        return self._first_by_age[min(self._first_by_age)] if self._first_by_age else None
+
+    def oldest(self):
+        return self._first_by_age[max(self._first_by_age)] if self._first_by_age else None
+
+    def top_n(self, n) -> List[int]:
+        with self._lock:
+            return [number for _, _, number in self._leaderboard.head(max(0, n))]
@@ -0,0 +1,133 @@
+# api.py
+# Maps JSON-style requests onto Bank methods. Shared by the network server and any
+# other non-interactive front-end: a request is a dict with "op" plus arguments, the
+# response is {"ok": True, "result": ...} or {"ok": False, "error": ..., "error_type": ...}.
+import json
+import math
+
+from account import Account
+import metrics
+
+def account_json(acc: Account):
+    # the PIN is never sent back to clients
+    if acc is None:
+        return None
+    return {
+        "account_number": acc.account_number,
+        "name": acc.name,
+        "age": acc.age,
+        "balance": round(acc.balance, 2),
+        "type": acc.account_type,
+        "status": acc.status
+    }
+
+def _accounts_json(accounts):
+    return [account_json(a) for a in accounts]
+
+def _reject_constant(name):
+    raise ValueError(f"{name} is not a valid number.")
+
+def loads(text):
+    # json.loads for request lines; NaN/Infinity are not JSON and never reach the bank
+    return json.loads(text, parse_constant=_reject_constant)
+
+def _int(req, key, default=None):
+    value = req.get(key, default)
+    if value is None:
+        raise ValueError(f"Missing field '{key}'.")
+    try:
+        return int(value)
+    except OverflowError:
+        raise ValueError(f"Field '{key}' must be a finite number.")
+
+def _float(req, key):
+    if req.get(key) is None:
+        raise ValueError(f"Missing field '{key}'.")
+    value = float(req[key])
+    # numbers too large for a float (1e999) parse as inf
+    if not math.isfinite(value):
+        raise ValueError(f"Field '{key}' must be a finite number.")
+    return value
+
+def _youngest_oldest(bank, req):
+    return {"youngest": account_json(bank.youngest_account_holder()),
+            "oldest": account_json(bank.oldest_account_holder())}
+
+def _transfer(bank, req):
+    fb, tb = bank.transfer_funds(_int(req, "from"), _int(req, "to"), _float(req, "amount"))
+    return {"from_balance": fb, "to_balance": tb}
+
+def _batch(bank, req):
+    ops = req.get("ops") or []
+    if not isinstance(ops, list):
+        raise TypeError("Field 'ops' must be a list of operations.")
+    return bank.apply_batch(ops, req.get("mode", "best_effort"))
+
+def _delete_all(bank, req):
+    if req.get("confirm") != "DELETE ALL":
+        raise PermissionError("Admin confirmation required to delete all accounts.")
+    return bank.delete_all_accounts(admin_confirm=True)
+
+OPERATIONS = {
+    "create_account": lambda bank, req: account_json(bank.create_account(
+        str(req.get("name", "")).strip(), _int(req, "age"), str(req.get("type", "")),
+        _float(req, "initial_deposit"), pin=_int(req, "pin") if req.get("pin") is not None else None)),
+    "deposit": lambda bank, req: bank.deposit(_int(req, "account"), _float(req, "amount")),
+    "withdraw": lambda bank, req: bank.withdraw(_int(req, "account"), _float(req, "amount")),
+    "balance": lambda bank, req: account_json(bank.balance_inquiry(_int(req, "account"))),
+    "close_account": lambda bank, req: account_json(bank.close_account(_int(req, "account"))),
+    "list_active": lambda bank, req: _accounts_json(bank.list_active_accounts()),
+    "transfer": _transfer,
+    "history": lambda bank, req: bank.transaction_history(
+        _int(req, "account"), _int(req, "offset", 0), req.get("limit"), req.get("start"), req.get("end")),
+    "set_pin": lambda bank, req: bank.set_pin(_int(req, "account"), _int(req, "pin")),
+    "import": lambda bank, req: bank.import_accounts_from_file(req.get("filename", "accounts_import.csv")),
+    "export": lambda bank, req: bank.export_accounts_to_file(
+        req.get("filename", "export_accounts.csv"), req.get("status"), req.get("type"), req.get("columns"),
+        req.get("compress")),
+    "rename": lambda bank, req: account_json(bank.rename_account_holder(
+        _int(req, "account"), str(req.get("name", "")).strip())),
+    "reopen_account": lambda bank, req: account_json(bank.reopen_account(_int(req, "account"))),
+    "count_active": lambda bank, req: bank.count_active_accounts(),
+    "delete_all": _delete_all,
+    "top_n": lambda bank, req: _accounts_json(bank.top_n_accounts_by_balance(_int(req, "n", 5))),
+    "average_balance": lambda bank, req: bank.average_balance(),
+    "youngest_oldest": _youngest_oldest,
+    "simple_interest": lambda bank, req: bank.simple_interest_calculator(
+        _int(req, "account"), _float(req, "rate"), _float(req, "years")),
+    "find_by_name": lambda bank, req: _accounts_json(bank.find_by_name(str(req.get("name", "")))),
+    "find_by_number": lambda bank, req: account_json(bank.find_by_account_number(_int(req, "account"))),
+    "list_closed": lambda bank, req: _accounts_json(bank.list_closed_accounts()),
+    "batch": _batch,
+    "snapshot": lambda bank, req: bank.snapshot(),
+    "reconcile": lambda bank, req: bank.reconcile(req.get("workers"), bool(req.get("repair", False)),
+                                                  req.get("report_file")),
+    "post_interest": lambda bank, req: bank.post_interest(
+        req.get("rates"), _float(req, "years") if req.get("years") is not None else 1 / 12, bool(req.get("compound", False)),
+        int(req.get("periods_per_year", 12)), bool(req.get("dry_run", False)), req.get("report_file")),
+    "metrics": lambda bank, req: (metrics.to_prometheus() if req.get("format") == "prometheus"
+                                  else metrics.registry.snapshot()),
+}
+
+# operations that touch files, scan the log or the whole book; front-ends may run these off the hot path
+SLOW_OPERATIONS = {"import", "export", "delete_all", "snapshot", "list_active", "list_closed", "batch",
+                   "post_interest", "reconcile", "history", "find_by_name"}
+
+def handle(bank, req):
+    response = {}
+    if isinstance(req, dict) and "id" in req:
+        response["id"] = req["id"]
+    try:
+        if not isinstance(req, dict):
+            raise ValueError("Request must be a JSON object.")
+        op = OPERATIONS.get(req.get("op"))
+        if op is None:
+            raise ValueError(f"Unknown operation: {req.get('op')!r}")
+        response["ok"] = True
+        response["result"] = op(bank, req)
+    except (ValueError, TypeError, LookupError, PermissionError, OSError) as e:
+        response["ok"] = False
+        response["error"] = str(e)
+        response["error_type"] = type(e).__name__
+        response.pop("result", None)
+    return response
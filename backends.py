@@ -0,0 +1,464 @@
+# backends.py
+# Where the book lives. Every backend can load and save the whole book; Bank keeps that
+# in memory and journals changes in between (CsvBackend, ShardedBackend). SqliteBackend
+# also has point access (point_access = True): Bank then reads and writes single accounts
+# through it, keeps only recently used ones in memory, and answers the dashboards and
+# name search with indexed queries.
+#
+#   Bank("accounts.csv")      CSV file (the default)
+#   Bank("accounts_shards")   sharded directory, see sharding.py
+#   Bank("bank.db")           SQLite database (.db / .sqlite / .sqlite3)
+#
+#   python backends.py accounts.csv bank.db   copy an existing book into SQLite
+import sqlite3
+import threading
+import weakref
+from collections import OrderedDict
+from contextlib import contextmanager, nullcontext
+from typing import Iterable, List, Optional, Tuple
+
+import sharding
+from account import Account
+from storage import load_accounts_cached, save_accounts_to_file, save_snapshot_cache
+
+SQLITE_SUFFIXES = (".db", ".sqlite", ".sqlite3")
+
+class StorageBackend:
+    point_access = False
+
+    def load(self) -> Tuple[List[Account], Optional[int]]:
+        # (accounts in book order, next free account number or None if unknown)
+        raise NotImplementedError
+
+    def save(self, accounts: List[Account], next_account: Optional[int] = None):
+        raise NotImplementedError
+
+    def mark_dirty(self, accounts: Optional[Iterable[Account]] = None):
+        # accounts changed since the last save (None: everything)
+        pass
+
+    def transaction(self):
+        # groups the writes made inside it into one transaction, where the backend writes
+        # straight through (SqliteBackend); the others save the book as a whole anyway
+        return nullcontext()
+
+    def close(self):
+        pass
+
+class CsvBackend(StorageBackend):
+    def __init__(self, filename):
+        self.filename = filename
+
+    def load(self):
+        return load_accounts_cached(self.filename)
+
+    def save(self, accounts, next_account=None):
+        save_accounts_to_file(accounts, filename=self.filename)
+        save_snapshot_cache(accounts, self.filename, next_account)
+
+class ShardedBackend(StorageBackend):
+    def __init__(self, dirname):
+        self.dirname = dirname
+        self.shards = sharding.read_manifest(dirname)["shards"]
+        self._dirty = set()
+
+    def load(self):
+        accounts = sharding.load_sharded(self.dirname)
+        # load_sharded returns the book in account-number order
+        return accounts, (accounts[-1].account_number + 1 if accounts else None)
+
+    def mark_dirty(self, accounts=None):
+        if accounts is None:
+            self._dirty.update(range(self.shards))
+        else:
+            self._dirty.update(acc.account_number % self.shards for acc in accounts)
+
+    def save(self, accounts, next_account=None):
+        # only the shards touched since the last save are rewritten
+        dirty, self._dirty = self._dirty, set()
+        sharding.save_sharded(accounts, self.dirname, dirty=dirty)
+
+# ---------- SQLite ----------
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS accounts (
+    account_number INTEGER PRIMARY KEY,
+    name TEXT NOT NULL,
+    name_lc TEXT NOT NULL,
+    age INTEGER NOT NULL,
+    balance REAL NOT NULL,
+    type TEXT NOT NULL,
+    status TEXT NOT NULL,
+    pin INTEGER
+);
+CREATE INDEX IF NOT EXISTS accounts_status ON accounts (status);
+CREATE INDEX IF NOT EXISTS accounts_balance ON accounts (balance DESC, account_number);
+CREATE INDEX IF NOT EXISTS accounts_age ON accounts (age, account_number);
+CREATE INDEX IF NOT EXISTS accounts_name ON accounts (name_lc);
+CREATE TABLE IF NOT EXISTS transactions (
+    id INTEGER PRIMARY KEY,
+    timestamp TEXT NOT NULL,
+    account_number INTEGER NOT NULL,
+    operation TEXT NOT NULL,
+    amount REAL NOT NULL,
+    balance_after REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS transactions_account ON transactions (account_number, id);
+CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value INTEGER);
+"""
+# the statements below are constant strings, so sqlite3's per-connection statement
+# cache compiles each of them once
+UPSERT_ACCOUNT = ("INSERT INTO accounts (account_number, name, name_lc, age, balance, type, status, pin) "
+                  "VALUES (?, ?, ?, ?, ?, ?, ?, ?) ON CONFLICT (account_number) DO UPDATE SET "
+                  "name = excluded.name, name_lc = excluded.name_lc, balance = excluded.balance, "
+                  "status = excluded.status, pin = excluded.pin")
+SELECT_ACCOUNT = "SELECT account_number, name, age, balance, type, status, pin FROM accounts"
+INSERT_TRANSACTION = ("INSERT INTO transactions (timestamp, account_number, operation, amount, balance_after) "
+                      "VALUES (?, ?, ?, ?, ?)")
+SET_META = "INSERT INTO meta (key, value) VALUES (?, ?) ON CONFLICT (key) DO UPDATE SET value = excluded.value"
+PAGE_SIZE = 1000  # rows per query when iterating the whole table
+CACHE_SIZE = 10000  # recently used accounts kept in memory
+
+def is_sqlite(path):
+    return str(path).lower().endswith(SQLITE_SUFFIXES)
+
+def _row(acc: Account):
+    return (acc.account_number, acc.name, acc.name.strip().lower(), acc.age, acc.balance,
+            acc.account_type, acc.status, acc.pin)
+
+def _like_escape(text):
+    return text.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+
+class SqliteBackend(StorageBackend):
+    point_access = True
+
+    def __init__(self, path):
+        self.path = path
+        self._lock = threading.RLock()
+        self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript(SCHEMA)
+        self._count = self._conn.execute("SELECT COUNT(*) FROM accounts").fetchone()[0]
+        self._in_transaction = False  # only ever true for the thread holding _lock
+
+    @contextmanager
+    def transaction(self):
+        # one SQLite transaction for every write made inside it on this thread, such as an
+        # account update and its transactions rows; other threads wait on _lock meanwhile
+        with self._lock:
+            if self._in_transaction:
+                yield
+                return
+            self._conn.execute("BEGIN")
+            self._in_transaction = True
+            try:
+                yield
+            except BaseException:
+                self._conn.execute("ROLLBACK")
+                raise
+            else:
+                self._conn.execute("COMMIT")
+            finally:
+                self._in_transaction = False
+
+    # ---------- whole book ----------
+    def load(self):
+        return list(self.iter_accounts()), self.next_account_number()
+
+    def save(self, accounts, next_account=None):
+        with self.transaction():
+            self._conn.execute("DELETE FROM accounts")
+            self._conn.executemany(UPSERT_ACCOUNT, map(_row, accounts))
+            if next_account is not None:
+                self._conn.execute(SET_META, ("next_account", next_account))
+            self._count = self._conn.execute("SELECT COUNT(*) FROM accounts").fetchone()[0]
+
+    # ---------- point access ----------
+    def get(self, account_number) -> Optional[Account]:
+        with self._lock:
+            row = self._conn.execute(SELECT_ACCOUNT + " WHERE account_number = ?", (account_number,)).fetchone()
+        return Account(*row) if row else None
+
+    def put_many(self, accounts: Iterable[Account], next_account: Optional[int] = None):
+        # one transaction per call (or part of an enclosing transaction()), so a transfer's
+        # two accounts commit together
+        with self.transaction():
+            self._conn.executemany(UPSERT_ACCOUNT, map(_row, accounts))
+            if next_account is not None:
+                self._conn.execute(SET_META, ("next_account", next_account))
+
+    def iter_rows(self, where="", params=()):
+        # keyset pagination: the lock is only held for one page at a time
+        last = -1
+        sql = f"{SELECT_ACCOUNT} WHERE account_number > ? {where} ORDER BY account_number LIMIT {PAGE_SIZE}"
+        while True:
+            with self._lock:
+                rows = self._conn.execute(sql, (last,) + tuple(params)).fetchall()
+            yield from rows
+            if len(rows) < PAGE_SIZE:
+                return
+            last = rows[-1][0]
+
+    def snapshot_rows(self):
+        # every row as of one moment, read on a connection of its own: under WAL the
+        # writers carry on meanwhile (used by background exports)
+        conn = sqlite3.connect(self.path)
+        try:
+            conn.execute("BEGIN")
+            yield from conn.execute(SELECT_ACCOUNT + " ORDER BY account_number")
+        finally:
+            conn.close()
+
+    def iter_accounts(self):
+        return (Account(*row) for row in self.iter_rows())
+
+    def count(self):
+        return self._count
+
+    def added(self, n):
+        # Bank registers new accounts before their first put_many
+        self._count += n
+
+    def clear(self):
+        with self.transaction():
+            self._conn.execute("DELETE FROM accounts")
+            self._count = 0
+
+    def next_account_number(self) -> Optional[int]:
+        with self._lock:
+            stored = self._conn.execute("SELECT value FROM meta WHERE key = 'next_account'").fetchone()
+            highest = self._conn.execute("SELECT MAX(account_number) FROM accounts").fetchone()[0]
+        candidates = [n for n in (stored and stored[0], highest and highest + 1) if n]
+        return max(candidates) if candidates else None
+
+    def checkpoint(self):
+        with self._lock:
+            self._conn.execute("PRAGMA wal_checkpoint(PASSIVE)")
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+    # ---------- queries behind the dashboards and name search ----------
+    def scalar(self, sql, params=()):
+        with self._lock:
+            return self._conn.execute(sql, params).fetchone()[0]
+
+    def numbers(self, sql, params=()):
+        with self._lock:
+            return [row[0] for row in self._conn.execute(sql, params)]
+
+    # ---------- transactions table (mirror of the log, see transactions.enable_sql_log) ----------
+    def append_transactions(self, entries):
+        # entries: (timestamp, account_number, operation, amount, balance_after)
+        with self.transaction():
+            self._conn.executemany(INSERT_TRANSACTION, entries)
+
+    def history(self, account_number, offset=0, limit=None, start=None, end=None):
+        sql = ("SELECT timestamp, account_number, operation, amount, balance_after FROM transactions "
+               "WHERE account_number = ?")
+        params = [account_number]
+        if start is not None:
+            sql += " AND timestamp >= ?"
+            params.append(start)
+        if end is not None:
+            sql += " AND substr(timestamp, 1, ?) <= ?"
+            params += [len(end), end]
+        sql += " ORDER BY id LIMIT ? OFFSET ?"
+        params += [-1 if limit is None else limit, offset]
+        with self._lock:
+            rows = self._conn.execute(sql, params).fetchall()
+        return [{"timestamp": ts, "account_number": acc, "operation": op, "amount": amount,
+                 "balance_after": balance} for ts, acc, op, amount, balance in rows]
+
+    def clear_transactions(self):
+        with self.transaction():
+            self._conn.execute("DELETE FROM transactions")
+
+class SqlStats:
+    # same interface as aggregates.BookStats, answered by indexed queries
+    def __init__(self, backend: SqliteBackend):
+        self.backend = backend
+
+    # nothing to maintain: the table is the view
+    def load(self, accounts):
+        pass
+
+    def upsert(self, acc):
+        pass
+
+    def clear(self):
+        pass
+
+    @property
+    def accounts(self):
+        return self.backend.count()
+
+    @property
+    def active(self):
+        return self.backend.scalar("SELECT COUNT(*) FROM accounts WHERE status = 'Active'")
+
+    def average_balance(self):
+        return self.backend.scalar("SELECT COALESCE(AVG(balance), 0.0) FROM accounts")
+
+    def youngest(self):
+        found = self.backend.numbers("SELECT account_number FROM accounts ORDER BY age, account_number LIMIT 1")
+        return found[0] if found else None
+
+    def oldest(self):
+        found = self.backend.numbers(
+            "SELECT account_number FROM accounts WHERE age = (SELECT MAX(age) FROM accounts) "
+            "ORDER BY account_number LIMIT 1")
+        return found[0] if found else None
+
+    def top_n(self, n):
+        return self.backend.numbers(
+            "SELECT account_number FROM accounts ORDER BY balance DESC, account_number LIMIT ?", (max(0, n),))
+
+class SqlNames:
+    # same interface as name_index.NameIndex
+    def __init__(self, backend: SqliteBackend):
+        self.backend = backend
+
+    # nothing to maintain: the table is the view
+    def load(self, accounts):
+        pass
+
+    def upsert(self, acc):
+        pass
+
+    def clear(self):
+        pass
+
+    def _like(self, pattern, limit):
+        return self.backend.numbers(
+            "SELECT account_number FROM accounts WHERE name_lc LIKE ? ESCAPE '\\' "
+            "ORDER BY account_number LIMIT ?", (pattern, -1 if limit is None else limit))
+
+    def search(self, query, limit=None):
+        return self._like(f"%{_like_escape(query.strip().lower())}%", limit)
+
+    def search_prefix(self, query, limit=None):
+        return self._like(f"{_like_escape(query.strip().lower())}%", limit)
+
+class _Cache:
+    # account number -> Account for everything in use (weak) plus the most recently
+    # used ones (strong), so two callers always get the same object for an account
+    def __init__(self, size=CACHE_SIZE):
+        self._live = weakref.WeakValueDictionary()
+        self._recent = OrderedDict()
+        self._size = size
+        self._lock = threading.Lock()
+
+    def get(self, number):
+        with self._lock:
+            acc = self._live.get(number)
+            if acc is not None:
+                self._touch(number, acc)
+            return acc
+
+    def put(self, acc):
+        # returns the cached object if another caller registered one first
+        with self._lock:
+            existing = self._live.get(acc.account_number)
+            if existing is not None:
+                acc = existing
+            else:
+                self._live[acc.account_number] = acc
+            self._touch(acc.account_number, acc)
+            return acc
+
+    def _touch(self, number, acc):
+        self._recent[number] = acc
+        self._recent.move_to_end(number)
+        if len(self._recent) > self._size:
+            self._recent.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._live.clear()
+            self._recent.clear()
+
+class LazyIndex:
+    # stands in for Bank._by_number: account number -> Account, read through the cache
+    # (backend: an SqliteBackend, or the columnar.ColumnStore of a columnar book)
+    def __init__(self, backend: SqliteBackend, cache: _Cache):
+        self.backend = backend
+        self.cache = cache
+
+    def get(self, number, default=None):
+        if not isinstance(number, int):
+            return default
+        acc = self.cache.get(number)
+        if acc is None:
+            acc = self.backend.get(number)
+            if acc is None:
+                return default
+            acc = self.cache.put(acc)
+        return acc
+
+    def __getitem__(self, number):
+        acc = self.get(number)
+        if acc is None:
+            raise KeyError(number)
+        return acc
+
+    def __contains__(self, number):
+        return self.get(number) is not None
+
+    def __setitem__(self, number, acc):
+        self.cache.put(acc)
+
+    def clear(self):
+        self.cache.clear()
+
+class LazyAccounts:
+    # stands in for Bank.accounts: iterates the table in account-number (= book) order,
+    # or the column store in row (= book) order
+    def __init__(self, backend: SqliteBackend, cache: _Cache):
+        self.backend = backend
+        self.cache = cache
+
+    def __iter__(self):
+        for row in self.backend.iter_rows():
+            acc = self.cache.get(row[0])
+            yield acc if acc is not None else self.cache.put(Account(*row))
+
+    def __len__(self):
+        return self.backend.count()
+
+    def append(self, acc):
+        # the row itself is written by the put_many that follows (Bank._record_change)
+        self.cache.put(acc)
+        self.backend.added(1)
+
+    def clear(self):
+        self.backend.clear()
+        self.cache.clear()
+
+def open_backend(path) -> StorageBackend:
+    if is_sqlite(path):
+        return SqliteBackend(path)
+    if sharding.is_sharded(path):
+        return ShardedBackend(path)
+    return CsvBackend(path)
+
+def migrate(source, target):
+    # copies a book between backends, e.g. accounts.csv -> bank.db
+    accounts, next_account = open_backend(source).load()
+    destination = open_backend(target)
+    destination.mark_dirty()
+    destination.save(accounts, next_account)
+    destination.close()
+    return len(accounts)
+
+def main():
+    import argparse
+    parser = argparse.ArgumentParser(description="Copy the account book between storage backends")
+    parser.add_argument("source", help="accounts.csv, a sharded directory or bank.db")
+    parser.add_argument("target", help="accounts.csv, an existing sharded directory or bank.db")
+    args = parser.parse_args()
+    print(f"Copied {migrate(args.source, args.target)} accounts to {args.target}")
+
+if __name__ == "__main__":
+    main()
@@ -1,64 +1,308 @@
 # bank.py
 from account import Account
-from storage import save_accounts_to_file, load_accounts_from_file
+import backends
+from journal import AccountJournal, journal_path, read_journal
+from columnar import ColumnStats, ColumnStore
+from aggregates import BookStats
+from name_index import NameIndex
 import transactions as txn
-from typing import List, Optional
+import importer
+import interest
+import export
+import limits
+import reconcile
+from typing import Dict, Iterable, List, Optional
+from contextlib import contextmanager, nullcontext
+import gc
 import itertools
+import math
+import threading
 import datetime
-import csv
 
 DEFAULT_START_ACC = 1001
 MAX_SINGLE_DEPOSIT = 100000.0
-DAILY_WITHDRAW_LIMIT = 50000.0
+DAILY_WITHDRAW_LIMIT = limits.DAILY_WITHDRAW_LIMIT  # default daily cap, see limits.py
+SNAPSHOT_EVERY = 10000  # journal entries before accounts.csv is rewritten
+BATCH_BEST_EFFORT = "best_effort"  # apply valid ops, report invalid ones
+BATCH_ATOMIC = "atomic"            # apply nothing unless every op is valid
+LOCK_STRIPES = 4096  # per-account locks are striped by account number in thread-safe mode
+
+def validate_new_account(name: str, age: int, acc_type: str, initial_deposit: float) -> str:
+    # returns the normalised account type; also used by the import workers
+    if not math.isfinite(initial_deposit):
+        raise ValueError("Initial deposit must be a finite number.")
+    # F19: Age verification
+    if age < 18:
+        raise ValueError("Age must be 18 or older to create an account.")
+    acc_type = acc_type.capitalize()
+    if acc_type not in ("Savings", "Current"):
+        raise ValueError("Account type must be 'Savings' or 'Current'.")
+
+    # minimum deposit rules
+    if acc_type == "Savings" and initial_deposit < 500:
+        raise ValueError("Savings account requires at least ₹500 initial deposit.")
+    if acc_type == "Current" and initial_deposit < 1000:
+        raise ValueError("Current account requires at least ₹1,000 initial deposit.")
+    return acc_type
+
+class _OrderedLocks:
+    # holds several stripe locks, always acquired in ascending stripe order so two
+    # callers locking overlapping sets of accounts can never deadlock
+    __slots__ = ("locks",)
+
+    def __init__(self, locks):
+        self.locks = locks
+
+    def __enter__(self):
+        for lock in self.locks:
+            lock.acquire()
+
+    def __exit__(self, *exc):
+        for lock in reversed(self.locks):
+            lock.release()
+
+_NO_LOCK = nullcontext()
+
+@contextmanager
+def _gc_paused():
+    # loading allocates millions of long-lived objects and none of them are garbage;
+    # without this the cyclic collector re-scans them over and over during startup
+    enabled = gc.isenabled()
+    gc.disable()
+    try:
+        yield
+    finally:
+        if enabled:
+            gc.enable()
 
 class Bank:
-    def __init__(self, accounts_file="accounts.csv"):
+    def __init__(self, accounts_file="accounts.csv", journal_mode=txn.FLUSH_ALWAYS, snapshot_every=SNAPSHOT_EVERY,
+                 thread_safe=False, columnar=False, velocity_limits: Optional[Dict[str, dict]] = None):
         self.accounts_file = accounts_file
-        self.accounts: List[Account] = load_accounts_from_file(accounts_file)
-        self._acc_gen = self._init_acc_generator()
-        # Validate next account number generator based on existing
-        self._ensure_seq()
-
-    def _init_acc_generator(self):
-        # generator starting at DEFAULT_START_ACC
-        n = DEFAULT_START_ACC
-        while True:
-            yield n
-            n += 1
-
-    def _ensure_seq(self):
-        if self.accounts:
-            max_existing = max(a.account_number for a in self.accounts)
-            # advance generator to max_existing + 1
-            g = self._init_acc_generator()
-            # consume until > max_existing
-            while True:
-                val = next(g)
-                if val > max_existing:
-                    self._acc_gen = itertools.chain([val], g)
-                    break
+        self.snapshot_every = snapshot_every
+        self._snapshots = 0  # snapshots written so far; tells autosave its copy went stale
+        self.thread_safe = thread_safe
+        if thread_safe:
+            self._stripes = [threading.Lock() for _ in range(LOCK_STRIPES)]
+            self._seq_lock = threading.Lock()        # account number allocation
+            self._book_lock = threading.RLock()      # adding/removing accounts
+            self._persist_lock = threading.RLock()   # journal append vs snapshot
+        # accounts_file is a CSV file, a sharded directory or an SQLite database (see backends.py)
+        self.backend = backends.open_backend(accounts_file)
+        with _gc_paused():
+            self._next_account = DEFAULT_START_ACC
+            # columnar=True: the book is kept in a column store (see columnar.py); an SQLite
+            # book stays in the database and the store is a copy for post_interest
+            self.columns: Optional[ColumnStore] = ColumnStore() if columnar else None
+            if self.backend.point_access:
+                self._open_point_access()
+            else:
+                self.accounts: List[Account] = self._load_book()
+                # primary index: account number -> Account (self.accounts keeps the ordering)
+                self._by_number: Dict[int, Account] = {}
+                self._rebuild_index()
+                # replay changes made since the last snapshot, then keep journaling
+                markers = set()
+                replayed = self._replay_journal(journal_path(accounts_file), markers)
+                self.journal = AccountJournal(journal_path(accounts_file), mode=journal_mode, entries=replayed,
+                                              markers=markers)
+                # derived views, loaded here and kept current by _record_change:
+                # running counts/sums/leaderboard behind the dashboard options
+                self.stats = BookStats() if self.columns is None else ColumnStats(self.columns)
+                # trigram/prefix index behind find_by_name
+                self.names = NameIndex()
+            self._views = [v for v in (self.stats, self.names, self.columns) if v is not None]
+            for view in self._views:
+                view.load(self.accounts)
+            if self._columnar_book:
+                self._open_columnar()
+        # funds reserved by cross-partition transfers that are prepared but not yet
+        # committed (see partition.py): they can't be withdrawn or transferred meanwhile
+        self._holds: Dict[int, float] = {}
+        # rolling hour/day/30-day debit caps per account type, rebuilt from the recent log
+        self.limits = limits.VelocityLimits(velocity_limits)
+        since = datetime.datetime.now() - datetime.timedelta(seconds=self.limits.horizon())
+        self.limits.rebuild(txn.read_recent(since.isoformat(sep=" ", timespec="seconds")))
+        # next account number: one past the highest ever seen, never below DEFAULT_START_ACC
+        self._acc_gen = itertools.count(self._next_account)
+
+    def _seen_account_number(self, account_number):
+        if account_number >= self._next_account:
+            self._next_account = account_number + 1
+
+    def _load_book(self):
+        accounts, next_account = self.backend.load()
+        if next_account is not None:
+            self._seen_account_number(next_account - 1)
+        return accounts
+
+    def _save_book(self):
+        accounts = self.columns.accounts() if self._columnar_book else self.accounts
+        self.backend.save(accounts, self._next_account)
+
+    def _book_rows(self):
+        # point-in-time copy of the book (see export.take_snapshot); callers hold the book locks
+        if self._columnar_book:
+            return self.columns.snapshot_rows()
+        return export.take_snapshot(self.accounts)
+
+    def _open_point_access(self):
+        # the book stays in the database: accounts are read on demand through a cache of
+        # recently used ones, every change is written straight through (so there is no
+        # journal), and the dashboards and name search are indexed queries
+        cache = backends._Cache()
+        self.accounts = backends.LazyAccounts(self.backend, cache)
+        self._by_number = backends.LazyIndex(self.backend, cache)
+        self.journal = None
+        self.stats = backends.SqlStats(self.backend)
+        self.names = backends.SqlNames(self.backend)
+        next_account = self.backend.next_account_number()
+        if next_account is not None:
+            self._seen_account_number(next_account - 1)
+        txn.enable_sql_log(self.backend)
+
+    @property
+    def _columnar_book(self):
+        return self.columns is not None and not self.backend.point_access
+
+    def _open_columnar(self):
+        # the columns now hold the book, so the Account objects are dropped: accounts are
+        # built from their row on demand, through a cache of recently used ones (as for an
+        # SQLite book), and every change is written back by _record_change's upsert
+        cache = backends._Cache()
+        self.accounts = backends.LazyAccounts(self.columns, cache)
+        self._by_number = backends.LazyIndex(self.columns, cache)
+        # the name index is built on first search from the live book, now the store
+        self.names.load(self.columns.accounts())
+
+    def _rebuild_index(self):
+        self._by_number = {}
+        for a in self.accounts:
+            # keep the first occurrence, same as the old linear scan
+            self._by_number.setdefault(a.account_number, a)
+
+    def _add_account(self, account: Account):
+        self.accounts.append(account)
+        self._by_number[account.account_number] = account
+
+    def _replay_journal(self, filename, markers=None):
+        replayed = []
+        for acc in read_journal(filename, markers):
+            existing = self._by_number.get(acc.account_number)
+            if existing is None:
+                self._add_account(acc)
+                self._seen_account_number(acc.account_number)
+            else:
+                existing.__dict__.update(acc.__dict__)
+            replayed.append(acc)
+        # the saved book doesn't have these changes yet (a sharded book only rewrites the
+        # shards marked dirty)
+        self.backend.mark_dirty(replayed)
+        return len(replayed)
+
+    # ---------- Locking (no-ops unless thread_safe=True) ----------
+    # Lock order: account stripes (ascending), then _book_lock, then _persist_lock;
+    # _seq_lock is only ever taken on its own.
+    def _lock_accounts(self, *account_numbers):
+        if not self.thread_safe:
+            return _NO_LOCK
+        stripes = sorted({n % LOCK_STRIPES for n in account_numbers if isinstance(n, int)})
+        if len(stripes) == 1:
+            return self._stripes[stripes[0]]
+        return _OrderedLocks([self._stripes[i] for i in stripes])
+
+    def _lock_all_accounts(self):
+        # every stripe, in order: for whole-book updates such as post_interest
+        return _OrderedLocks(self._stripes) if self.thread_safe else _NO_LOCK
+
+    def _lock(self, name):
+        return getattr(self, name) if self.thread_safe else _NO_LOCK
+
+    def _record_change(self, *accounts: Account, marker: Optional[str] = None):
+        # persist a mutation: O(size of the change). Snapshots are taken once the journal
+        # is as long as the book itself, so their cost amortises to O(1) per change.
+        # marker is journaled with the change (see AccountJournal; partition.py workers).
+        for view in self._views:
+            for acc in accounts:
+                view.upsert(acc)
+        if self.journal is None:
+            self.backend.put_many(accounts, self._next_account)
+            return
+        self.backend.mark_dirty(accounts)
+        with self._lock("_persist_lock"):
+            self.journal.record_many(accounts, marker)
+            if self.journal.entries >= max(self.snapshot_every, len(self.accounts)):
+                self.snapshot()
+
+    def _apply_balances(self, changes):
+        # (account, new balance) pairs, set and persisted as one change; if persisting
+        # fails the old balances are put back (views included) before the error propagates
+        old = [(acc, acc.balance) for acc, _ in changes]
+        for acc, balance in changes:
+            acc.balance = balance
+        try:
+            self._record_change(*(acc for acc, _ in changes))
+        except BaseException:
+            for acc, balance in reversed(old):
+                acc.balance = balance
+            for view in self._views:
+                for acc, _ in old:
+                    view.upsert(acc)
+            raise
+
+    def _record_balance_changes(self, accounts: List[Account]):
+        # bulk form of _record_change for balance-only updates. Past a quarter of the book,
+        # rebuilding the balance-based views and writing a snapshot is cheaper than
+        # per-account upserts plus a journal as long as the book; names don't change.
+        # Writing straight through to the database already is the bulk path.
+        if self.journal is None or len(accounts) * 4 < len(self.accounts):
+            self._record_change(*accounts)
+            return
+        self.stats.load(self.accounts)
+        if self.columns is not None:
+            self.columns.update_balances(accounts)
+        self.backend.mark_dirty(accounts)
+        self.snapshot()
+
+    def snapshot(self):
+        # write a compacted accounts.csv, after which the journal can start over.
+        # A change racing with this lands either in the snapshot or in the new journal.
+        with self._lock("_persist_lock"):
+            if self.journal is None:
+                # every change is already in the database; fold its WAL back in
+                self.backend.checkpoint()
+                return
+            self.journal.flush()
+            self._save_book()
+            self.journal.reset()
+            self._snapshots += 1
+
+    def stride_account_numbers(self, residue: int, modulus: int):
+        # partitioned mode (partition.py): from now on only numbers n with
+        # n % modulus == residue are handed out
+        with self._lock("_seq_lock"):
+            start = self._next_account + (residue - self._next_account) % modulus
+            self._acc_gen = itertools.count(start, modulus)
 
     def next_account_number(self):
         # get next number from generator
-        if isinstance(self._acc_gen, itertools.chain):
-            return next(self._acc_gen)
-        return next(self._acc_gen)
+        with self._lock("_seq_lock"):
+            n = next(self._acc_gen)
+            self._next_account = n + 1
+            return n
+
+    def _allocate_account_numbers(self, count):
+        with self._lock("_seq_lock"):
+            numbers = list(itertools.islice(self._acc_gen, count))
+            if numbers:
+                self._next_account = numbers[-1] + 1
+            return numbers
 
     # ---------- Base features ----------
     def create_account(self, name: str, age: int, acc_type: str, initial_deposit: float, pin: Optional[int]=None):
-        # F19: Age verification
-        if age < 18:
-            raise ValueError("Age must be 18 or older to create an account.")
-        acc_type = acc_type.capitalize()
-        if acc_type not in ("Savings", "Current"):
-            raise ValueError("Account type must be 'Savings' or 'Current'.")
-
-        # minimum deposit rules
-        if acc_type == "Savings" and initial_deposit < 500:
-            raise ValueError("Savings account requires at least ₹500 initial deposit.")
-        if acc_type == "Current" and initial_deposit < 1000:
-            raise ValueError("Current account requires at least ₹1,000 initial deposit.")
-
+        acc_type = validate_new_account(name, age, acc_type, initial_deposit)
+        if pin is not None and not (1000 <= pin <= 9999):
+            raise ValueError("PIN must be a 4 digit number.")
         acc_num = self.next_account_number()
         account = Account(
             account_number=acc_num,
@@ -69,53 +313,98 @@ class Bank:
             status="Active",
             pin=pin
         )
-        self.accounts.append(account)
-        txn.log_transaction(acc_num, "Create", initial_deposit, account.balance)
+        with self._lock("_book_lock"):
+            self._add_account(account)
+        with self.backend.transaction():
+            self._record_change(account)
+            txn.log_transaction(acc_num, "Create", initial_deposit, account.balance)
         return account
 
     def find_by_account_number(self, account_number: int) -> Optional[Account]:
-        for acc in self.accounts:
-            if acc.account_number == account_number:
-                return acc
-        return None
+        return self._by_number.get(account_number)
+
+    def find_by_name(self, name: str, prefix: bool = False, limit: Optional[int] = None):
+        # case-insensitive substring match (or prefix match), in book order
+        if prefix:
+            numbers = self.names.search_prefix(name, limit)
+        else:
+            numbers = self.names.search(name, limit)
+        return [self._by_number[n] for n in numbers]
+
+    # ---------- rule checks (shared by the single-operation methods and apply_batch) ----------
+    def _available(self, acc: Account, balance: Optional[float] = None):
+        # balance (the current one unless given) less any funds on hold
+        return (acc.balance if balance is None else balance) - self._holds.get(acc.account_number, 0.0)
+
+    def _min_balance(self, acc: Account):
+        return 500.0 if acc.account_type == "Savings" else 1000.0
 
-    def find_by_name(self, name: str):
-        name_lower = name.strip().lower()
-        return [a for a in self.accounts if name_lower in a.name.strip().lower()]
+    def _check_amount(self, amount: float):
+        # NaN passes every comparison below and inf would poison the running totals
+        if not math.isfinite(amount):
+            raise ValueError("Amount must be a finite number.")
 
-    def deposit(self, account_number: int, amount: float):
+    def _check_deposit(self, acc: Optional[Account], amount: float):
+        self._check_amount(amount)
         if amount <= 0:
             raise ValueError("Deposit amount must be positive.")
         if amount > MAX_SINGLE_DEPOSIT:
             raise ValueError(f"Cannot deposit more than ₹{MAX_SINGLE_DEPOSIT} in a single deposit.")
-        acc = self.find_by_account_number(account_number)
         if not acc:
             raise LookupError("Account not found.")
         if acc.status != "Active":
             raise PermissionError("Cannot deposit into inactive account.")
-        acc.balance += amount
-        txn.log_transaction(account_number, "Deposit", amount, acc.balance)
-        return acc.balance
 
-    def withdraw(self, account_number: int, amount: float):
+    def _check_withdraw(self, acc: Optional[Account], amount: float, balance: float, pending=(0.0, 0)):
+        self._check_amount(amount)
         if amount <= 0:
             raise ValueError("Amount must be positive.")
-        acc = self.find_by_account_number(account_number)
         if not acc:
             raise LookupError("Account not found.")
         if acc.status != "Active":
             raise PermissionError("Account is inactive.")
-        # check daily limit
-        today_total = txn.todays_withdrawals_total(account_number)
-        if today_total + amount > DAILY_WITHDRAW_LIMIT:
-            raise PermissionError(f"Daily withdrawal limit of ₹{DAILY_WITHDRAW_LIMIT} exceeded for today. Already withdrawn ₹{today_total:.2f}.")
+        # velocity limits (pending: debits earlier in the same batch)
+        self.limits.check(acc.account_number, acc.account_type, amount, *pending)
         # minimum balance check
-        min_remain = 500.0 if acc.account_type == "Savings" else 1000.0
-        if acc.balance - amount < min_remain:
+        min_remain = self._min_balance(acc)
+        if balance - amount < min_remain:
             raise PermissionError(f"Cannot withdraw. Account must maintain minimum balance of ₹{min_remain}")
-        acc.balance -= amount
-        txn.log_transaction(account_number, "Withdraw", amount, acc.balance)
-        return acc.balance
+
+    def _check_transfer(self, from_acc: Optional[Account], to_acc: Optional[Account], amount: float,
+                        from_balance: float, pending=(0.0, 0)):
+        self._check_amount(amount)
+        if amount <= 0:
+            raise ValueError("Amount must be positive.")
+        if not from_acc or not to_acc:
+            raise LookupError("One or both accounts not found.")
+        if from_acc.status != "Active" or to_acc.status != "Active":
+            raise PermissionError("Both accounts must be active for transfer.")
+        # min balance check for sender
+        if from_balance - amount < self._min_balance(from_acc):
+            raise PermissionError("Sender does not have sufficient funds respecting minimum balance.")
+        # velocity limits for withdrawals (transfer counts as debit)
+        self.limits.check(from_acc.account_number, from_acc.account_type, amount, *pending)
+
+    def deposit(self, account_number: int, amount: float):
+        acc = self.find_by_account_number(account_number)
+        with self._lock_accounts(account_number):
+            self._check_deposit(acc, amount)
+            with self.backend.transaction():
+                self._apply_balances([(acc, acc.balance + amount)])
+                txn.log_transaction(account_number, "Deposit", amount, acc.balance)
+            return acc.balance
+
+    def withdraw(self, account_number: int, amount: float):
+        acc = self.find_by_account_number(account_number)
+        # the limit/min-balance checks and the debit happen under one lock, so
+        # concurrent withdrawals cannot both pass the checks on stale totals
+        with self._lock_accounts(account_number):
+            self._check_withdraw(acc, amount, self._available(acc) if acc else 0.0)
+            with self.backend.transaction():
+                self._apply_balances([(acc, acc.balance - amount)])
+                txn.log_transaction(account_number, "Withdraw", amount, acc.balance)
+            self.limits.record(account_number, amount)
+            return acc.balance
 
     def balance_inquiry(self, account_number: int):
         acc = self.find_by_account_number(account_number)
@@ -127,10 +416,13 @@ class Bank:
         acc = self.find_by_account_number(account_number)
         if not acc:
             raise LookupError("Account not found.")
-        if acc.status != "Active":
-            raise PermissionError("Account already inactive.")
-        acc.status = "Inactive"
-        txn.log_transaction(account_number, "Close", 0.0, acc.balance)
+        with self._lock_accounts(account_number):
+            if acc.status != "Active":
+                raise PermissionError("Account already inactive.")
+            acc.status = "Inactive"
+            with self.backend.transaction():
+                self._record_change(acc)
+                txn.log_transaction(account_number, "Close", 0.0, acc.balance)
         return acc
 
     # ---------- Extended features ----------
@@ -144,64 +436,178 @@ class Bank:
         acc = self.find_by_account_number(account_number)
         if not acc:
             raise LookupError("Account not found.")
-        if acc.status == "Active":
-            raise PermissionError("Account is already active.")
-        acc.status = "Active"
-        txn.log_transaction(account_number, "Reopen", 0.0, acc.balance)
+        with self._lock_accounts(account_number):
+            if acc.status == "Active":
+                raise PermissionError("Account is already active.")
+            acc.status = "Active"
+            with self.backend.transaction():
+                self._record_change(acc)
+                txn.log_transaction(account_number, "Reopen", 0.0, acc.balance)
         return acc
 
     def rename_account_holder(self, account_number: int, new_name: str):
         acc = self.find_by_account_number(account_number)
         if not acc:
             raise LookupError("Account not found.")
-        acc.name = new_name
-        txn.log_transaction(account_number, "Rename", 0.0, acc.balance)
+        with self._lock_accounts(account_number):
+            acc.name = new_name
+            with self.backend.transaction():
+                self._record_change(acc)
+                txn.log_transaction(account_number, "Rename", 0.0, acc.balance)
         return acc
 
     def count_active_accounts(self):
-        return len(self.list_active_accounts())
+        return self.stats.active
 
     def delete_all_accounts(self, admin_confirm=False):
         if not admin_confirm:
             raise PermissionError("Admin confirmation required to delete all accounts.")
-        self.accounts.clear()
-        # also truncate transactions log
-        open(txn.LOGFILE, "w").close()
-        # save empty accounts.csv
-        save_accounts_to_file(self.accounts, filename=self.accounts_file)
+        with self._lock_all_accounts(), self._lock("_book_lock"):
+            self.accounts.clear()
+            self._by_number.clear()
+            for view in self._views:
+                view.clear()
+            self.backend.mark_dirty()
+            # also truncate transactions log
+            txn.clear_log()
+            self.limits.clear()
+            # save empty accounts.csv
+            self.snapshot()
         return True
 
     def transfer_funds(self, from_acc_num: int, to_acc_num: int, amount: float):
-        if amount <= 0:
-            raise ValueError("Amount must be positive.")
         from_acc = self.find_by_account_number(from_acc_num)
         to_acc = self.find_by_account_number(to_acc_num)
-        if not from_acc or not to_acc:
-            raise LookupError("One or both accounts not found.")
-        if from_acc.status != "Active" or to_acc.status != "Active":
-            raise PermissionError("Both accounts must be active for transfer.")
-        # min balance check for sender
-        min_remain = 500.0 if from_acc.account_type == "Savings" else 1000.0
-        if from_acc.balance - amount < min_remain:
-            raise PermissionError("Sender does not have sufficient funds respecting minimum balance.")
-        # daily limit check for withdrawals (transfer counts as debit)
-        today_total = txn.todays_withdrawals_total(from_acc_num)
-        if today_total + amount > DAILY_WITHDRAW_LIMIT:
-            raise PermissionError("Daily withdrawal/transfer limit exceeded.")
-        from_acc.balance -= amount
-        to_acc.balance += amount
-        txn.log_transaction(from_acc_num, "Transfer-Debit", amount, from_acc.balance)
-        txn.log_transaction(to_acc_num, "Transfer-Credit", amount, to_acc.balance)
-        return from_acc.balance, to_acc.balance
-
-    def transaction_history(self, account_number: int):
-        return txn.get_account_transactions(account_number)
+        with self._lock_accounts(from_acc_num, to_acc_num):
+            self._check_transfer(from_acc, to_acc, amount, self._available(from_acc) if from_acc else 0.0)
+            with self.backend.transaction():
+                if from_acc is to_acc:
+                    # nets to nothing, as the debit and credit did when applied one after the other
+                    self._apply_balances([(from_acc, from_acc.balance)])
+                else:
+                    self._apply_balances([(from_acc, from_acc.balance - amount), (to_acc, to_acc.balance + amount)])
+                txn.log_transaction(from_acc_num, "Transfer-Debit", amount, from_acc.balance)
+                txn.log_transaction(to_acc_num, "Transfer-Credit", amount, to_acc.balance)
+            self.limits.record(from_acc_num, amount)
+            return from_acc.balance, to_acc.balance
+
+    # ---------- Batch operations ----------
+    # ops: {"op": "deposit"|"withdraw", "account": n, "amount": x} or
+    #      {"op": "transfer", "from": n, "to": m, "amount": x}
+    # Ops are checked in order against the same rules as the single methods, each one
+    # seeing the effect of those before it, and logged with one write per chunk.
+    # Returns one dict per op: status "ok" (with balance/balances), "error" (with
+    # error/error_type) or "rolled_back" (atomic mode, when another op failed).
+    def apply_batch(self, ops: Iterable[dict], mode: str = BATCH_BEST_EFFORT, chunk_size: int = 10000):
+        if mode not in (BATCH_BEST_EFFORT, BATCH_ATOMIC):
+            raise ValueError(f"Batch mode must be '{BATCH_BEST_EFFORT}' or '{BATCH_ATOMIC}'.")
+        if mode == BATCH_ATOMIC:
+            # all-or-nothing needs to see every op before touching anything
+            ops = list(ops)
+            chunk_size = max(1, len(ops))
+        results = []
+        chunk = []
+        for op in ops:
+            chunk.append(op)
+            if len(chunk) >= chunk_size:
+                results.extend(self._apply_batch_chunk(chunk, mode))
+                chunk = []
+        if chunk:
+            results.extend(self._apply_batch_chunk(chunk, mode))
+        return results
+
+    def _apply_batch_chunk(self, ops, mode):
+        touched = []
+        for op in ops:
+            for key in ("account", "from", "to"):
+                try:
+                    touched.append(int(op[key]))
+                except (KeyError, TypeError, ValueError):
+                    pass
+        with self._lock_accounts(*touched):
+            return self._apply_batch_chunk_locked(ops, mode)
+
+    def _apply_batch_chunk_locked(self, ops, mode):
+        balances = {}  # account number -> balance as of the ops validated so far
+        debits = {}    # account number -> (amount, count) debited earlier in this chunk
+        entries = []   # (account number, operation, amount, balance after)
+        results = []
+        failed = False
+
+        def balance_of(acc):
+            return balances.get(acc.account_number, acc.balance)
+
+        def debit(acc_num, amount):
+            pending_amount, pending_count = debits.get(acc_num, (0.0, 0))
+            debits[acc_num] = (pending_amount + amount, pending_count + 1)
+
+        for op in ops:
+            try:
+                if not isinstance(op, dict):
+                    raise TypeError(f"Batch operation must be an object, not {type(op).__name__}.")
+                kind = str(op.get("op", "")).lower()
+                amount = float(op["amount"])
+                if kind == "deposit":
+                    acc = self.find_by_account_number(int(op["account"]))
+                    self._check_deposit(acc, amount)
+                    balances[acc.account_number] = balance_of(acc) + amount
+                    entries.append((acc.account_number, "Deposit", amount, balances[acc.account_number]))
+                    results.append({"status": "ok", "balance": balances[acc.account_number]})
+                elif kind == "withdraw":
+                    acc = self.find_by_account_number(int(op["account"]))
+                    self._check_withdraw(acc, amount, self._available(acc, balance_of(acc)) if acc else 0.0,
+                                         debits.get(acc.account_number, (0.0, 0)) if acc else (0.0, 0))
+                    balances[acc.account_number] = balance_of(acc) - amount
+                    debit(acc.account_number, amount)
+                    entries.append((acc.account_number, "Withdraw", amount, balances[acc.account_number]))
+                    results.append({"status": "ok", "balance": balances[acc.account_number]})
+                elif kind == "transfer":
+                    from_acc = self.find_by_account_number(int(op["from"]))
+                    to_acc = self.find_by_account_number(int(op["to"]))
+                    self._check_transfer(from_acc, to_acc, amount,
+                                         self._available(from_acc, balance_of(from_acc)) if from_acc else 0.0,
+                                         debits.get(from_acc.account_number, (0.0, 0)) if from_acc else (0.0, 0))
+                    balances[from_acc.account_number] = balance_of(from_acc) - amount
+                    balances[to_acc.account_number] = balance_of(to_acc) + amount
+                    debit(from_acc.account_number, amount)
+                    entries.append((from_acc.account_number, "Transfer-Debit", amount, balances[from_acc.account_number]))
+                    entries.append((to_acc.account_number, "Transfer-Credit", amount, balances[to_acc.account_number]))
+                    results.append({"status": "ok", "balances": (balances[from_acc.account_number],
+                                                                 balances[to_acc.account_number])})
+                else:
+                    raise ValueError(f"Unknown batch operation: {op.get('op')!r}")
+            except (ValueError, LookupError, PermissionError, KeyError, TypeError) as e:
+                failed = True
+                if isinstance(e, KeyError):
+                    e = ValueError(f"Missing field {e}")
+                results.append({"status": "error", "error": str(e), "error_type": type(e).__name__})
+
+        if failed and mode == BATCH_ATOMIC:
+            for r in results:
+                if r["status"] == "ok":
+                    r.clear()
+                    r["status"] = "rolled_back"
+            return results
+
+        with self.backend.transaction():
+            if balances:
+                self._apply_balances([(self._by_number[n], balance) for n, balance in balances.items()])
+            txn.log_transactions(entries)
+        for acc_num, op, amount, _ in entries:
+            if op in ("Withdraw", "Transfer-Debit"):
+                self.limits.record(acc_num, amount)
+        return results
+
+    def transaction_history(self, account_number: int, offset: int = 0, limit: Optional[int] = None,
+                            start: Optional[str] = None, end: Optional[str] = None):
+        # start/end: optional "YYYY-MM-DD" (or full timestamp) bounds, both inclusive
+        return txn.get_account_transactions_page(account_number, offset, limit, start, end)
 
     def minimum_balance_check(self, account_number: int):
         acc = self.find_by_account_number(account_number)
         if not acc:
             raise LookupError("Account not found.")
-        return 500.0 if acc.account_type == "Savings" else 1000.0
+        return self._min_balance(acc)
 
     def simple_interest_calculator(self, account_number: int, rate_percent: float, years: float):
         acc = self.find_by_account_number(account_number)
@@ -210,23 +616,85 @@ class Bank:
         # Simple interest on current balance
         return acc.balance * (rate_percent/100.0) * years
 
+    def post_interest(self, rates: Optional[Dict[str, float]] = None, years: float = 1 / 12,
+                      compound: bool = False, periods_per_year: int = 12, dry_run: bool = False,
+                      report_file: Optional[str] = None):
+        # Credits interest to every active account with a positive balance, at the annual
+        # percent rate for its type (interest.DEFAULT_RATES unless given), over `years`.
+        # Credits are computed in one vectorised pass, rounded to paise, then posted and
+        # logged as "Interest" in one bulk write. dry_run only reports (and writes
+        # report_file, one row per account, if given). Returns a summary dict.
+        rates = interest.DEFAULT_RATES if rates is None else rates
+        factors = interest.type_factors(rates, years, compound, periods_per_year)
+        with self._lock_all_accounts(), self._lock("_book_lock"), _gc_paused():
+            if self.columns is not None:
+                size = self.columns.size
+                arrays = (self.columns.numbers[:size], self.columns.balances[:size],
+                          self.columns.types[:size], self.columns.active[:size])
+            else:
+                # list() so a database-backed book is read once, not once per column
+                arrays = interest.book_arrays(list(self.accounts))
+            numbers, balances, types, active = arrays
+            credits = interest.compute_credits(balances, types, active, factors)
+            numbers, balances, types, credits = interest.credited(numbers, balances, types, credits)
+            if report_file:
+                interest.write_report(report_file, numbers, balances, types, credits)
+            summary = interest.summarize(types, credits, dry_run, report_file)
+            if dry_run or not numbers:
+                return summary
+            changed = []
+            by_number = self._by_number
+            with self.backend.transaction():
+                for start in range(0, len(numbers), interest.LOG_CHUNK):
+                    entries = []
+                    for number, credit in zip(numbers[start:start + interest.LOG_CHUNK],
+                                              credits[start:start + interest.LOG_CHUNK]):
+                        acc = by_number[number]
+                        acc.balance = round(acc.balance + credit, 2)
+                        changed.append(acc)
+                        entries.append((number, "Interest", credit, acc.balance))
+                    txn.log_transactions(entries)
+                self._record_balance_changes(changed)
+        return summary
+
+    def reconcile(self, workers: Optional[int] = None, repair: bool = False, report_file: Optional[str] = None):
+        # Replays the whole transaction log in a process pool (see reconcile.py) and diffs
+        # the derived balances/statuses against the book. repair=True sets drifted
+        # accounts to what the log says; accounts only the log knows are reported, not
+        # recreated. Holds every account lock so the book can't move under the diff.
+        with self._lock_all_accounts(), self._lock("_book_lock"):
+            derived = reconcile.replay(txn.log_files(), workers)
+            discrepancies = reconcile.diff(self.accounts, derived)
+            summary = reconcile.summarize(derived, discrepancies)
+            if report_file:
+                reconcile.write_report(report_file, discrepancies)
+            changed = []
+            if repair:
+                for d in discrepancies:
+                    if d["book_balance"] is None or d["log_balance"] is None:
+                        continue
+                    acc = self._by_number[d["account_number"]]
+                    acc.balance = round(d["log_balance"], 2)
+                    if d["log_status"] is not None:
+                        acc.status = d["log_status"]
+                    changed.append(acc)
+                if changed:
+                    self._record_change(*changed)
+            summary["repaired"] = len(changed)
+        return summary
+
+    # the dashboards read the running aggregates in self.stats
     def average_balance(self):
-        if not self.accounts:
-            return 0.0
-        return sum(a.balance for a in self.accounts) / len(self.accounts)
+        return self.stats.average_balance()
 
     def youngest_account_holder(self):
-        if not self.accounts:
-            return None
-        return min(self.accounts, key=lambda a: a.age)
+        return self._by_number.get(self.stats.youngest())
 
     def oldest_account_holder(self):
-        if not self.accounts:
-            return None
-        return max(self.accounts, key=lambda a: a.age)
+        return self._by_number.get(self.stats.oldest())
 
     def top_n_accounts_by_balance(self, n=5):
-        return sorted(self.accounts, key=lambda a: a.balance, reverse=True)[:n]
+        return [self._by_number[num] for num in self.stats.top_n(n)]
 
     def set_pin(self, account_number: int, pin: int):
         acc = self.find_by_account_number(account_number)
@@ -234,38 +702,104 @@ class Bank:
             raise LookupError("Account not found.")
         if not (1000 <= pin <= 9999):
             raise ValueError("PIN must be a 4 digit number.")
-        acc.pin = pin
-        txn.log_transaction(account_number, "Set-PIN", 0.0, acc.balance)
+        with self._lock_accounts(account_number):
+            acc.pin = pin
+            with self.backend.transaction():
+                self._record_change(acc)
+                txn.log_transaction(account_number, "Set-PIN", 0.0, acc.balance)
         return True
 
-    def export_accounts_to_file(self, filename="export_accounts.csv"):
-        save_accounts_to_file(self.accounts, filename)
+    def _snapshot_rows(self):
+        # point-in-time copy of the book (see export.take_snapshot) for background writers
+        with self._lock_all_accounts(), self._lock("_book_lock"), _gc_paused():
+            return self._book_rows()
+
+    def export_accounts_to_file(self, filename="export_accounts.csv", status: Optional[str] = None,
+                                account_type: Optional[str] = None, columns: Optional[List[str]] = None,
+                                compress: Optional[bool] = None, background: bool = False, progress=None,
+                                on_done=None):
+        # Writes the book, or only "active"/"closed" accounts and/or one account type, with
+        # the chosen accounts.csv columns, gzipped for a .gz filename or compress=True.
+        # background=True returns an export.ExportJob as soon as the book is copied;
+        # otherwise returns filename once written.
+        if self.backend.point_access:
+            # read on the worker through its own connection, which sees one consistent state
+            rows, total = self.backend.snapshot_rows, len(self.accounts)
+        else:
+            rows = self._snapshot_rows()
+            total = len(rows)
+        job = export.ExportJob(rows, filename, status, account_type, columns, compress, total, progress, on_done)
+        if background:
+            return job.start()
+        job.run()
         return filename
 
-    def import_accounts_from_file(self, filename="accounts_import.csv"):
-        # load CSV and append accounts (ensure unique account numbers)
-        try:
-            with open(filename, "r", newline="") as f:
-                reader = csv.DictReader(f)
-                for row in reader:
-                    # basic validation
-                    try:
-                        name = row["name"].strip()
-                        age = int(row["age"])
-                        acc_type = row.get("type", "Savings")
-                        balance = float(row.get("balance", 0.0))
-                    except Exception:
-                        continue
-                    try:
-                        # Note: imported accounts will be assigned new unique numbers to avoid duplicates
-                        new_acc = self.create_account(name, age, acc_type, balance, pin=None)
-                    except Exception:
-                        # skip invalid rows
-                        continue
-            return True
-        except FileNotFoundError:
-            raise
-
-    def autosave_and_exit(self):
-        save_accounts_to_file(self.accounts, filename=self.accounts_file)
-        print("Data saved to", self.accounts_file)
+    def import_accounts_from_file(self, filename="accounts_import.csv", reject_file=None, workers=None,
+                                  chunk_size=importer.CHUNK_SIZE, progress=None):
+        # Streams the CSV through importer.validated_chunks (parsed and validated in a process
+        # pool, bad rows written to reject_file with a reason) and adds each chunk in bulk.
+        # Imported accounts are assigned new unique numbers to avoid duplicates.
+        if reject_file is None:
+            reject_file = importer.reject_path(filename)
+        summary = {"imported": 0, "rejected": 0}
+        for rows, rejected in importer.validated_chunks(filename, reject_file, workers, chunk_size):
+            self._create_accounts_bulk(rows)
+            summary["imported"] += len(rows)
+            summary["rejected"] += rejected
+            if progress:
+                progress(dict(summary))
+        return summary
+
+    def _create_accounts_bulk(self, rows):
+        # rows: validated (name, age, acc_type, initial_deposit) tuples
+        numbers = self._allocate_account_numbers(len(rows))
+        accounts = [Account(account_number=n, name=name, age=age, balance=float(deposit),
+                            account_type=acc_type, status="Active", pin=None)
+                    for n, (name, age, acc_type, deposit) in zip(numbers, rows)]
+        with self._lock("_book_lock"):
+            for account in accounts:
+                self._add_account(account)
+        with self.backend.transaction():
+            self._record_change(*accounts)
+            txn.log_transactions([(a.account_number, "Create", a.balance, a.balance) for a in accounts])
+        return accounts
+
+    def autosave_and_exit(self, wait: bool = True):
+        # Saves the book on an export.BackgroundTask and returns it once the save is on disk.
+        # wait=False returns as soon as the book is copied; only for callers that keep the
+        # interpreter running until the task is done, since a sharded save started during
+        # interpreter shutdown can't get a process pool. The journal is only reset if
+        # nothing was journaled after the copy.
+        txn.close_log()
+        if self.journal is None:
+            task = export.BackgroundTask(self.backend.checkpoint, on_done=self._saved, name="gdb-autosave")
+        else:
+            # stripes, then the book, then the journal: the order every other path locks in
+            with self._lock_all_accounts(), self._lock("_book_lock"), self._lock("_persist_lock"), _gc_paused():
+                self.journal.flush()
+                rows = self._book_rows()
+                journaled = self.journal.entries
+                snapshots = self._snapshots
+                next_account = self._next_account
+
+            def save():
+                # under _persist_lock like snapshot(), so the two never write the file at once
+                with self._lock("_persist_lock"):
+                    # a snapshot taken since the copy is newer than it (the journal has the rest)
+                    if self._snapshots == snapshots:
+                        self.backend.save([Account(*row) for row in rows], next_account)
+                        if self.journal.entries == journaled:
+                            self.journal.reset()
+                    self.journal.close()
+
+            task = export.BackgroundTask(save, on_done=self._saved, name="gdb-autosave")
+        task.start()
+        if wait:
+            task.wait()
+        return task
+
+    def _saved(self, task):
+        if task.error is not None:
+            print(f"Autosave to {self.accounts_file} failed: {task.error}")
+        else:
+            print("Data saved to", self.accounts_file)
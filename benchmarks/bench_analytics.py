@@ -0,0 +1,131 @@
+# benchmarks/bench_analytics.py
+# Analytics latency (average, youngest/oldest, top-N, active count) as full scans, as the
+# running aggregates of a list book and as vectorised passes over a columnar book
+# (Bank(columnar=True)), plus the memory each book keeps per account.
+#
+#   python benchmarks/bench_analytics.py --accounts 1000000
+import argparse
+import gc
+import math
+import os
+import random
+import sys
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import backends
+from account import Account
+from aggregates import BookStats
+from bank import Bank
+from columnar import ColumnStats, ColumnStore, np
+
+
+def iter_accounts(n, seed=1):
+    rng = random.Random(seed)
+    for i in range(n):
+        yield Account(account_number=1001 + i, name=f"Holder {i}", age=rng.randint(18, 90),
+                      balance=round(rng.uniform(500, 1_000_000), 2),
+                      account_type=rng.choice(("Savings", "Current")),
+                      status="Active" if rng.random() < 0.9 else "Inactive")
+
+
+def timed(fn, repeat=5):
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+    return best * 1000
+
+
+def list_book(n):
+    # a Bank without touching disk: skip __init__ and wire up only what analytics read.
+    # Account objects, the number index and the running aggregates, as Bank keeps them.
+    bank = Bank.__new__(Bank)
+    bank.accounts = list(iter_accounts(n))
+    bank._rebuild_index()
+    bank.stats = BookStats()
+    bank.stats.load(bank.accounts)
+    return bank
+
+
+def columnar_book(n):
+    # the same book held the way Bank(columnar=True) holds it: columns plus a lookup cache
+    bank = Bank.__new__(Bank)
+    bank.columns = ColumnStore()
+    bank.columns.load(iter_accounts(n))
+    cache = backends._Cache()
+    bank.accounts = backends.LazyAccounts(bank.columns, cache)
+    bank._by_number = backends.LazyIndex(bank.columns, cache)
+    bank.stats = ColumnStats(bank.columns)
+    return bank
+
+
+def traced(build, n):
+    # (result, bytes still allocated by build per account); the name index, which both
+    # books keep, is not part of either
+    gc.collect()
+    tracemalloc.start()
+    result = build(n)
+    gc.collect()
+    size = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    return result, size / n
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Analytics benchmark")
+    parser.add_argument("--accounts", type=int, default=200000)
+    parser.add_argument("--top", type=int, default=10)
+    args = parser.parse_args()
+
+    listed, list_bytes = traced(list_book, args.accounts)
+    columnar, columnar_bytes = traced(columnar_book, args.accounts)
+    print(f"column backend: {'numpy' if np is not None else 'array (numpy not installed)'}")
+    print(f"memory per account: list book ~{list_bytes:.0f} B, columnar book ~{columnar_bytes:.0f} B "
+          f"(store.nbytes() {columnar.columns.nbytes() / args.accounts:.0f} B)")
+
+    accounts = listed.accounts
+    # full-scan versions, as Bank computed these before running aggregates existed
+    scan = {
+        "average_balance": lambda: sum(a.balance for a in accounts) / len(accounts),
+        "count_active_accounts": lambda: sum(1 for a in accounts if a.status == "Active"),
+        "youngest/oldest": lambda: (min(accounts, key=lambda a: a.age), max(accounts, key=lambda a: a.age)),
+        f"top_{args.top}": lambda: sorted(accounts, key=lambda a: a.balance, reverse=True)[:args.top],
+    }
+
+    def reads(bank):
+        return {
+            "average_balance": bank.average_balance,
+            "count_active_accounts": bank.count_active_accounts,
+            "youngest/oldest": lambda: (bank.youngest_account_holder(), bank.oldest_account_holder()),
+            f"top_{args.top}": lambda: bank.top_n_accounts_by_balance(args.top),
+        }
+
+    aggregates, columns = reads(listed), reads(columnar)
+    print(f"{'operation':>22}  {'scan ms':>10}  {'aggregates ms':>13}  {'columns ms':>10}")
+    for label in scan:
+        expected = scan[label]()
+        for got in (aggregates[label](), columns[label]()):
+            # sums are computed differently (in paise), so compare averages loosely
+            assert got == expected or math.isclose(got, expected), label
+        print(f"{label:>22}  {timed(scan[label]):>10.2f}  {timed(aggregates[label]):>13.4f}  "
+              f"{timed(columns[label]):>10.2f}")
+
+    # cost of keeping each book's analytics current
+    rng = random.Random(2)
+    sample = [rng.choice(accounts).account_number for _ in range(100000)]
+    for label, bank, view in (("aggregates", listed, listed.stats), ("columns", columnar, columnar.columns)):
+        start = time.perf_counter()
+        for number in sample:
+            acc = bank._by_number[number]
+            acc.balance += 1.0
+            view.upsert(acc)
+        per_update = (time.perf_counter() - start) / len(sample) * 1e6
+        print(f"{label} maintenance: {per_update:.2f} us per balance change")
+
+
+if __name__ == "__main__":
+    main()
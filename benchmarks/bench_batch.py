@@ -0,0 +1,71 @@
+# benchmarks/bench_batch.py
+# Throughput of Bank.apply_batch against calling deposit/withdraw/transfer_funds in a loop.
+#
+#   python benchmarks/bench_batch.py --accounts 10000 --ops 200000
+import argparse
+import os
+import random
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import transactions as txn
+from bank import Bank
+
+
+def make_ops(account_numbers, n, seed=7):
+    rng = random.Random(seed)
+    ops = []
+    for _ in range(n):
+        kind = rng.choice(("deposit", "withdraw", "transfer"))
+        amount = float(rng.randint(1, 50))
+        if kind == "transfer":
+            a, b = rng.sample(account_numbers, 2)
+            ops.append({"op": "transfer", "from": a, "to": b, "amount": amount})
+        else:
+            ops.append({"op": kind, "account": rng.choice(account_numbers), "amount": amount})
+    return ops
+
+
+def fresh_bank(tmp, accounts):
+    txn.LOGFILE = os.path.join(tmp, "transactions.log")
+    bank = Bank(accounts_file=os.path.join(tmp, "accounts.csv"))
+    numbers = [bank.create_account(f"Holder {i}", 30, "Savings", 100000.0).account_number
+               for i in range(accounts)]
+    return bank, numbers
+
+
+def run_loop(bank, ops):
+    for op in ops:
+        try:
+            if op["op"] == "deposit":
+                bank.deposit(op["account"], op["amount"])
+            elif op["op"] == "withdraw":
+                bank.withdraw(op["account"], op["amount"])
+            else:
+                bank.transfer_funds(op["from"], op["to"], op["amount"])
+        except (ValueError, LookupError, PermissionError):
+            pass
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Batch operations benchmark")
+    parser.add_argument("--accounts", type=int, default=10000)
+    parser.add_argument("--ops", type=int, default=100000)
+    args = parser.parse_args()
+    for label, runner in (("loop", run_loop), ("apply_batch", lambda b, o: b.apply_batch(o))):
+        with tempfile.TemporaryDirectory() as tmp:
+            bank, numbers = fresh_bank(tmp, args.accounts)
+            ops = make_ops(numbers, args.ops)
+            start = time.perf_counter()
+            runner(bank, ops)
+            elapsed = time.perf_counter() - start
+            bank.journal.close()
+            txn.close_log()
+        print(f"{label:>12}: {args.ops / elapsed:>12,.0f} ops/sec")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,53 @@
+# benchmarks/bench_interest.py
+# Month-end interest run over the whole book with Bank.post_interest: dry run (compute
+# and summarise) and a real posting (balances, views, snapshot and one bulk log write).
+#
+#   python benchmarks/bench_interest.py --accounts 5000000 --columnar
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import synthetic
+import transactions as txn
+from bank import Bank
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Bulk interest accrual timing")
+    parser.add_argument("--accounts", type=int, default=1000000)
+    parser.add_argument("--columnar", action="store_true", help="keep a column store (vectorised input)")
+    parser.add_argument("--compound", action="store_true")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        txn.LOGFILE = os.path.join(tmp, "transactions.log")
+        txn.configure_log(txn.FLUSH_BATCH)
+        path = os.path.join(tmp, "accounts.csv")
+        synthetic.write_accounts(path, args.accounts)
+        bank = Bank(accounts_file=path, columnar=args.columnar)
+        print(f"accounts:  {args.accounts:,} (columnar: {args.columnar})")
+
+        start = time.perf_counter()
+        summary = bank.post_interest(compound=args.compound, dry_run=True)
+        print(f"dry run:   {time.perf_counter() - start:.2f} s, {summary['accounts']:,} accounts, "
+              f"total ₹{summary['total']:,.2f}")
+
+        start = time.perf_counter()
+        bank.post_interest(compound=args.compound)
+        txn.flush_log()
+        print(f"posting:   {time.perf_counter() - start:.2f} s (incl. snapshot and log write)")
+        try:
+            with open("/proc/self/status") as f:
+                peak = next(line.split()[1] for line in f if line.startswith("VmHWM"))
+            print(f"peak RSS:  {int(peak) / 1024:,.0f} MiB")
+        except (OSError, StopIteration):
+            pass
+        txn.close_log()
+
+
+if __name__ == "__main__":
+    main()
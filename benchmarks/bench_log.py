@@ -0,0 +1,40 @@
+# benchmarks/bench_log.py
+# Logged operations per second for each transaction log durability mode.
+#
+#   python benchmarks/bench_log.py --ops 200000
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import transactions as txn
+
+
+def bench_mode(mode, ops, batch_size, interval_ms):
+    with tempfile.TemporaryDirectory() as tmp:
+        txn.LOGFILE = os.path.join(tmp, "transactions.log")
+        txn.configure_log(mode, batch_size=batch_size, interval_ms=interval_ms)
+        start = time.perf_counter()
+        for i in range(ops):
+            txn.log_transaction(1001 + i % 1000, "Deposit", 100.0, 1000.0 + i)
+        txn.close_log()
+        return ops / (time.perf_counter() - start)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Transaction log writer benchmark")
+    parser.add_argument("--ops", type=int, default=100000)
+    parser.add_argument("--batch-size", type=int, default=256)
+    parser.add_argument("--interval-ms", type=int, default=50)
+    args = parser.parse_args()
+    print(f"{'mode':>8}  {'ops/sec':>12}")
+    for mode in txn.LOG_MODES:
+        rate = bench_mode(mode, args.ops, args.batch_size, args.interval_ms)
+        print(f"{mode:>8}  {rate:>12,.0f}")
+
+
+if __name__ == "__main__":
+    main()
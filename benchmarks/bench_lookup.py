@@ -0,0 +1,54 @@
+# benchmarks/bench_lookup.py
+# Lookup latency of Bank.find_by_account_number as the book grows.
+#
+#   python benchmarks/bench_lookup.py --sizes 1000,10000,100000,1000000,5000000
+import argparse
+import csv
+import os
+import random
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from bank import Bank, DEFAULT_START_ACC
+from storage import FIELDNAMES
+
+
+def write_accounts_csv(path, n):
+    with open(path, "w", newline="") as f:
+        writer = csv.writer(f)
+        writer.writerow(FIELDNAMES)
+        for i in range(n):
+            writer.writerow([DEFAULT_START_ACC + i, f"Holder {i}", 18 + i % 60,
+                             f"{1000 + i % 5000:.2f}", "Savings", "Active", ""])
+
+
+def bench_size(n, lookups):
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "accounts.csv")
+        write_accounts_csv(path, n)
+        bank = Bank(accounts_file=path)
+    rng = random.Random(n)
+    keys = [DEFAULT_START_ACC + rng.randrange(n) for _ in range(lookups)]
+    find = bank.find_by_account_number
+    start = time.perf_counter()
+    for k in keys:
+        find(k)
+    elapsed = time.perf_counter() - start
+    return elapsed / lookups * 1e9
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Account lookup latency benchmark")
+    parser.add_argument("--sizes", default="1000,10000,100000,1000000")
+    parser.add_argument("--lookups", type=int, default=200000)
+    args = parser.parse_args()
+    print(f"{'accounts':>10}  {'ns/lookup':>10}")
+    for n in (int(s) for s in args.sizes.split(",")):
+        print(f"{n:>10}  {bench_size(n, args.lookups):>10.1f}")
+
+
+if __name__ == "__main__":
+    main()
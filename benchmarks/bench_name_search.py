@@ -0,0 +1,72 @@
+# benchmarks/bench_name_search.py
+# find_by_name latency: the old lower()/strip() list scan vs the trigram/prefix index.
+#
+#   python benchmarks/bench_name_search.py --accounts 1000000
+import argparse
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from account import Account
+from bank import Bank
+from name_index import NameIndex
+
+FIRST = ["Aarav", "Vivaan", "Aditya", "Diya", "Ananya", "Isha", "Rohan", "Kavya", "Arjun", "Meera",
+         "Sai", "Priya", "Rahul", "Sneha", "Vikram", "Neha", "Karan", "Pooja", "Amit", "Riya"]
+LAST = ["Sharma", "Verma", "Iyer", "Reddy", "Nair", "Patel", "Gupta", "Singh", "Das", "Menon",
+        "Rao", "Kulkarni", "Joshi", "Bose", "Chopra", "Mehta", "Pillai", "Shetty", "Kapoor", "Ghosh"]
+
+
+def make_accounts(n, seed=3):
+    rng = random.Random(seed)
+    return [Account(account_number=1001 + i,
+                    name=f"{rng.choice(FIRST)} {rng.choice(LAST)} {rng.randint(1, 99999)}",
+                    age=30, balance=1000.0, account_type="Savings")
+            for i in range(n)]
+
+
+def timed(fn, repeat=5):
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+    return best * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Name search benchmark")
+    parser.add_argument("--accounts", type=int, default=200000)
+    args = parser.parse_args()
+    accounts = make_accounts(args.accounts)
+    bank = Bank.__new__(Bank)
+    bank.accounts = accounts
+    bank._rebuild_index()
+    bank.names = NameIndex()
+    bank.names.load(accounts)
+    start = time.perf_counter()
+    bank.find_by_name("warm up")  # the index is built on the first search
+    print(f"index build: {time.perf_counter() - start:.2f} s for {args.accounts} accounts")
+
+    def scan(q):
+        q = q.strip().lower()
+        return [a for a in accounts if q in a.name.strip().lower()]
+
+    print(f"{'query':>18}  {'hits':>7}  {'scan ms':>9}  {'index ms':>9}")
+    for q in ("kulkarni 4242", "Meera Ghosh", "iyer", "12345", "sh"):
+        expected = scan(q)
+        assert bank.find_by_name(q) == expected, q
+        print(f"{q!r:>18}  {len(expected):>7}  {timed(lambda: scan(q)):>9.2f}"
+              f"  {timed(lambda: bank.find_by_name(q)):>9.2f}")
+    for q in ("Kavya Rao", "Sai"):
+        hits = bank.find_by_name(q, prefix=True, limit=20)
+        assert hits == [a for a in scan(q) if a.name.lower().startswith(q.lower())][:20], q
+        print(f"{'prefix ' + repr(q):>18}  {len(hits):>7}  {'':>9}"
+              f"  {timed(lambda: bank.find_by_name(q, prefix=True, limit=20)):>9.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,74 @@
+# benchmarks/bench_partitions.py
+# Throughput of the partitioned ledger (partition.py) as the number of worker processes
+# grows: the same mix of deposits, withdrawals, balance inquiries and transfers (some of
+# them across partitions) is pushed through PartitionedBank.apply_many in batches.
+# Scaling is bounded by the cores available; on a single core every worker count runs
+# at about the same speed.
+#
+#   python benchmarks/bench_partitions.py --workers 1,2,4,8 --accounts 20000 --ops 400000
+import argparse
+import os
+import random
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from partition import PartitionedBank
+
+
+def make_ops(account_numbers, n, transfer_share, seed=7):
+    rng = random.Random(seed)
+    ops = []
+    for _ in range(n):
+        r = rng.random()
+        amount = float(rng.randint(1, 50))
+        if r < transfer_share:
+            a, b = rng.sample(account_numbers, 2)
+            ops.append({"op": "transfer", "from": a, "to": b, "amount": amount})
+        elif r < transfer_share + (1 - transfer_share) / 3:
+            ops.append({"op": "deposit", "account": rng.choice(account_numbers), "amount": amount})
+        elif r < transfer_share + 2 * (1 - transfer_share) / 3:
+            ops.append({"op": "withdraw", "account": rng.choice(account_numbers), "amount": amount})
+        else:
+            ops.append({"op": "balance", "account": rng.choice(account_numbers)})
+    return ops
+
+
+def run(workers, accounts, ops_count, batch, transfer_share):
+    with tempfile.TemporaryDirectory() as tmp:
+        with PartitionedBank(os.path.join(tmp, "partitions"), partitions=workers) as bank:
+            created = []
+            for start in range(0, accounts, batch):
+                created += bank.apply_many([{"op": "create_account", "name": f"Holder {i}", "age": 30,
+                                             "type": "Savings", "initial_deposit": 10000000.0}
+                                            for i in range(start, min(start + batch, accounts))])
+            numbers = [r["result"]["account_number"] for r in created]
+            ops = make_ops(numbers, ops_count, transfer_share)
+            errors = 0
+            started = time.perf_counter()
+            for start in range(0, len(ops), batch):
+                errors += sum(not r["ok"] for r in bank.apply_many(ops[start:start + batch]))
+            elapsed = time.perf_counter() - started
+    return ops_count / elapsed, errors
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Partitioned ledger scaling benchmark")
+    parser.add_argument("--workers", default="1,2,4", help="comma-separated worker counts")
+    parser.add_argument("--accounts", type=int, default=20000)
+    parser.add_argument("--ops", type=int, default=200000)
+    parser.add_argument("--batch", type=int, default=5000, help="requests per apply_many call")
+    parser.add_argument("--transfers", type=float, default=0.1, help="share of ops that are transfers")
+    args = parser.parse_args()
+    print(f"{os.cpu_count()} CPU(s)")
+    baseline = None
+    for workers in (int(w) for w in args.workers.split(",")):
+        rate, errors = run(workers, args.accounts, args.ops, args.batch, args.transfers)
+        baseline = baseline or rate
+        print(f"{workers:>3} workers: {rate:>12,.0f} ops/sec  x{rate / baseline:4.2f}  ({errors} rejected)")
+
+
+if __name__ == "__main__":
+    main()
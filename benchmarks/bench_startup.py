@@ -0,0 +1,51 @@
+# benchmarks/bench_startup.py
+# Time to a ready Bank (what main.py waits for before the first prompt): first start
+# parses accounts.csv and builds accounts.csv.cache, later starts load the cache.
+#
+#   python benchmarks/bench_startup.py --accounts 5000000
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import transactions as txn
+from bank import Bank
+from bench_lookup import write_accounts_csv
+from storage import cache_path
+
+
+def timed_start(path):
+    start = time.perf_counter()
+    bank = Bank(accounts_file=path)
+    elapsed = time.perf_counter() - start
+    return elapsed, bank.next_account_number()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Bank startup time with and without the snapshot cache")
+    parser.add_argument("--accounts", type=int, default=1000000)
+    parser.add_argument("--runs", type=int, default=3, help="cached starts to time")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        txn.LOGFILE = os.path.join(tmp, "transactions.log")
+        path = os.path.join(tmp, "accounts.csv")
+        write_accounts_csv(path, args.accounts)
+        print(f"accounts:      {args.accounts:,}")
+
+        cold, next_cold = timed_start(path)
+        print(f"CSV start:     {cold:.2f} s (also writes {os.path.basename(cache_path(path))})")
+        warm = []
+        for _ in range(args.runs):
+            elapsed, next_warm = timed_start(path)
+            warm.append(elapsed)
+            assert next_warm >= next_cold
+        print(f"cached start:  {min(warm):.2f} s (best of {args.runs})")
+        print(f"speedup:       {cold / min(warm):.1f}x")
+
+
+if __name__ == "__main__":
+    main()
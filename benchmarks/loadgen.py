@@ -0,0 +1,120 @@
+# benchmarks/loadgen.py
+# Load generator for server.py: opens many connections, pipelines requests on each
+# and reports requests/sec with p50/p99 latency.
+#
+#   python server.py --port 8765 &
+#   python benchmarks/loadgen.py --port 8765 --connections 50 --requests 2000 --depth 16
+#
+# With --spawn the generator starts an in-process server on a temporary book instead.
+import argparse
+import asyncio
+import json
+import os
+import random
+import sys
+import tempfile
+import time
+from collections import deque
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+def percentile(sorted_values, p):
+    if not sorted_values:
+        return 0.0
+    k = min(len(sorted_values) - 1, int(round(p / 100.0 * (len(sorted_values) - 1))))
+    return sorted_values[k]
+
+
+async def call(reader, writer, req):
+    writer.write(json.dumps(req).encode() + b"\n")
+    await writer.drain()
+    return json.loads(await reader.readline())
+
+
+async def client(host, port, accounts, requests, depth, seed, latencies, errors):
+    rng = random.Random(seed)
+    reader, writer = await asyncio.open_connection(host, port)
+    sent_at = deque()
+
+    async def receive(count):
+        for _ in range(count):
+            response = json.loads(await reader.readline())
+            latencies.append(time.perf_counter() - sent_at.popleft())
+            if not response.get("ok"):
+                errors[response.get("error_type", "?")] = errors.get(response.get("error_type", "?"), 0) + 1
+
+    sent = received = 0
+    while received < requests:
+        # keep up to `depth` requests in flight on this connection
+        while sent < requests and sent - received < depth:
+            acc = rng.choice(accounts)
+            if rng.random() < 0.7:
+                req = {"op": "balance", "account": acc}
+            else:
+                req = {"op": "deposit", "account": acc, "amount": 1.0}
+            sent_at.append(time.perf_counter())
+            writer.write(json.dumps(req).encode() + b"\n")
+            sent += 1
+        await writer.drain()
+        await receive(1)
+        received += 1
+    writer.close()
+
+
+async def run(args):
+    server = None
+    host, port = args.host, args.port
+    if args.spawn:
+        import transactions as txn
+        from bank import Bank
+        from server import BankServer
+        tmp = tempfile.mkdtemp()
+        txn.LOGFILE = os.path.join(tmp, "transactions.log")
+        txn.configure_log(txn.FLUSH_BATCH)
+        bank = Bank(accounts_file=os.path.join(tmp, "accounts.csv"), thread_safe=True)
+        for i in range(args.accounts):
+            bank.create_account(f"Load {i}", 30, "Savings", 1000.0)
+        server = await BankServer(bank, "127.0.0.1", 0).start()
+        host, port = "127.0.0.1", server.port
+
+    reader, writer = await asyncio.open_connection(host, port)
+    active = (await call(reader, writer, {"op": "list_active"}))["result"]
+    writer.close()
+    accounts = [a["account_number"] for a in active]
+    if not accounts:
+        raise SystemExit("Server has no active accounts to load.")
+
+    latencies, errors = [], {}
+    start = time.perf_counter()
+    await asyncio.gather(*(client(host, port, accounts, args.requests, args.depth, i, latencies, errors)
+                           for i in range(args.connections)))
+    elapsed = time.perf_counter() - start
+    if server is not None:
+        await server.stop()
+
+    latencies.sort()
+    total = len(latencies)
+    print(f"requests:    {total}")
+    print(f"throughput:  {total / elapsed:,.0f} req/s")
+    print(f"p50 latency: {percentile(latencies, 50) * 1000:.2f} ms")
+    print(f"p99 latency: {percentile(latencies, 99) * 1000:.2f} ms")
+    if errors:
+        print("errors:     ", errors)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Load generator for the bank server")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--connections", type=int, default=20)
+    parser.add_argument("--requests", type=int, default=1000, help="requests per connection")
+    parser.add_argument("--depth", type=int, default=8, help="pipelined requests in flight per connection")
+    parser.add_argument("--spawn", action="store_true", help="start an in-process server on a temporary book")
+    parser.add_argument("--accounts", type=int, default=1000, help="accounts to create with --spawn")
+    args = parser.parse_args()
+    asyncio.run(run(args))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,71 @@
+# benchmarks/stress_transfers.py
+# Hammers a thread-safe Bank with concurrent transfers over a small, hot set of
+# accounts and checks that no money is created or destroyed. Also reports throughput
+# per thread count.
+#
+#   python benchmarks/stress_transfers.py --accounts 50 --ops 20000 --threads 1,2,4,8
+import argparse
+import os
+import random
+import sys
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import transactions as txn
+from bank import Bank
+
+
+def worker(bank, numbers, ops, seed):
+    rng = random.Random(seed)
+    done = 0
+    for _ in range(ops):
+        a, b = rng.sample(numbers, 2)
+        try:
+            bank.transfer_funds(a, b, float(rng.randint(1, 20)))
+            done += 1
+        except PermissionError:
+            # minimum balance or daily limit; expected under contention
+            pass
+    return done
+
+
+def run(threads, accounts, ops):
+    with tempfile.TemporaryDirectory() as tmp:
+        txn.LOGFILE = os.path.join(tmp, "transactions.log")
+        txn.configure_log(txn.FLUSH_BATCH)
+        bank = Bank(accounts_file=os.path.join(tmp, "accounts.csv"), thread_safe=True)
+        numbers = [bank.create_account(f"Holder {i}", 30, "Savings", 10000.0).account_number
+                   for i in range(accounts)]
+        before = round(sum(a.balance for a in bank.accounts), 2)
+        per_thread = ops // threads
+        start = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=threads) as pool:
+            done = sum(pool.map(lambda s: worker(bank, numbers, per_thread, s), range(threads)))
+        elapsed = time.perf_counter() - start
+        after = round(sum(a.balance for a in bank.accounts), 2)
+        below_min = [a.account_number for a in bank.accounts if a.balance < 500.0]
+        bank.journal.close()
+        txn.close_log()
+    assert before == after, f"money not conserved: {before} -> {after}"
+    assert not below_min, f"accounts below minimum balance: {below_min}"
+    return done, done / elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Concurrent transfer stress test")
+    parser.add_argument("--accounts", type=int, default=50)
+    parser.add_argument("--ops", type=int, default=20000)
+    parser.add_argument("--threads", default="1,2,4,8")
+    args = parser.parse_args()
+    print(f"{'threads':>8}  {'transfers':>10}  {'per sec':>10}")
+    for threads in (int(t) for t in args.threads.split(",")):
+        done, rate = run(threads, args.accounts, args.ops)
+        print(f"{threads:>8}  {done:>10}  {rate:>10,.0f}")
+    print("OK: total balance conserved under contention")
+
+
+if __name__ == "__main__":
+    main()
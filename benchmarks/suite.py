@@ -0,0 +1,281 @@
+# benchmarks/suite.py
+# Reproducible end-to-end workloads against the public Bank methods on a synthetic book
+# (see synthetic.py), reported as JSON so runs can be diffed and regressions caught.
+#
+#   python benchmarks/suite.py --accounts 100000 --log-lines 1000000 --out results.json
+#   python benchmarks/suite.py --accounts 100000 --log-lines 1000000 --compare results.json
+#
+# Each workload records op count, errors (expected business errors such as limit
+# breaches), wall time, ops/sec and p50/p95/p99 latency. With --compare the run exits
+# with status 1 if any workload's ops/sec fell more than --tolerance below the baseline.
+import argparse
+import datetime
+import json
+import os
+import platform
+import random
+import shutil
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import synthetic
+import transactions as txn
+from bank import Bank
+
+BUSINESS_ERRORS = (ValueError, LookupError, PermissionError)
+WORKLOADS = ("startup", "create", "deposit", "withdraw", "transfer", "history", "analytics",
+             "export", "import")
+
+
+def percentile(sorted_values, p):
+    if not sorted_values:
+        return 0.0
+    k = min(len(sorted_values) - 1, int(round(p / 100.0 * (len(sorted_values) - 1))))
+    return sorted_values[k]
+
+
+class Recorder:
+    # times each call individually so the result carries a latency distribution
+    def __init__(self):
+        self.latencies = []
+        self.errors = 0
+
+    def call(self, fn, *args):
+        start = time.perf_counter()
+        try:
+            fn(*args)
+        except BUSINESS_ERRORS:
+            self.errors += 1
+        self.latencies.append(time.perf_counter() - start)
+
+    def result(self):
+        lat = sorted(self.latencies)
+        total = sum(lat)
+        return {
+            "ops": len(lat),
+            "errors": self.errors,
+            "seconds": round(total, 6),
+            "ops_per_sec": round(len(lat) / total, 2) if total else 0.0,
+            "p50_us": round(percentile(lat, 50) * 1e6, 2),
+            "p95_us": round(percentile(lat, 95) * 1e6, 2),
+            "p99_us": round(percentile(lat, 99) * 1e6, 2),
+        }
+
+
+# ---------- workloads: each returns a Recorder ----------
+def run_create(ctx, rng, n):
+    rec = Recorder()
+    for i in range(n):
+        acc_type = "Savings" if rng.random() < 0.7 else "Current"
+        rec.call(ctx.bank.create_account, f"Bench {i}", rng.randint(18, 90), acc_type,
+                 float(rng.randint(1000, 50000)))
+    return rec
+
+
+def run_deposit(ctx, rng, n):
+    rec = Recorder()
+    for _ in range(n):
+        rec.call(ctx.bank.deposit, rng.choice(ctx.active), float(rng.randint(1, 5000)))
+    return rec
+
+
+def run_withdraw(ctx, rng, n):
+    rec = Recorder()
+    for _ in range(n):
+        rec.call(ctx.bank.withdraw, rng.choice(ctx.active), float(rng.randint(1, 500)))
+    return rec
+
+
+def run_transfer(ctx, rng, n):
+    rec = Recorder()
+    for _ in range(n):
+        a, b = rng.sample(ctx.active, 2)
+        rec.call(ctx.bank.transfer_funds, a, b, float(rng.randint(1, 500)))
+    return rec
+
+
+def run_history(ctx, rng, n):
+    rec = Recorder()
+    for _ in range(n):
+        rec.call(ctx.bank.transaction_history, rng.choice(ctx.active), 0, 20)
+    return rec
+
+
+def run_analytics(ctx, rng, n):
+    # one op = one pass over the dashboard options
+    bank = ctx.bank
+
+    def dashboards():
+        bank.count_active_accounts()
+        bank.average_balance()
+        bank.youngest_account_holder()
+        bank.oldest_account_holder()
+        bank.top_n_accounts_by_balance(10)
+
+    rec = Recorder()
+    for _ in range(n):
+        rec.call(dashboards)
+    return rec
+
+
+def run_export(ctx, rng, n):
+    rec = Recorder()
+    for _ in range(n):
+        rec.call(ctx.bank.export_accounts_to_file, os.path.join(ctx.work, "export_accounts.csv"))
+    return rec
+
+
+def run_import(ctx, rng, n):
+    rec = Recorder()
+    for i in range(n):
+        path = os.path.join(ctx.work, f"import-{i}.csv")
+        synthetic.write_import(path, ctx.args.import_rows, seed=ctx.args.seed + 10 + i)
+        rec.call(ctx.bank.import_accounts_from_file, path)
+    return rec
+
+
+RUNNERS = {
+    "create": (run_create, "ops"),
+    "deposit": (run_deposit, "ops"),
+    "withdraw": (run_withdraw, "ops"),
+    "transfer": (run_transfer, "ops"),
+    "history": (run_history, "history_ops"),
+    "analytics": (run_analytics, "analytics_ops"),
+    "export": (run_export, "file_ops"),
+    "import": (run_import, "file_ops"),
+}
+
+
+class Context:
+    def __init__(self, args, work):
+        self.args = args
+        self.work = work
+        self.bank = None
+        self.active = []
+
+
+def run_startup(ctx):
+    # first start parses accounts.csv (and writes the snapshot cache), the second loads the cache
+    path = os.path.join(ctx.work, "accounts.csv")
+    results = {}
+    for label in ("startup_csv", "startup_cached"):
+        rec = Recorder()
+        bank = None
+
+        def start():
+            nonlocal bank
+            bank = Bank(accounts_file=path)
+
+        rec.call(start)
+        results[label] = rec.result()
+    ctx.bank = bank
+    return results
+
+
+def run_suite(args, selected):
+    work = tempfile.mkdtemp(prefix="gdb-bench-")
+    try:
+        if args.data:
+            for name in ("accounts.csv", "transactions.log"):
+                shutil.copy(os.path.join(args.data, name), os.path.join(work, name))
+        else:
+            synthetic.generate(work, args.accounts, args.log_lines, seed=args.seed)
+        txn.close_log()
+        txn.LOGFILE = os.path.join(work, "transactions.log")
+        txn.configure_log(args.log_mode)
+        ctx = Context(args, work)
+        results = {}
+        if "startup" in selected:
+            results.update(run_startup(ctx))
+        else:
+            ctx.bank = Bank(accounts_file=os.path.join(work, "accounts.csv"))
+        ctx.active = [a.account_number for a in ctx.bank.list_active_accounts()]
+        if len(ctx.active) < 2:
+            raise SystemExit("The book needs at least two active accounts.")
+        for name in WORKLOADS:
+            if name in RUNNERS and name in selected:
+                runner, count_arg = RUNNERS[name]
+                # every workload gets its own seeded stream, so selecting a subset
+                # does not change what the others do
+                rng = random.Random(f"{args.seed}:{name}")
+                results[name] = runner(ctx, rng, getattr(args, count_arg)).result()
+                print(f"{name:15} {results[name]['ops_per_sec']:>14,.1f} ops/s  "
+                      f"p99 {results[name]['p99_us']:>12,.1f} us", file=sys.stderr)
+        ctx.bank.journal.close()
+        txn.close_log()
+        return results
+    finally:
+        shutil.rmtree(work, ignore_errors=True)
+
+
+def compare(results, baseline, tolerance):
+    # workloads whose throughput dropped by more than tolerance (a fraction)
+    regressions = []
+    for name, current in results.items():
+        before = baseline.get("results", {}).get(name)
+        if not before or not before.get("ops_per_sec"):
+            continue
+        change = current["ops_per_sec"] / before["ops_per_sec"] - 1
+        if change < -tolerance:
+            regressions.append({"workload": name, "baseline_ops_per_sec": before["ops_per_sec"],
+                                "ops_per_sec": current["ops_per_sec"], "change": round(change, 4)})
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Synthetic benchmark suite for the Bank API")
+    parser.add_argument("--accounts", type=int, default=10000)
+    parser.add_argument("--log-lines", type=int, default=100000)
+    parser.add_argument("--data", help="directory with pre-generated accounts.csv/transactions.log "
+                                       "(see synthetic.py); copied, never modified")
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--ops", type=int, default=10000, help="ops for create/deposit/withdraw/transfer")
+    parser.add_argument("--history-ops", type=int, default=50)
+    parser.add_argument("--analytics-ops", type=int, default=1000)
+    parser.add_argument("--file-ops", type=int, default=3, help="runs of export and import")
+    parser.add_argument("--import-rows", type=int, default=10000)
+    parser.add_argument("--log-mode", default=txn.FLUSH_ALWAYS, choices=txn.LOG_MODES)
+    parser.add_argument("--only", help="comma-separated subset of: " + ",".join(WORKLOADS))
+    parser.add_argument("--out", help="write the JSON report here instead of stdout")
+    parser.add_argument("--compare", help="baseline JSON report to check for regressions")
+    parser.add_argument("--tolerance", type=float, default=0.2,
+                        help="allowed ops/sec drop against the baseline (0.2 = 20%%)")
+    args = parser.parse_args()
+
+    selected = set(args.only.split(",")) if args.only else set(WORKLOADS)
+    unknown = selected - set(WORKLOADS)
+    if unknown:
+        parser.error(f"unknown workloads: {', '.join(sorted(unknown))}")
+
+    results = run_suite(args, selected)
+    report = {
+        "created": datetime.datetime.now().isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "cpus": os.cpu_count(),
+        "params": {k: v for k, v in vars(args).items() if k not in ("out", "compare")},
+        "results": results,
+    }
+    status = 0
+    if args.compare:
+        with open(args.compare) as f:
+            report["regressions"] = compare(results, json.load(f), args.tolerance)
+        for r in report["regressions"]:
+            print(f"REGRESSION {r['workload']}: {r['baseline_ops_per_sec']:,.1f} -> "
+                  f"{r['ops_per_sec']:,.1f} ops/s ({r['change']:+.1%})", file=sys.stderr)
+        status = 1 if report["regressions"] else 0
+
+    text = json.dumps(report, indent=2)
+    if args.out:
+        with open(args.out, "w") as f:
+            f.write(text + "\n")
+    else:
+        print(text)
+    sys.exit(status)
+
+
+if __name__ == "__main__":
+    main()
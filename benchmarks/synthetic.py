@@ -0,0 +1,102 @@
+# benchmarks/synthetic.py
+# Reproducible synthetic books: accounts.csv, transactions.log and an import file in the
+# app's own formats, at any size. Everything streams, so 10M accounts / 100M log lines
+# never sit in memory. The same seed always produces the same files.
+#
+#   python benchmarks/synthetic.py --out /tmp/book --accounts 1000000 --log-lines 10000000
+import argparse
+import csv
+import datetime
+import os
+import random
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from bank import DEFAULT_START_ACC
+from storage import FIELDNAMES
+
+FIRST_NAMES = ("Aarav", "Priya", "Rahul", "Ananya", "Vikram", "Sneha", "Arjun", "Kavya",
+               "Rohan", "Meera", "Karan", "Isha", "Aditya", "Pooja", "Nikhil", "Divya")
+LAST_NAMES = ("Sharma", "Patel", "Reddy", "Iyer", "Gupta", "Singh", "Nair", "Das",
+              "Mehta", "Rao", "Kumar", "Joshi", "Bose", "Khan", "Verma", "Pillai")
+LOG_OPERATIONS = ("Deposit", "Withdraw", "Transfer-Debit", "Transfer-Credit")
+CHUNK = 100000
+
+
+def holder_name(rng):
+    return f"{rng.choice(FIRST_NAMES)} {rng.choice(LAST_NAMES)}"
+
+
+def write_accounts(path, n, seed=1, closed_ratio=0.05):
+    # account numbers are DEFAULT_START_ACC .. DEFAULT_START_ACC + n - 1, like a fresh bank
+    rng = random.Random(seed)
+    with open(path, "w", newline="") as f:
+        writer = csv.writer(f)
+        writer.writerow(FIELDNAMES)
+        for start in range(0, n, CHUNK):
+            rows = []
+            for i in range(start, min(n, start + CHUNK)):
+                acc_type = "Savings" if rng.random() < 0.7 else "Current"
+                rows.append((DEFAULT_START_ACC + i, holder_name(rng), rng.randint(18, 90),
+                             f"{rng.uniform(1000, 500000):.2f}", acc_type,
+                             "Inactive" if rng.random() < closed_ratio else "Active",
+                             rng.randint(1000, 9999) if rng.random() < 0.5 else ""))
+            writer.writerows(rows)
+
+
+def write_log(path, accounts, lines, seed=2, days=30):
+    # lines spread evenly over the `days` days before today, oldest first (the log is
+    # append-only), so today's withdrawal totals start at zero
+    rng = random.Random(seed)
+    end = datetime.datetime.combine(datetime.date.today(), datetime.time())
+    start = end - datetime.timedelta(days=days)
+    step = (end - start).total_seconds() / max(1, lines)
+    with open(path, "w") as f:
+        for first in range(0, lines, CHUNK):
+            out = []
+            for i in range(first, min(lines, first + CHUNK)):
+                ts = (start + datetime.timedelta(seconds=int(i * step))).isoformat(sep=" ")
+                out.append(f"{ts},{DEFAULT_START_ACC + rng.randrange(accounts)},{rng.choice(LOG_OPERATIONS)},"
+                           f"{rng.uniform(1, 5000):.2f},{rng.uniform(1000, 500000):.2f}\n")
+            f.write("".join(out))
+
+
+def write_import(path, n, seed=3, bad_ratio=0.01):
+    # columns name,age,type,balance as read by option 10; a few rows fail validation
+    rng = random.Random(seed)
+    with open(path, "w", newline="") as f:
+        writer = csv.writer(f)
+        writer.writerow(["name", "age", "type", "balance"])
+        for _ in range(n):
+            age = rng.randint(18, 90) if rng.random() >= bad_ratio else 12
+            acc_type = "Savings" if rng.random() < 0.7 else "Current"
+            writer.writerow([holder_name(rng), age, acc_type, f"{rng.uniform(1000, 50000):.2f}"])
+
+
+def generate(out, accounts, log_lines, import_rows=0, seed=1):
+    os.makedirs(out, exist_ok=True)
+    paths = {"accounts": os.path.join(out, "accounts.csv"), "log": os.path.join(out, "transactions.log")}
+    write_accounts(paths["accounts"], accounts, seed)
+    write_log(paths["log"], max(1, accounts), log_lines, seed + 1)
+    if import_rows:
+        paths["import"] = os.path.join(out, "accounts_import.csv")
+        write_import(paths["import"], import_rows, seed + 2)
+    return paths
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Generate a synthetic book for benchmarking")
+    parser.add_argument("--out", required=True, help="directory to write accounts.csv/transactions.log into")
+    parser.add_argument("--accounts", type=int, default=10000)
+    parser.add_argument("--log-lines", type=int, default=100000)
+    parser.add_argument("--import-rows", type=int, default=0)
+    parser.add_argument("--seed", type=int, default=1)
+    args = parser.parse_args()
+    paths = generate(args.out, args.accounts, args.log_lines, args.import_rows, args.seed)
+    for kind, path in paths.items():
+        print(f"{kind:9} {path} ({os.path.getsize(path):,} bytes)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,199 @@
+# binlog.py
+# Fixed-width binary transaction log, read through mmap, with a sidecar index of
+# record numbers per account so history pages only touch the records asked for.
+#
+#   python binlog.py convert transactions.log transactions.bin
+import datetime
+import mmap
+import os
+import struct
+import sys
+from array import array
+
+# timestamp (epoch seconds), account number, operation code, amount, balance after
+RECORD = struct.Struct("<qqB7xdd")
+INDEX_HEADER = struct.Struct("<8sQ")  # magic, number of records covered
+INDEX_ENTRY = struct.Struct("<qI")    # account number, number of record numbers that follow
+INDEX_MAGIC = b"GDBIDX01"
+
+OPERATIONS = ("Unknown", "Create", "Deposit", "Withdraw", "Close", "Reopen", "Rename",
+              "Transfer-Debit", "Transfer-Credit", "Set-PIN", "Interest")
+OP_CODES = {name: code for code, name in enumerate(OPERATIONS)}
+
+def index_path(filename):
+    return filename + ".idx"
+
+def _to_epoch(timestamp):
+    return int(datetime.datetime.fromisoformat(timestamp).timestamp())
+
+def _from_epoch(seconds):
+    return datetime.datetime.fromtimestamp(seconds).isoformat(sep=" ", timespec="seconds")
+
+class BinaryLog:
+    def __init__(self, filename):
+        self.filename = filename
+        self._open()
+
+    def _open(self):
+        self._f = open(self.filename, "ab")
+        self._map = None
+        self._mapped_size = 0
+        # account number -> array of record numbers, in log order
+        self._index = {}
+        self._records = 0
+        self._index_dirty = False
+        self._load_index()
+
+    # ---------- index ----------
+    def _load_index(self):
+        size = os.path.getsize(self.filename)
+        total = size // RECORD.size
+        if size != total * RECORD.size:
+            # drop a record torn by a crash mid-write so later appends stay aligned
+            os.truncate(self.filename, total * RECORD.size)
+        covered = 0
+        try:
+            with open(index_path(self.filename), "rb") as f:
+                magic, covered = INDEX_HEADER.unpack(f.read(INDEX_HEADER.size))
+                if magic != INDEX_MAGIC or covered > total:
+                    raise ValueError("stale index")
+                while True:
+                    head = f.read(INDEX_ENTRY.size)
+                    if len(head) < INDEX_ENTRY.size:
+                        break
+                    acc, n = INDEX_ENTRY.unpack(head)
+                    positions = array("I")
+                    positions.frombytes(f.read(n * positions.itemsize))
+                    self._index[acc] = positions
+        except (FileNotFoundError, ValueError, struct.error):
+            self._index = {}
+            covered = 0
+        self._records = covered
+        if covered < total:
+            # index whatever was appended after the sidecar was last written
+            self._catch_up(covered, total)
+
+    def _catch_up(self, start, end):
+        view = self._view()
+        for rec in range(start, end):
+            acc = RECORD.unpack_from(view, rec * RECORD.size)[1]
+            self._index.setdefault(acc, array("I")).append(rec)
+        self._records = end
+        self._index_dirty = True
+
+    def _save_index(self):
+        tmp = index_path(self.filename) + ".tmp"
+        with open(tmp, "wb") as f:
+            f.write(INDEX_HEADER.pack(INDEX_MAGIC, self._records))
+            for acc, positions in self._index.items():
+                f.write(INDEX_ENTRY.pack(acc, len(positions)))
+                f.write(positions.tobytes())
+        os.replace(tmp, index_path(self.filename))
+        self._index_dirty = False
+
+    # ---------- writing ----------
+    def append(self, timestamp, account_number, operation, amount, balance_after):
+        self.append_many([(timestamp, account_number, operation, amount, balance_after)])
+
+    def append_many(self, records):
+        buf = bytearray()
+        for timestamp, account_number, operation, amount, balance_after in records:
+            acc = int(account_number)
+            buf += RECORD.pack(_to_epoch(timestamp), acc, OP_CODES.get(operation, 0),
+                               amount, balance_after)
+            self._index.setdefault(acc, array("I")).append(self._records)
+            self._records += 1
+        self._f.write(buf)
+        self._index_dirty = True
+
+    # ---------- reading ----------
+    def _view(self):
+        self._f.flush()
+        size = os.path.getsize(self.filename)
+        if size != self._mapped_size:
+            if self._map is not None:
+                self._map.close()
+            self._map = None
+            if size:
+                with open(self.filename, "rb") as f:
+                    self._map = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+            self._mapped_size = size
+        return self._map if self._map is not None else b""
+
+    def _decode(self, view, rec):
+        ts, acc, op, amount, balance = RECORD.unpack_from(view, rec * RECORD.size)
+        return {
+            "timestamp": _from_epoch(ts),
+            "account_number": acc,
+            "operation": OPERATIONS[op] if op < len(OPERATIONS) else "Unknown",
+            "amount": amount,
+            "balance_after": balance
+        }
+
+    def count(self, account_number):
+        return len(self._index.get(int(account_number), ()))
+
+    def history(self, account_number, offset=0, limit=None):
+        positions = self._index.get(int(account_number))
+        if not positions:
+            return []
+        end = len(positions) if limit is None else offset + limit
+        view = self._view()
+        return [self._decode(view, rec) for rec in positions[offset:end]]
+
+    def __len__(self):
+        return self._records
+
+    # ---------- lifecycle ----------
+    def flush(self):
+        self._f.flush()
+        if self._index_dirty:
+            self._save_index()
+
+    def truncate(self):
+        self.close()
+        open(self.filename, "wb").close()
+        try:
+            os.remove(index_path(self.filename))
+        except FileNotFoundError:
+            pass
+        self._open()
+
+    def close(self):
+        self.flush()
+        if self._map is not None:
+            self._map.close()
+            self._map = None
+            self._mapped_size = 0
+        self._f.close()
+
+def convert_text_log(text_file, binary_file, batch=100000):
+    # rebuilds binary_file (and its index) from a comma-separated transactions.log
+    from transactions import _parse_line
+    for path in (binary_file, index_path(binary_file)):
+        if os.path.exists(path):
+            os.remove(path)
+    log = BinaryLog(binary_file)
+    pending = []
+    with open(text_file, "r") as f:
+        for line in f:
+            t = _parse_line(line)
+            if t is None:
+                continue
+            pending.append((t["timestamp"], t["account_number"], t["operation"],
+                            t["amount"], t["balance_after"]))
+            if len(pending) >= batch:
+                log.append_many(pending)
+                pending = []
+    if pending:
+        log.append_many(pending)
+    converted = len(log)
+    log.close()
+    return converted
+
+if __name__ == "__main__":
+    if len(sys.argv) != 4 or sys.argv[1] != "convert":
+        print("usage: python binlog.py convert <transactions.log> <transactions.bin>")
+        sys.exit(2)
+    n = convert_text_log(sys.argv[2], sys.argv[3])
+    print(f"Converted {n} records into {sys.argv[3]}")
@@ -0,0 +1,235 @@
+# cdc.py
+# Change feed over the transaction log for downstream systems (fraud scoring, reporting,
+# replicas). A Consumer remembers where it got to (log file + byte offset) in a small
+# offsets file and each poll parses only the bytes appended since. Batches are committed
+# once the caller has processed them, so delivery is at-least-once across restarts.
+# Consumers in the same process share a cache of recently parsed batches, so many of them
+# following the tail parse each new entry about once. clear_log (delete_all_accounts)
+# bumps the log epoch; a consumer that sees a new epoch starts over at the new log.
+# A consumer given a segments.SegmentedLog reads that directory without writing to it
+# (no rotation, sealing or compression), so it can run next to the bank's process.
+#
+#   for batch in cdc.subscribe("fraud"):
+#       score(batch)
+#   python cdc.py fraud --follow
+import asyncio
+import gzip
+import json
+import os
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass, asdict
+from typing import List
+
+import transactions as txn
+
+OFFSETS_DIR = "cdc_offsets"
+BATCH_SIZE = 1000
+READ_AHEAD = 4096  # entries parsed per file read, shared through the cache
+CACHE_BATCHES = 64
+POLL_INTERVAL = 0.5  # seconds between polls when following an idle log
+
+@dataclass(frozen=True)
+class Event:
+    timestamp: str
+    account_number: int
+    operation: str
+    amount: float
+    balance_after: float
+    file: str    # log file the entry is in
+    offset: int  # byte offset just past the entry: where a consumer resumes
+
+def _plain(path):
+    # sealed segments may have been gzipped since an offset was taken
+    return path[:-3] if path.endswith(".gz") else path
+
+def _open(path):
+    if os.path.exists(path):
+        return open(path, "rb")
+    if os.path.exists(path + ".gz"):
+        return gzip.open(path + ".gz", "rb")
+    return None
+
+def _size(path):
+    try:
+        return os.path.getsize(path)
+    except FileNotFoundError:
+        return None  # gzipped (or gone): never treated as truncated
+
+def _read(path, start, limit):
+    # up to limit events from complete lines at or after byte start
+    f = _open(path)
+    if f is None:
+        return []
+    events = []
+    with f:
+        f.seek(start)
+        pos = start
+        for line in f:
+            if not line.endswith(b"\n"):
+                break  # still being written; picked up on a later poll
+            pos += len(line)
+            t = txn._parse_line(line.decode("utf-8", errors="replace"))
+            if t is None:
+                continue
+            events.append(Event(t["timestamp"], t["account_number"], t["operation"], t["amount"],
+                                t["balance_after"], path, pos))
+            if len(events) >= limit:
+                break
+    return events
+
+_cache = OrderedDict()  # (epoch, file, start offset) -> events parsed from there
+_cache_lock = threading.Lock()
+
+def _read_cached(epoch, path, start, limit):
+    key = (epoch, path, start)
+    with _cache_lock:
+        events = _cache.get(key)
+        if events is not None:
+            _cache.move_to_end(key)
+            return events[:limit]
+    events = _read(path, start, max(limit, READ_AHEAD))
+    if events:
+        with _cache_lock:
+            _cache[key] = events
+            if len(_cache) > CACHE_BATCHES:
+                _cache.popitem(last=False)
+    return events[:limit]
+
+class Consumer:
+    def __init__(self, name, offsets_dir=OFFSETS_DIR, segments=None):
+        self.name = name
+        self.segments = segments  # a SegmentedLog to read instead of this process's own log
+        self.offsets_path = os.path.join(offsets_dir, name + ".json")
+        self.truncations = 0  # log restarts seen since this consumer was created
+        self.epoch, self.file, self.offset = None, None, 0
+        try:
+            with open(self.offsets_path, "r") as f:
+                saved = json.load(f)
+            self.epoch, self.file, self.offset = saved["epoch"], saved["file"], saved["offset"]
+        except FileNotFoundError:
+            pass
+
+    def _files(self):
+        if self.segments is not None:
+            return [_plain(p) for p in self.segments.files()]
+        return [_plain(p) for p in txn.log_files()]
+
+    def _epoch(self):
+        return txn.log_epoch(self.segments.dirname if self.segments is not None else None)
+
+    def _restart(self, epoch):
+        if self.epoch is not None:
+            self.truncations += 1
+        self.epoch, self.file, self.offset = epoch, None, 0
+
+    def poll(self, max_events=BATCH_SIZE) -> List[Event]:
+        # the next events after the current position, oldest first (empty if none yet)
+        txn.flush_log()
+        epoch = self._epoch()
+        if epoch != self.epoch:
+            self._restart(epoch)
+        files = self._files()
+        if not files:
+            return []
+        if self.file not in files:
+            # first poll, or the file we were in is gone: carry on with the next one
+            later = [f for f in files if self.file is None or f > self.file]
+            self.file, self.offset = (later or files)[0], 0
+        size = _size(self.file)
+        if size is not None and size < self.offset:
+            # shrank under us without an epoch bump yet: read it again from the start
+            self._restart(epoch)
+            self.file = files[0]
+        batch = []
+        i = files.index(self.file)
+        while len(batch) < max_events:
+            events = _read_cached(epoch, self.file, self.offset, max_events - len(batch))
+            if events:
+                batch.extend(events)
+                self.offset = events[-1].offset
+                continue
+            if i + 1 >= len(files):
+                break
+            i += 1
+            self.file, self.offset = files[i], 0
+        return batch
+
+    def commit(self):
+        os.makedirs(os.path.dirname(self.offsets_path) or ".", exist_ok=True)
+        tmp = self.offsets_path + ".tmp"
+        with open(tmp, "w") as f:
+            json.dump({"epoch": self.epoch, "file": self.file, "offset": self.offset}, f)
+        os.replace(tmp, self.offsets_path)
+
+    def seek_to_end(self):
+        # skip the backlog: only entries logged from now on are delivered
+        txn.flush_log()
+        files = self._files()
+        self.epoch = self._epoch()
+        self.file = files[-1] if files else None
+        self.offset = (_size(self.file) or 0) if self.file else 0
+        self.commit()
+
+    def batches(self, batch_size=BATCH_SIZE, follow=True, poll_interval=POLL_INTERVAL):
+        # yields non-empty batches; each one is committed when the next is asked for.
+        # follow=False stops once caught up.
+        while True:
+            batch = self.poll(batch_size)
+            if not batch:
+                if not follow:
+                    return
+                time.sleep(poll_interval)
+                continue
+            yield batch
+            self.commit()
+
+    async def abatches(self, batch_size=BATCH_SIZE, follow=True, poll_interval=POLL_INTERVAL):
+        # async form of batches(); file reads run in the default executor
+        loop = asyncio.get_running_loop()
+        while True:
+            batch = await loop.run_in_executor(None, self.poll, batch_size)
+            if not batch:
+                if not follow:
+                    return
+                await asyncio.sleep(poll_interval)
+                continue
+            yield batch
+            self.commit()
+
+def subscribe(name, batch_size=BATCH_SIZE, follow=True, offsets_dir=OFFSETS_DIR):
+    return Consumer(name, offsets_dir).batches(batch_size, follow)
+
+def main():
+    import argparse
+    parser = argparse.ArgumentParser(description="Print new transaction log entries as JSON lines")
+    parser.add_argument("name", help="consumer name; its offset is kept in --offsets-dir")
+    parser.add_argument("--log", default="transactions.log")
+    parser.add_argument("--segments", help="day-segmented log directory (instead of --log)")
+    parser.add_argument("--offsets-dir", default=OFFSETS_DIR)
+    parser.add_argument("--batch", type=int, default=BATCH_SIZE)
+    parser.add_argument("--follow", action="store_true", help="keep waiting for new entries")
+    parser.add_argument("--from-end", action="store_true", help="skip everything logged so far")
+    args = parser.parse_args()
+    segments = None
+    if args.segments:
+        # read-only: the bank's process owns rotation, sealing and manifests
+        if not os.path.isdir(args.segments):
+            parser.error(f"no segment directory {args.segments!r}")
+        from segments import SegmentedLog
+        segments = SegmentedLog(args.segments)
+    else:
+        txn.LOGFILE = args.log
+    consumer = Consumer(args.name, args.offsets_dir, segments)
+    if args.from_end:
+        consumer.seek_to_end()
+    try:
+        for batch in consumer.batches(args.batch, follow=args.follow):
+            for event in batch:
+                print(json.dumps(asdict(event)))
+    except KeyboardInterrupt:
+        pass
+
+if __name__ == "__main__":
+    main()
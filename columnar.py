@@ -0,0 +1,325 @@
+# columnar.py
+# Column-oriented account book (Bank(columnar=True)): one row per account, with the
+# number, balance, age, type, status and PIN in typed arrays and the holder names in a
+# list. NumPy arrays when NumPy is installed, otherwise the stdlib array module.
+# The store replaces the Account objects rather than copying them: Bank reads accounts
+# through backends.LazyAccounts/LazyIndex (the store answers get/iter_rows/count like a
+# storage backend), so only recently used accounts exist as objects. ColumnStats answers
+# the dashboards (active count, average balance, youngest/oldest, top N) with vectorised
+# passes and argpartition. With NumPy a row costs ~22 bytes of columns plus its name,
+# against ~250 bytes for an Account object and its index and aggregate entries.
+# Rows stay in book order; numbers are found by binary search over the rows appended in
+# ascending order (all of them, for books numbered by Bank), with a dict for the rest.
+import heapq
+import sys
+import threading
+from array import array
+from bisect import bisect_left
+from typing import Dict, List, Optional
+
+from account import Account
+from storage import CACHE_FIELDS
+
+try:
+    import numpy as np
+except ImportError:  # optional dependency
+    np = None
+
+ACCOUNT_TYPES = ("Savings", "Current")
+TYPE_CODES = {name: code for code, name in enumerate(ACCOUNT_TYPES)}
+# the active column is status == "Active"; "Inactive" is the only other status Bank sets
+OTHER_STATUS = "Inactive"
+NO_PIN = -1
+PIN_MAX = 32767  # int16; PINs are 4 digits
+PAGE_SIZE = 10000  # rows read per lock hold when iterating
+
+# (name, numpy dtype, array typecode)
+COLUMNS = (("numbers", "int64", "q"), ("balances", "float64", "d"), ("ages", "int32", "i"),
+           ("types", "int8", "b"), ("active", "bool", "b"), ("pins", "int16", "h"))
+
+class ColumnStore:
+    def __init__(self, capacity=1024):
+        self._lock = threading.Lock()
+        self._reset(capacity)
+
+    def _reset(self, capacity=1024):
+        self.size = 0
+        self.names: List[str] = []
+        # rows [0, _sorted) hold ascending numbers (binary search); later rows are in _late
+        self._sorted = 0
+        self._first = 0  # number in row 0
+        self._late: Dict[int, int] = {}
+        # row -> {field: value} for values the code columns can't hold (an unknown type
+        # or status, an out-of-range PIN); rare, so a dict rather than more columns
+        self._other: Dict[int, dict] = {}
+        for name, dtype, typecode in COLUMNS:
+            setattr(self, name, np.zeros(capacity, dtype=dtype) if np is not None else array(typecode))
+
+    @property
+    def vectorized(self):
+        return np is not None
+
+    # ---------- rows ----------
+    def _grow(self):
+        capacity = max(1024, 2 * len(self.balances))
+        for name, _, _ in COLUMNS:
+            old = getattr(self, name)
+            new = np.zeros(capacity, dtype=old.dtype)
+            new[:self.size] = old[:self.size]
+            setattr(self, name, new)
+
+    def _row(self, number) -> Optional[int]:
+        # Bank numbers accounts consecutively, so the row is usually number - first number
+        if self._sorted:
+            guess = number - self._first
+            if 0 <= guess < self._sorted and self.numbers[guess] == number:
+                return guess
+        if np is not None:
+            i = int(np.searchsorted(self.numbers[:self._sorted], number))
+        else:
+            i = bisect_left(self.numbers, number, 0, self._sorted)
+        if i < self._sorted and self.numbers[i] == number:
+            return i
+        return self._late.get(number)
+
+    def _set(self, row, acc):
+        # every field but the number
+        other = {}
+        type_code = TYPE_CODES.get(acc.account_type)
+        if type_code is None:
+            type_code = 0
+            other["account_type"] = acc.account_type
+        if acc.status != "Active" and acc.status != OTHER_STATUS:
+            other["status"] = acc.status
+        pin = acc.pin
+        if pin is None:
+            pin = NO_PIN
+        elif not 0 <= pin <= PIN_MAX:
+            other["pin"] = pin
+            pin = NO_PIN
+        self.names[row] = acc.name
+        self.balances[row] = acc.balance
+        self.ages[row] = acc.age
+        self.types[row] = type_code
+        self.active[row] = acc.status == "Active"
+        self.pins[row] = pin
+        if other:
+            self._other[row] = other
+        else:
+            self._other.pop(row, None)
+
+    def _append(self, acc):
+        row = self.size
+        number = acc.account_number
+        if np is not None:
+            if row >= len(self.balances):
+                self._grow()
+            self.numbers[row] = number
+        else:
+            for name, _, _ in COLUMNS:
+                getattr(self, name).append(0)
+            self.numbers[row] = number
+        self.names.append(acc.name)
+        self._set(row, acc)
+        if row == 0:
+            self._first = number
+        if self._sorted == row and (row == 0 or number > self.numbers[row - 1]):
+            self._sorted += 1
+        else:
+            self._late[number] = row
+        self.size = row + 1
+
+    # ---------- kept in sync with Bank (a view, see Bank._record_change) ----------
+    def upsert(self, acc):
+        # under the lock even for an existing row, so a write can't land in the arrays
+        # _grow is just replacing
+        with self._lock:
+            row = self._row(acc.account_number)
+            if row is None:
+                self._append(acc)
+            else:
+                self._set(row, acc)
+
+    def update_balances(self, accounts):
+        # bulk balance refresh for accounts that are already in the store
+        with self._lock:
+            rows = [self._row(a.account_number) for a in accounts]
+            if np is not None:
+                self.balances[np.array(rows, dtype=np.int64)] = np.fromiter(
+                    (a.balance for a in accounts), dtype=np.float64, count=len(accounts))
+            else:
+                for row, a in zip(rows, accounts):
+                    self.balances[row] = a.balance
+
+    def load(self, accounts):
+        self.clear()
+        with self._lock:
+            for acc in accounts:
+                if self._row(acc.account_number) is None:
+                    self._append(acc)
+
+    def clear(self):
+        with self._lock:
+            self._reset()
+
+    # ---------- read like a storage backend (see backends.LazyAccounts/LazyIndex) ----------
+    def get(self, number) -> Optional[Account]:
+        with self._lock:
+            row = self._row(number)
+            if row is None:
+                return None
+            pin = int(self.pins[row])
+            acc = Account(number, self.names[row], int(self.ages[row]), float(self.balances[row]),
+                          ACCOUNT_TYPES[self.types[row]], "Active" if self.active[row] else OTHER_STATUS,
+                          None if pin == NO_PIN else pin)
+            acc.__dict__.update(self._other.get(row, ()))
+            return acc
+
+    def iter_rows(self):
+        # CACHE_FIELDS-ordered tuples in book order, a page of rows per lock hold
+        start = 0
+        while True:
+            with self._lock:
+                rows = self._rows(start, min(self.size, start + PAGE_SIZE))
+            if not rows:
+                return
+            yield from rows
+            start += len(rows)
+
+    def _rows(self, start, stop):
+        if start >= stop:
+            return []
+        columns = [getattr(self, name)[start:stop] for name, _, _ in COLUMNS]
+        if np is not None:
+            columns = [c.tolist() for c in columns]
+        numbers, balances, ages, types, active, pins = columns
+        rows = [(n, name, a, b, ACCOUNT_TYPES[t], "Active" if s else OTHER_STATUS, None if p == NO_PIN else p)
+                for n, name, a, b, t, s, p in zip(numbers, self.names[start:stop], ages, balances, types,
+                                                   active, pins)]
+        for row, other in self._other.items():
+            if start <= row < stop:
+                values = list(rows[row - start])
+                for field, value in other.items():
+                    values[CACHE_FIELDS.index(field)] = value
+                rows[row - start] = tuple(values)
+        return rows
+
+    def snapshot_rows(self):
+        # point-in-time copy of the whole book as rows (see export.take_snapshot)
+        with self._lock:
+            return self._rows(0, self.size)
+
+    def accounts(self):
+        # the book as fresh Account objects, for backend.save (which may iterate twice)
+        return _Accounts(self)
+
+    def count(self):
+        return self.size
+
+    def added(self, n):
+        # rows are appended by the upsert in Bank._record_change, not registered ahead
+        pass
+
+    def nbytes(self):
+        # memory held by the store: the allocated columns, the name list and its strings,
+        # and the (normally empty) side tables
+        if np is not None:
+            columns = sum(getattr(self, name).nbytes for name, _, _ in COLUMNS)
+        else:
+            columns = sum(getattr(self, name).itemsize * len(getattr(self, name)) for name, _, _ in COLUMNS)
+        names = sys.getsizeof(self.names) + sum(map(sys.getsizeof, self.names))
+        return columns + names + sys.getsizeof(self._late) + sys.getsizeof(self._other)
+
+class _Accounts:
+    def __init__(self, store: ColumnStore):
+        self.store = store
+
+    def __iter__(self):
+        for row in self.store.iter_rows():
+            yield Account(*row)
+
+class ColumnStats:
+    # same interface as aggregates.BookStats, answered from the columns
+    def __init__(self, store: ColumnStore):
+        self.store = store
+
+    # nothing to maintain: the columns are the view
+    def load(self, accounts):
+        pass
+
+    def upsert(self, acc):
+        pass
+
+    def clear(self):
+        pass
+
+    @property
+    def accounts(self):
+        return self.store.size
+
+    @property
+    def closed(self):
+        return self.accounts - self.active
+
+    @property
+    def active(self):
+        store = self.store
+        with store._lock:
+            if np is not None:
+                return int(np.count_nonzero(store.active[:store.size]))
+            return sum(store.active)
+
+    def average_balance(self):
+        # summed in paise like BookStats, so both modes give the same figure
+        store = self.store
+        with store._lock:
+            if not store.size:
+                return 0.0
+            if np is not None:
+                cents = int(np.rint(store.balances[:store.size] * 100).astype(np.int64).sum())
+            else:
+                cents = sum(round(b * 100) for b in store.balances)
+            return cents / 100.0 / store.size
+
+    def _first_by_age(self, pick):
+        # number of the first row (book order) with the min/max age
+        store = self.store
+        with store._lock:
+            if not store.size:
+                return None
+            if np is not None:
+                ages = store.ages[:store.size]
+                row = int(ages.argmin() if pick is min else ages.argmax())
+            else:
+                row = pick(range(store.size), key=store.ages.__getitem__)
+            return int(store.numbers[row])
+
+    def youngest(self):
+        return self._first_by_age(min)
+
+    def oldest(self):
+        return self._first_by_age(max)
+
+    def top_n(self, n) -> List[int]:
+        # highest balances first, ties in book order (as sorted(..., reverse=True))
+        store = self.store
+        with store._lock:
+            size = store.size
+            n = min(max(0, n), size)
+            if not n:
+                return []
+            if np is None:
+                rows = heapq.nlargest(n, range(size), key=lambda i: (store.balances[i], -i))
+                return [store.numbers[i] for i in rows]
+            balances = store.balances[:size]
+            if n < size:
+                # the n-th highest balance, then every row above it plus the first rows
+                # (book order) at it
+                cutoff = balances[np.argpartition(balances, size - n)[size - n]]
+                above = np.flatnonzero(balances > cutoff)
+                at = np.flatnonzero(balances == cutoff)[:n - len(above)]
+                rows = np.concatenate((above, at))
+            else:
+                rows = np.arange(size)
+            rows = rows[np.lexsort((rows, -balances[rows]))]
+            return store.numbers[rows].tolist()
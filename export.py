@@ -0,0 +1,167 @@
+# export.py
+# Background export of the book. The caller only pays for a point-in-time copy of the
+# account fields (one tuple per account, taken under the locks by Bank); filtering,
+# formatting, compression and the disk writes happen on a worker thread while the bank
+# keeps serving. Jobs are not daemon threads, so the interpreter finishes them before
+# exiting.
+#
+#   job = bank.export_accounts_to_file("active.csv.gz", status="active", columns=["account_number", "balance"],
+#                                      background=True, progress=print)
+#   job.wait()
+import csv
+import gzip
+import os
+import threading
+from operator import attrgetter, itemgetter
+from typing import Callable, Iterable, List, Optional
+
+from storage import CACHE_FIELDS, FIELDNAMES
+
+CHUNK_ROWS = 10000  # rows formatted and written per step; progress is reported per chunk
+STATUSES = {"active": "Active", "closed": "Inactive"}
+# accounts.csv column -> position in a snapshot row (laid out like CACHE_FIELDS)
+COLUMN_INDEX = {name: i for i, name in enumerate(FIELDNAMES)}
+_snapshot_row = attrgetter(*CACHE_FIELDS)
+
+def take_snapshot(accounts) -> List[tuple]:
+    # (account_number, name, age, balance, type, status, pin) per account; tuples are
+    # immutable, so later changes to the accounts don't reach the copy
+    return list(map(_snapshot_row, accounts))
+
+def _columns(columns):
+    if not columns:
+        return list(FIELDNAMES)
+    unknown = [c for c in columns if c not in COLUMN_INDEX]
+    if unknown:
+        raise ValueError(f"Unknown export column(s): {', '.join(unknown)}. Use: {', '.join(FIELDNAMES)}.")
+    return list(columns)
+
+def _filter(rows, status=None, account_type=None):
+    if status is not None:
+        if status.lower() not in STATUSES:
+            raise ValueError("Export status filter must be 'active' or 'closed'.")
+        wanted = STATUSES[status.lower()]
+        # anything not Active counts as closed, as in list_closed_accounts
+        rows = (r for r in rows if (r[5] == "Active") == (wanted == "Active"))
+    if account_type is not None:
+        account_type = account_type.capitalize()
+        rows = (r for r in rows if r[4] == account_type)
+    return rows
+
+def _formatter(indexes):
+    # snapshot row -> output row with the same text as storage.account_row (csv.writer
+    # already writes a None pin as an empty field; only the balance needs formatting)
+    if 3 not in indexes:
+        project = itemgetter(*indexes)
+        return (lambda row: (project(row),)) if len(indexes) == 1 else project
+    if indexes == list(range(len(FIELDNAMES))):
+        return lambda r: (r[0], r[1], r[2], f"{r[3]:.2f}", r[4], r[5], r[6])
+    position = indexes.index(3)
+
+    def fmt(row):
+        out = [row[i] for i in indexes]
+        out[position] = f"{out[position]:.2f}"
+        return out
+    return fmt
+
+def write_rows(rows: Iterable[tuple], filename, columns=None, compress=None,
+               progress: Optional[Callable[[int], None]] = None):
+    # writes snapshot rows as CSV (gzipped for compress=True or a .gz filename) through a
+    # temp file, so readers never see a half-written export. Returns rows written.
+    columns = _columns(columns)
+    fmt = _formatter([COLUMN_INDEX[c] for c in columns])
+    compress = filename.endswith(".gz") if compress is None else compress
+    tmp = filename + ".tmp"
+    written = 0
+    with (gzip.open(tmp, "wt", newline="", compresslevel=6) if compress else open(tmp, "w", newline="")) as f:
+        writer = csv.writer(f)
+        writer.writerow(columns)
+        chunk = []
+        for row in rows:
+            chunk.append(fmt(row))
+            if len(chunk) >= CHUNK_ROWS:
+                writer.writerows(chunk)
+                written += len(chunk)
+                chunk = []
+                if progress:
+                    progress(written)
+        writer.writerows(chunk)
+        written += len(chunk)
+    os.replace(tmp, filename)
+    return written
+
+class BackgroundTask:
+    # runs target() on its own (non-daemon) thread; done/result/error once it finishes
+    def __init__(self, target, on_done: Optional[Callable] = None, name="gdb-task"):
+        self._target = target
+        self._on_done = on_done
+        self._thread = threading.Thread(target=self._run, name=name)
+        self.result = None
+        self.error: Optional[BaseException] = None
+        self._finished = threading.Event()
+
+    def start(self):
+        self._thread.start()
+        return self
+
+    def run(self):
+        # the same work in the caller's thread
+        self._run()
+        if self.error is not None:
+            raise self.error
+        return self.result
+
+    def _run(self):
+        try:
+            self.result = self._target()
+        except BaseException as e:
+            self.error = e
+        finally:
+            # on_done runs before waiters are released, so its output comes first
+            try:
+                if self._on_done:
+                    self._on_done(self)
+            finally:
+                self._finished.set()
+
+    @property
+    def done(self):
+        return self._finished.is_set()
+
+    def wait(self, timeout=None):
+        # the result, re-raising whatever the task raised; None if still running at timeout
+        if not self._finished.wait(timeout):
+            return None
+        if self.error is not None:
+            raise self.error
+        return self.result
+
+class ExportJob(BackgroundTask):
+    def __init__(self, rows, filename, status=None, account_type=None, columns=None, compress=None,
+                 total: Optional[int] = None, progress: Optional[Callable[[dict], None]] = None,
+                 on_done: Optional[Callable] = None):
+        # reject bad columns and filters before anything starts
+        _columns(columns)
+        _filter((), status, account_type)
+        super().__init__(self._export, on_done, name="gdb-export")
+        self.rows = rows  # a snapshot list, or a callable returning an iterable (read on the worker)
+        self.filename = filename
+        self.status = status
+        self.account_type = account_type
+        self.columns = columns
+        self.compress = compress
+        self.total = total  # accounts in the snapshot, before filtering (None if unknown)
+        self.written = 0
+        self._progress = progress
+
+    def _report(self, written):
+        self.written = written
+        if self._progress:
+            self._progress({"filename": self.filename, "written": written, "total": self.total})
+
+    def _export(self):
+        rows = self.rows() if callable(self.rows) else self.rows
+        written = write_rows(_filter(rows, self.status, self.account_type), self.filename,
+                             self.columns, self.compress, self._report)
+        self.written = written
+        return {"filename": self.filename, "written": written}
@@ -0,0 +1,96 @@
+# importer.py
+# Streaming account import: rows are read in chunks, parsed and validated in a process
+# pool, and handed back in file order. Only a bounded number of chunks is in flight,
+# so memory stays flat however large the import file is.
+import csv
+import os
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+
+CHUNK_SIZE = 50000
+INLINE_BELOW_BYTES = 1 << 20  # smaller files are validated in-process
+REJECT_FIELDS = ["line", "reason"]
+
+def reject_path(filename):
+    root, _ = os.path.splitext(filename)
+    return root + ".rejects.csv"
+
+def _validate_chunk(fieldnames, first_line, lines):
+    # runs in a worker process: parses raw CSV lines and returns
+    # (valid rows, rejected (line, row, reason) triples)
+    from bank import validate_new_account
+    valid = []
+    rejected = []
+    for line, row in enumerate(csv.DictReader(lines, fieldnames=fieldnames), start=first_line):
+        try:
+            name = row["name"].strip()
+            age = int(row["age"])
+            acc_type = row.get("type", "Savings")
+            balance = float(row.get("balance", 0.0))
+        except Exception as e:
+            rejected.append((line, row, f"Unparseable row: {e}"))
+            continue
+        try:
+            acc_type = validate_new_account(name, age, acc_type, balance)
+        except ValueError as e:
+            rejected.append((line, row, str(e)))
+            continue
+        valid.append((name, age, acc_type, balance))
+    return valid, rejected
+
+def _read_chunks(f, chunk_size):
+    # splits the raw file into chunks of whole records without parsing them;
+    # a quoted field spanning lines keeps its record together
+    chunk = []
+    first_line = line_no = 2  # line 1 is the header
+    pending = ""
+    for raw in f:
+        line_no += 1
+        if pending:
+            raw = pending + raw
+            pending = ""
+        if raw.count('"') % 2:
+            pending = raw
+            continue
+        if not raw.strip():
+            continue
+        chunk.append(raw)
+        if len(chunk) >= chunk_size:
+            yield first_line, chunk
+            first_line = line_no
+            chunk = []
+    if pending:
+        chunk.append(pending)
+    if chunk:
+        yield first_line, chunk
+
+def validated_chunks(filename, reject_file, workers=None, chunk_size=CHUNK_SIZE):
+    # yields (valid rows, number rejected) per chunk, in file order.
+    # workers=0 validates in this process (no pool start-up cost for small files).
+    if workers is None:
+        workers = 0 if os.path.getsize(filename) < INLINE_BELOW_BYTES else (os.cpu_count() or 1)
+    with open(filename, "r", newline="") as f, open(reject_file, "w", newline="") as rf:
+        fieldnames = next(csv.reader([f.readline()]), [])
+        rejects = csv.writer(rf)
+        rejects.writerow(REJECT_FIELDS + fieldnames)
+
+        def emit(result):
+            valid, rejected = result
+            for line, row, reason in rejected:
+                rejects.writerow([line, reason] + [row.get(k) or "" for k in fieldnames])
+            return valid, len(rejected)
+
+        chunks = _read_chunks(f, chunk_size)
+        if workers == 0:
+            for first_line, lines in chunks:
+                yield emit(_validate_chunk(fieldnames, first_line, lines))
+            return
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            in_flight = deque()
+            max_in_flight = 2 * workers
+            for first_line, lines in chunks:
+                in_flight.append(pool.submit(_validate_chunk, fieldnames, first_line, lines))
+                if len(in_flight) >= max_in_flight:
+                    yield emit(in_flight.popleft().result())
+            while in_flight:
+                yield emit(in_flight.popleft().result())
@@ -0,0 +1,89 @@
+# journal.py
+import csv
+import io
+import os
+from typing import Optional, Set
+
+from account import Account
+from storage import FIELDNAMES
+from transactions import LogWriter, FLUSH_ALWAYS
+
+def journal_path(accounts_file):
+    return accounts_file + ".journal"
+
+class AccountJournal:
+    # append-only record of account mutations since the last snapshot of accounts.csv;
+    # each entry holds the full account row so replaying it twice is harmless.
+    # A change can carry a marker (a partition.py transfer id) in the same row, so the
+    # marker is on disk exactly when the change is; markers survive reset() until
+    # forget() says they are kept elsewhere.
+    def __init__(self, filename, mode=FLUSH_ALWAYS, entries=0, markers: Optional[Set[str]] = None):
+        self.filename = filename
+        self.mode = mode
+        self.entries = entries
+        self.markers = set(markers or ())
+        self._writer = LogWriter(filename, mode=mode)
+
+    # entries are CSV rows: "put" followed by the accounts.csv columns (and the marker, if
+    # any), or "mark" and a marker carried over by reset()
+    def record(self, account: Account):
+        self.record_many((account,))
+
+    def record_many(self, accounts, marker: Optional[str] = None):
+        buf = io.StringIO()
+        writer = csv.writer(buf, lineterminator="\n")
+        tail = () if marker is None else (marker,)
+        rows = [("put",) + tuple(a.to_dict().values()) + tail for a in accounts]
+        writer.writerows(rows)
+        if not self._writer.write(buf.getvalue()):
+            raise ValueError("Account journal is closed.")
+        self.entries += len(rows)
+        if marker is not None:
+            self.markers.add(marker)
+
+    def forget(self, markers):
+        self.markers.difference_update(markers)
+
+    def reset(self):
+        # called once a snapshot containing every journaled change is safely on disk; the
+        # new journal (holding only the markers) replaces the old one in one rename
+        self._writer.close()
+        tmp = self.filename + ".tmp"
+        with open(tmp, "w", newline="") as f:
+            csv.writer(f, lineterminator="\n").writerows(("mark", m) for m in sorted(self.markers))
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp, self.filename)
+        self.entries = 0
+        self._writer = LogWriter(self.filename, mode=self.mode)
+
+    def flush(self):
+        self._writer.flush()
+
+    def close(self):
+        self._writer.close()
+
+def read_journal(filename, markers: Optional[Set[str]] = None):
+    # yields Account objects in journal order, adding the markers found to markers; a
+    # torn last line from a crash is ignored (its marker with it)
+    if not os.path.exists(filename):
+        return
+    with open(filename, "r", newline="") as f:
+        for fields in csv.reader(f):
+            if not fields:
+                continue
+            if fields[0] == "mark" and len(fields) == 2:
+                if markers is not None:
+                    markers.add(fields[1])
+                continue
+            if len(fields) not in (len(FIELDNAMES) + 1, len(FIELDNAMES) + 2):
+                continue
+            op, row = fields[0], dict(zip(FIELDNAMES, fields[1:]))
+            if op == "put":
+                try:
+                    acc = Account.from_dict(row)
+                except (KeyError, ValueError):
+                    continue
+                if markers is not None and len(fields) == len(FIELDNAMES) + 2:
+                    markers.add(fields[-1])
+                yield acc
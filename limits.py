@@ -0,0 +1,147 @@
+# limits.py
+# Velocity limits on debits (withdrawals and transfers out): per account type, caps on
+# the amount and/or number of debits in a rolling hour, day and 30 days. Each account
+# keeps one ring of buckets per window (minutes for the hour, hours for the day, days for
+# 30 days) with running totals, so a check costs the same however busy the account is.
+# A window covers its last N buckets including the current one, so it is exact to one
+# bucket width. Rebuilt from the recent log at startup (Bank.__init__).
+#
+# Limits come from a JSON file (GDB_LIMITS=limits.json), by type and window, e.g.
+#   {"Savings": {"hour": {"count": 5}, "day": {"amount": 50000}, "30d": {"amount": 500000}},
+#    "Current": {"day": {"amount": 200000, "count": 100}}}
+# Types missing from the file keep DEFAULT_LIMITS.
+import datetime
+import json
+import time
+from typing import Dict, Optional
+
+from columnar import ACCOUNT_TYPES
+from transactions import DEBIT_OPERATIONS
+
+DAILY_WITHDRAW_LIMIT = 50000.0
+# window -> (bucket width in seconds, buckets, label used in errors, span used in errors)
+WINDOWS = {
+    "hour": (60, 60, "Hourly", "hour"),
+    "day": (3600, 24, "Daily", "24 hours"),
+    "30d": (86400, 30, "30-day", "30 days"),
+}
+CAPS = ("amount", "count")
+DEFAULT_LIMITS = {acc_type: {"day": {"amount": DAILY_WITHDRAW_LIMIT}} for acc_type in ACCOUNT_TYPES}
+
+def validate(limits: Dict[str, dict]) -> Dict[str, dict]:
+    # DEFAULT_LIMITS with the types in limits replaced; raises ValueError on anything unknown
+    merged = dict(DEFAULT_LIMITS)
+    for acc_type, windows in limits.items():
+        if acc_type not in ACCOUNT_TYPES:
+            raise ValueError(f"Unknown account type in limits: {acc_type}.")
+        for window, caps in windows.items():
+            if window not in WINDOWS:
+                raise ValueError(f"Unknown limit window {window!r}; use one of {', '.join(WINDOWS)}.")
+            for cap, value in caps.items():
+                if cap not in CAPS:
+                    raise ValueError(f"Unknown limit {cap!r} for {acc_type} {window}; use amount or count.")
+                if value is not None and value < 0:
+                    raise ValueError("Limits cannot be negative.")
+        merged[acc_type] = windows
+    return merged
+
+def load_config(filename) -> Dict[str, dict]:
+    with open(filename, "r") as f:
+        return validate(json.load(f))
+
+def _epoch(timestamp):
+    # log timestamps are local time, like time.time() is read back here
+    return datetime.datetime.fromisoformat(timestamp).timestamp()
+
+class _Ring:
+    # one account's buckets for one window, with their running totals
+    __slots__ = ("head", "amounts", "counts", "amount", "count")
+
+    def __init__(self, buckets):
+        self.head = None  # bucket id of the newest bucket
+        self.amounts = [0.0] * buckets
+        self.counts = [0] * buckets
+        self.amount = 0.0
+        self.count = 0
+
+    def advance(self, bucket):
+        # empties the buckets that fell out of the window: at most one full turn
+        if self.head is None:
+            self.head = bucket
+            return
+        if bucket <= self.head:
+            return
+        n = len(self.amounts)
+        for b in range(self.head + 1, self.head + 1 + min(bucket - self.head, n)):
+            i = b % n
+            self.amount -= self.amounts[i]
+            self.count -= self.counts[i]
+            self.amounts[i] = 0.0
+            self.counts[i] = 0
+        if self.count == 0:
+            self.amount = 0.0  # no float residue once the window is empty
+        self.head = bucket
+
+    def add(self, bucket, amount):
+        self.advance(bucket)
+        if bucket <= self.head - len(self.amounts):
+            return  # older than the window (rebuild reads the log newest first)
+        i = bucket % len(self.amounts)
+        self.amounts[i] += amount
+        self.counts[i] += 1
+        self.amount += amount
+        self.count += 1
+
+class VelocityLimits:
+    def __init__(self, limits: Optional[Dict[str, dict]] = None):
+        self.limits = validate(limits or {})
+        # only windows some type has a cap on are tracked
+        self.windows = [w for w in WINDOWS if any(w in windows for windows in self.limits.values())]
+        self._rings: Dict[int, dict] = {}
+
+    def horizon(self):
+        # seconds of log needed to rebuild every tracked window
+        return max((WINDOWS[w][0] * WINDOWS[w][1] for w in self.windows), default=0)
+
+    def record(self, account_number, amount, when=None):
+        when = time.time() if when is None else when
+        rings = self._rings.get(account_number)
+        if rings is None:
+            rings = self._rings[account_number] = {w: _Ring(WINDOWS[w][1]) for w in self.windows}
+        for window, ring in rings.items():
+            ring.add(int(when // WINDOWS[window][0]), amount)
+
+    def usage(self, account_number, window, now=None):
+        # (amount, count) debited in the window ending now
+        rings = self._rings.get(account_number)
+        if rings is None or window not in rings:
+            return 0.0, 0
+        ring = rings[window]
+        ring.advance(int((time.time() if now is None else now) // WINDOWS[window][0]))
+        return ring.amount, ring.count
+
+    def check(self, account_number, account_type, amount, pending_amount=0.0, pending_count=0, now=None):
+        # raises PermissionError if debiting amount would break any cap for the type;
+        # pending_* are debits accepted but not yet recorded (apply_batch)
+        for window, caps in self.limits.get(account_type, {}).items():
+            used, count = self.usage(account_number, window, now)
+            used += pending_amount
+            count += pending_count
+            _, _, label, span = WINDOWS[window]
+            cap = caps.get("amount")
+            if cap is not None and used + amount > cap:
+                raise PermissionError(f"{label} withdrawal/transfer limit of ₹{cap} exceeded. "
+                                      f"Already debited ₹{used:.2f} in the last {span}.")
+            cap = caps.get("count")
+            if cap is not None and count + 1 > cap:
+                raise PermissionError(f"{label} limit of {cap} withdrawals/transfers reached.")
+
+    def rebuild(self, entries):
+        # entries: log dicts from the last horizon() seconds, in any order
+        self._rings = {}
+        for t in entries:
+            if t["operation"].lower() in DEBIT_OPERATIONS:
+                self.record(t["account_number"], t["amount"], _epoch(t["timestamp"]))
+
+    def clear(self):
+        self._rings = {}
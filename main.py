@@ -1,13 +1,117 @@
 # main.py
 from bank import Bank
 from utils import prompt_int, prompt_float
+import transactions as txn
+import importer
+import api
+import interest
+import limits
+import metrics
+import argparse
+import contextlib
+import json
+import os
 import sys
+import time
+
+HISTORY_PAGE_SIZE = 20
 
 def print_account_basic(acc):
     print(f"Account #{acc.account_number} | Name: {acc.name} | Age: {acc.age} | Type: {acc.account_type} | Balance: ₹{acc.balance:.2f} | Status: {acc.status}")
 
+def configure_log_from_env():
+    # GDB_LOG_MODE: always/batch/fsync; GDB_BINARY_LOG: binary mirror for paged history;
+    # GDB_LOG_SEGMENTS: one log file per day in that directory (GDB_LOG_COMPRESS_DAYS
+    # gzips segments older than that many days)
+    txn.configure_log(os.environ.get("GDB_LOG_MODE", txn.FLUSH_ALWAYS))
+    if os.environ.get("GDB_LOG_SEGMENTS"):
+        days = os.environ.get("GDB_LOG_COMPRESS_DAYS")
+        txn.enable_segmented_log(os.environ["GDB_LOG_SEGMENTS"], int(days) if days else None)
+    if os.environ.get("GDB_BINARY_LOG"):
+        txn.enable_binary_log(os.environ["GDB_BINARY_LOG"])
+
+def open_bank():
+    # GDB_COLUMNAR=1 holds the book in a column store: less memory, vectorised analytics (NumPy if installed)
+    # GDB_ACCOUNTS points at accounts.csv, a sharded directory or an SQLite bank.db (see backends.py)
+    # GDB_LIMITS names a JSON file of per-account-type velocity limits (see limits.py)
+    # GDB_LOG_MODE applies to the account journal as well as the transaction log
+    bank = Bank(accounts_file=os.environ.get("GDB_ACCOUNTS", "accounts.csv"),
+                journal_mode=os.environ.get("GDB_LOG_MODE", txn.FLUSH_ALWAYS),
+                columnar=os.environ.get("GDB_COLUMNAR") == "1",
+                velocity_limits=limits.load_config(os.environ["GDB_LIMITS"]) if os.environ.get("GDB_LIMITS") else None)
+    # GDB_METRICS=1 records call counts and latencies (option 25)
+    if os.environ.get("GDB_METRICS") == "1":
+        metrics.enable()
+    return bank
+
+def run_script(bank, lines, out, errors_only=False):
+    # Headless mode: one api.py request per line (JSON, e.g. {"op": "deposit", "account":
+    # 1001, "amount": 500}); blank lines and lines starting with # are skipped. Writes one
+    # JSON response per request (only the failed ones with errors_only), each carrying the
+    # request's line number, and returns the totals.
+    summary = {"operations": 0, "ok": 0, "errors": 0, "errors_by_type": {}}
+    started = time.perf_counter()
+    for number, line in enumerate(lines, 1):
+        line = line.strip()
+        if not line or line.startswith("#"):
+            continue
+        try:
+            req = api.loads(line)
+        except ValueError as e:
+            response = {"ok": False, "error": f"Invalid JSON: {e}", "error_type": "ValueError"}
+        else:
+            response = api.handle(bank, req)
+        summary["operations"] += 1
+        if response["ok"]:
+            summary["ok"] += 1
+        else:
+            summary["errors"] += 1
+            by_type = summary["errors_by_type"]
+            by_type[response["error_type"]] = by_type.get(response["error_type"], 0) + 1
+        if errors_only and response["ok"]:
+            continue
+        response["line"] = number
+        out.write(json.dumps(response, ensure_ascii=False) + "\n")
+    elapsed = time.perf_counter() - started
+    summary["seconds"] = round(elapsed, 3)
+    summary["operations_per_second"] = round(summary["operations"] / elapsed) if elapsed > 0 else None
+    return summary
+
+def main_script(args):
+    # logging goes through the batching writer unless GDB_LOG_MODE says otherwise
+    os.environ.setdefault("GDB_LOG_MODE", txn.FLUSH_BATCH)
+    configure_log_from_env()
+    bank = open_bank()
+    source = sys.stdin if args.script == "-" else open(args.script, "r", encoding="utf-8")
+    out = sys.stdout if args.output in (None, "-") else open(args.output, "w", encoding="utf-8")
+    try:
+        summary = run_script(bank, source, out, errors_only=args.errors_only)
+    finally:
+        if out is not sys.stdout:
+            out.close()
+        if source is not sys.stdin:
+            source.close()
+    with contextlib.redirect_stdout(sys.stderr):
+        # keeps stdout to the responses
+        bank.autosave_and_exit(wait=True)
+    # the totals go to stderr so stdout stays one response per line
+    print(json.dumps(summary), file=sys.stderr)
+    return 1 if summary["errors"] and args.fail_on_error else 0
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Global Digital Bank CLI")
+    parser.add_argument("--script", help="run the JSON-lines requests in this file ('-' for stdin) and exit")
+    parser.add_argument("--output", help="write responses here instead of stdout (with --script)")
+    parser.add_argument("--errors-only", action="store_true", help="only write failed responses (with --script)")
+    parser.add_argument("--fail-on-error", action="store_true", help="exit with status 1 if any request failed")
+    return parser.parse_args(argv)
+
 def main():
-    bank = Bank()
+    args = parse_args()
+    if args.script:
+        sys.exit(main_script(args))
+    configure_log_from_env()
+    bank = open_bank()
     print("--- Welcome to Global Digital Bank ---")
     while True:
         print("\nMenu:")
@@ -35,8 +139,10 @@ def main():
         print("22) List All Closed Accounts")
         print("23) System Exit with Autosave")
         print("24) Help / Show Menu")
+        print("25) Performance Stats")
+        print("26) Post Monthly Interest (Admin)")
         try:
-            choice = prompt_int("Enter your choice: ", min_val=1, max_val=24)
+            choice = prompt_int("Enter your choice: ", min_val=1, max_val=26)
             
             if choice == 1:
                 # Your version of Create Account
@@ -107,13 +213,21 @@ def main():
 
             elif choice == 8:
                 accnum = prompt_int("Enter account number: ")
+                start = input("From date (YYYY-MM-DD, blank for all): ").strip() or None
+                end = input("To date (YYYY-MM-DD, blank for all): ").strip() or None
                 try:
-                    txs = bank.transaction_history(accnum)
-                    if not txs:
-                        print("No transactions found.")
-                    else:
+                    offset = 0
+                    while True:
+                        txs = bank.transaction_history(accnum, offset, HISTORY_PAGE_SIZE, start=start, end=end)
+                        if not txs:
+                            if offset == 0:
+                                print("No transactions found.")
+                            break
                         for t in txs:
                             print(f"{t['timestamp']} | {t['operation']} | ₹{t['amount']:.2f} | Balance: ₹{t['balance_after']:.2f}")
+                        offset += len(txs)
+                        if len(txs) < HISTORY_PAGE_SIZE or input("Show more? (y/n): ").strip().lower() != "y":
+                            break
                 except Exception as e:
                     print("Error:", e)
 
@@ -129,16 +243,23 @@ def main():
             elif choice == 10:
                 fname = input("Enter import filename (default accounts_import.csv): ").strip() or "accounts_import.csv"
                 try:
-                    bank.import_accounts_from_file(fname)
-                    print("Import completed.")
+                    summary = bank.import_accounts_from_file(
+                        fname, progress=lambda p: print(f"  ...{p['imported']} imported, {p['rejected']} rejected"))
+                    print(f"Import completed: {summary['imported']} imported, {summary['rejected']} rejected.")
+                    if summary["rejected"]:
+                        print("Rejected rows written to", importer.reject_path(fname))
                 except FileNotFoundError:
                     print("File not found.")
                 except Exception as e:
                     print("Error importing:", e)
 
             elif choice == 11:
-                out = bank.export_accounts_to_file("export_accounts.csv")
-                print("Exported accounts to", out)
+                # written in the background; the menu is back straight away
+                job = bank.export_accounts_to_file(
+                    "export_accounts.csv", background=True,
+                    on_done=lambda job: print(f"\nExport failed: {job.error}" if job.error else
+                                              f"\nExported {job.written} accounts to {job.filename}"))
+                print(f"Exporting {job.total} accounts to {job.filename} in the background...")
 
             elif choice == 12:
                 accnum = prompt_int("Enter account number: ")
@@ -229,9 +350,40 @@ def main():
                 # show menu again
                 continue
 
+            elif choice == 25:
+                if not metrics.enabled():
+                    print("Metrics are off; start with GDB_METRICS=1 to record them.")
+                    continue
+                for line in metrics.report_lines(limit=20):
+                    print(line)
+                filename = input("Export to file (.prom or .json, blank to skip): ").strip()
+                if filename:
+                    print("Written to", metrics.export(filename))
+
+            elif choice == 26:
+                try:
+                    rates = {}
+                    for acc_type, default in interest.DEFAULT_RATES.items():
+                        entered = input(f"{acc_type} rate percent per year (default {default}): ").strip()
+                        rates[acc_type] = float(entered) if entered else default
+                    compound = input("Compound monthly? (y/n): ").strip().lower() == "y"
+                    dry_run = input("Dry run only? (y/n): ").strip().lower() == "y"
+                    report = input("Write per-account report to (blank to skip): ").strip() or None
+                    summary = bank.post_interest(rates, compound=compound, dry_run=dry_run, report_file=report)
+                    verb = "Would credit" if dry_run else "Credited"
+                    print(f"{verb} ₹{summary['total']:.2f} to {summary['accounts']} accounts.")
+                    for acc_type, entry in summary["by_type"].items():
+                        print(f"  {acc_type}: {entry['accounts']} accounts, ₹{entry['total']:.2f}")
+                except Exception as e:
+                    print("Error:", e)
+
         except KeyboardInterrupt:
             print("\nDetected Ctrl-C. Autosaving and exiting.")
-            bank.autosave_and_exit()
+            try:
+                bank.autosave_and_exit()
+            finally:
+                # never drop buffered log entries, even if the save fails
+                txn.close_log()
             sys.exit(0)
 
 if __name__ == "__main__":
@@ -0,0 +1,211 @@
+# metrics.py
+# Opt-in call counts, error counts and latency histograms for every public Bank method
+# and the storage/transactions I/O functions. enable() swaps timing wrappers in place of
+# the originals and disable() puts the originals back, so while metrics are off nothing
+# is wrapped and the cost is zero.
+#
+#   GDB_METRICS=1 python main.py        (menu option 25 shows and exports the numbers)
+import functools
+import json
+import math
+import sys
+import threading
+import time
+from typing import Dict
+
+import bank as bank_module
+import storage
+import transactions as txn
+
+STORAGE_FUNCTIONS = ("save_accounts_to_file", "save_rows_to_file", "load_accounts_from_file",
+                     "load_accounts_cached", "save_snapshot_cache")
+TRANSACTION_FUNCTIONS = ("log_transaction", "log_transactions", "flush_log", "close_log", "clear_log",
+                         "read_transactions", "get_account_transactions", "get_account_transactions_page",
+                         "get_transactions_between", "read_recent")
+# modules that hold their own reference to a patched function ("from storage import ...")
+REBOUND_IN = ("bank", "backends", "sharding", "importer", "storage", "transactions")
+SUB_BUCKETS = 4  # histogram buckets per power of two, i.e. ~19% relative error at worst
+
+def _bucket(seconds):
+    # bucket index for a latency; bucket i covers (bound(i - 1), bound(i)]
+    ns = seconds * 1e9
+    if ns <= 1:
+        return 0
+    m, e = math.frexp(ns)  # ns = m * 2**e, 0.5 <= m < 1
+    return e * SUB_BUCKETS + int((m - 0.5) * 2 * SUB_BUCKETS)
+
+def bucket_bound(index):
+    # upper bound of a bucket, in seconds
+    e, sub = divmod(index, SUB_BUCKETS)
+    return (0.5 + (sub + 1) / (2 * SUB_BUCKETS)) * 2.0 ** e / 1e9
+
+class OpStats:
+    __slots__ = ("calls", "errors", "total", "max", "buckets")
+
+    def __init__(self):
+        self.calls = 0
+        self.errors: Dict[str, int] = {}
+        self.total = 0.0
+        self.max = 0.0
+        self.buckets: Dict[int, int] = {}
+
+    def percentile(self, p):
+        # upper bound of the bucket holding the p-th percentile call
+        if not self.calls:
+            return 0.0
+        rank = max(1, math.ceil(p / 100.0 * self.calls))
+        seen = 0
+        for index in sorted(self.buckets):
+            seen += self.buckets[index]
+            if seen >= rank:
+                return min(bucket_bound(index), self.max)
+        return self.max
+
+    def to_dict(self):
+        return {
+            "calls": self.calls,
+            "errors": dict(self.errors),
+            "total_seconds": round(self.total, 6),
+            "mean_us": round(self.total / self.calls * 1e6, 2) if self.calls else 0.0,
+            "p50_us": round(self.percentile(50) * 1e6, 2),
+            "p95_us": round(self.percentile(95) * 1e6, 2),
+            "p99_us": round(self.percentile(99) * 1e6, 2),
+            "max_us": round(self.max * 1e6, 2),
+        }
+
+class Registry:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        with self._lock:
+            self.ops: Dict[str, OpStats] = {}
+            self.since = time.time()
+
+    def record(self, name, seconds, error=None):
+        index = _bucket(seconds)
+        with self._lock:
+            stats = self.ops.get(name)
+            if stats is None:
+                stats = self.ops[name] = OpStats()
+            stats.calls += 1
+            stats.total += seconds
+            if seconds > stats.max:
+                stats.max = seconds
+            stats.buckets[index] = stats.buckets.get(index, 0) + 1
+            if error is not None:
+                stats.errors[error] = stats.errors.get(error, 0) + 1
+
+    def snapshot(self):
+        # name -> OpStats.to_dict(), taken under the lock so the numbers agree with each other
+        with self._lock:
+            return {name: self.ops[name].to_dict() for name in sorted(self.ops)}
+
+registry = Registry()
+_originals = []  # (owner, attribute, original) for everything enable() replaced
+
+def _timed(name, fn):
+    record = registry.record
+    perf_counter = time.perf_counter
+
+    @functools.wraps(fn)
+    def wrapper(*args, **kwargs):
+        start = perf_counter()
+        try:
+            result = fn(*args, **kwargs)
+        except BaseException as e:
+            record(name, perf_counter() - start, type(e).__name__)
+            raise
+        record(name, perf_counter() - start)
+        return result
+    return wrapper
+
+def _patch(owner, attribute, wrapper):
+    _originals.append((owner, attribute, getattr(owner, attribute)))
+    setattr(owner, attribute, wrapper)
+
+def _bank_methods():
+    return [name for name, value in vars(bank_module.Bank).items()
+            if not name.startswith("_") and callable(value)]
+
+def enabled():
+    return bool(_originals)
+
+def enable():
+    if enabled():
+        return
+    for name in _bank_methods():
+        _patch(bank_module.Bank, name, _timed(f"bank.{name}", getattr(bank_module.Bank, name)))
+    for module, names in ((storage, STORAGE_FUNCTIONS), (txn, TRANSACTION_FUNCTIONS)):
+        short = module.__name__
+        for name in names:
+            original = getattr(module, name)
+            wrapper = _timed(f"{short}.{name}", original)
+            for holder in REBOUND_IN:
+                other = sys.modules.get(holder)
+                if other is None:
+                    continue
+                for attribute, value in list(vars(other).items()):
+                    if value is original:
+                        _patch(other, attribute, wrapper)
+
+def disable():
+    while _originals:
+        owner, attribute, original = _originals.pop()
+        setattr(owner, attribute, original)
+
+# ---------- export ----------
+def to_json():
+    return json.dumps({"since": registry.since, "enabled": enabled(),
+                       "operations": registry.snapshot()}, indent=2)
+
+def _label(value):
+    return value.replace("\\", "\\\\").replace('"', '\\"')
+
+def to_prometheus():
+    # Prometheus text exposition format: counters, a latency histogram and p50/p95/p99 gauges
+    lines = ["# HELP gdb_calls_total Calls per operation.", "# TYPE gdb_calls_total counter"]
+    with registry._lock:
+        ops = {name: (s.calls, dict(s.errors), s.total, dict(s.buckets), s.to_dict())
+               for name, s in sorted(registry.ops.items())}
+    for name, (calls, _, _, _, _) in ops.items():
+        lines.append(f'gdb_calls_total{{op="{_label(name)}"}} {calls}')
+    lines += ["# HELP gdb_errors_total Failed calls per operation and exception type.",
+              "# TYPE gdb_errors_total counter"]
+    for name, (_, errors, _, _, _) in ops.items():
+        for error, count in sorted(errors.items()):
+            lines.append(f'gdb_errors_total{{op="{_label(name)}",type="{_label(error)}"}} {count}')
+    lines += ["# HELP gdb_latency_seconds Call latency.", "# TYPE gdb_latency_seconds histogram"]
+    for name, (calls, _, total, buckets, _) in ops.items():
+        op = _label(name)
+        cumulative = 0
+        for index in sorted(buckets):
+            cumulative += buckets[index]
+            lines.append(f'gdb_latency_seconds_bucket{{op="{op}",le="{bucket_bound(index):.9g}"}} {cumulative}')
+        lines.append(f'gdb_latency_seconds_bucket{{op="{op}",le="+Inf"}} {calls}')
+        lines.append(f'gdb_latency_seconds_sum{{op="{op}"}} {total:.9g}')
+        lines.append(f'gdb_latency_seconds_count{{op="{op}"}} {calls}')
+    lines += ["# HELP gdb_latency_quantile_seconds Estimated latency quantiles.",
+              "# TYPE gdb_latency_quantile_seconds gauge"]
+    for name, (_, _, _, _, summary) in ops.items():
+        for q in ("50", "95", "99"):
+            lines.append(f'gdb_latency_quantile_seconds{{op="{_label(name)}",quantile="0.{q}"}} '
+                         f'{summary[f"p{q}_us"] / 1e6:.9g}')
+    return "\n".join(lines) + "\n"
+
+def export(filename):
+    # .json gets the JSON report, anything else the Prometheus text format
+    text = to_json() if filename.endswith(".json") else to_prometheus()
+    with open(filename, "w") as f:
+        f.write(text)
+    return filename
+
+def report_lines(limit=None):
+    # busiest operations first, for the menu
+    rows = sorted(registry.snapshot().items(), key=lambda item: -item[1]["total_seconds"])
+    out = [f"{'operation':42} {'calls':>9} {'errors':>7} {'p50 us':>10} {'p95 us':>10} {'p99 us':>10}"]
+    for name, s in rows[:limit]:
+        out.append(f"{name:42} {s['calls']:>9} {sum(s['errors'].values()):>7} "
+                   f"{s['p50_us']:>10.1f} {s['p95_us']:>10.1f} {s['p99_us']:>10.1f}")
+    return out
@@ -0,0 +1,120 @@
+# name_index.py
+# Case-insensitive name search without scanning the book: trigram postings answer
+# substring queries of 3+ characters, and a sorted (name, account) list answers
+# prefix queries. Results come back in book order, like the old list scan.
+# The index is built on the first search, so startup doesn't pay for it.
+import threading
+from typing import Dict, List, Optional, Set, Tuple
+
+from aggregates import SortedKeyList
+
+def normalize(name: str) -> str:
+    return name.strip().lower()
+
+def trigrams(text: str) -> Set[str]:
+    return {text[i:i + 3] for i in range(len(text) - 2)}
+
+class NameIndex:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.clear()
+
+    def clear(self):
+        # account number -> (book position, normalised name)
+        self._names: Dict[int, Tuple[int, str]] = {}
+        self._postings: Dict[str, Set[int]] = {}
+        self._sorted = SortedKeyList()
+        self._next_position = 0
+        self._pending = None  # live account list to index on first use
+
+    def load(self, accounts):
+        # accounts must be the caller's live list: changes made before the first
+        # search are picked up when the index is finally built from it
+        with self._lock:
+            self.clear()
+            self._pending = accounts
+
+    def _build(self):
+        accounts, self._pending = self._pending, None
+        names = self._names
+        postings = self._postings
+        for acc in accounts:
+            number = acc.account_number
+            if number in names:
+                continue
+            name = normalize(acc.name)
+            names[number] = (len(names), name)
+            for i in range(len(name) - 2):
+                gram = name[i:i + 3]
+                holders = postings.get(gram)
+                if holders is None:
+                    postings[gram] = {number}
+                else:
+                    holders.add(number)
+        self._next_position = len(names)
+        self._sorted.update((name, number) for number, (_, name) in names.items())
+
+    def upsert(self, acc):
+        number = acc.account_number
+        name = normalize(acc.name)
+        with self._lock:
+            if self._pending is not None:
+                return
+            old = self._names.get(number)
+            if old is None:
+                position = self._next_position
+                self._next_position += 1
+            else:
+                position, old_name = old
+                if old_name == name:
+                    return
+                # rename: drop the old postings first
+                for gram in trigrams(old_name):
+                    holders = self._postings.get(gram)
+                    if holders is not None:
+                        holders.discard(number)
+                        if not holders:
+                            del self._postings[gram]
+                self._sorted.remove((old_name, number))
+            self._names[number] = (position, name)
+            for gram in trigrams(name):
+                self._postings.setdefault(gram, set()).add(number)
+            self._sorted.add((name, number))
+
+    def _in_book_order(self, numbers, limit):
+        ordered = sorted(numbers, key=lambda n: self._names[n][0])
+        return ordered if limit is None else ordered[:limit]
+
+    def search(self, query: str, limit: Optional[int] = None) -> List[int]:
+        # account numbers whose name contains query (case-insensitive)
+        q = normalize(query)
+        with self._lock:
+            if self._pending is not None:
+                self._build()
+            if len(q) < 3:
+                # too short for trigrams: check every name (still no per-query lower/strip);
+                # _names is in insertion, i.e. book, order already
+                hits = [n for n, (_, name) in self._names.items() if q in name]
+                return hits if limit is None else hits[:limit]
+            grams = sorted(trigrams(q), key=lambda g: len(self._postings.get(g, ())))
+            candidates = self._postings.get(grams[0], set())
+            for gram in grams[1:]:
+                if not candidates:
+                    break
+                candidates = candidates & self._postings.get(gram, set())
+            # all trigrams present doesn't guarantee the substring, so confirm it
+            hits = [n for n in candidates if q in self._names[n][1]]
+            return self._in_book_order(hits, limit)
+
+    def search_prefix(self, query: str, limit: Optional[int] = None) -> List[int]:
+        # account numbers whose name starts with query (case-insensitive)
+        q = normalize(query)
+        hits = []
+        with self._lock:
+            if self._pending is not None:
+                self._build()
+            for name, number in self._sorted.iter_from((q, -1)):
+                if not name.startswith(q):
+                    break
+                hits.append(number)
+            return self._in_book_order(hits, limit)
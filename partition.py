@@ -0,0 +1,527 @@
+# partition.py
+# Partitioned execution: the book is split across N worker processes by account number
+# (account n lives in partition n % N), each with its own Bank, accounts.csv, journal
+# and transactions.log under <directory>/part<i>/. PartitionedBank is the router: it
+# sends every operation to the worker that owns the account, and apply_many sends each
+# worker its share of a batch at once, so the workers run in parallel on separate cores.
+# Whole-book operations (counts, listings, top N, interest, ...) go to every worker and
+# their results are merged; the few that can't be split (export, reconcile, ...) are
+# refused.
+#
+# A transfer between partitions is a two-phase commit run by the router:
+#   1. prepare: the sender's worker checks the transfer rules and puts the amount on
+#      hold (it can't be withdrawn or transferred meanwhile); the receiver's worker
+#      checks that the account can receive
+#   2. if both agree the router writes the decision to <directory>/decisions.log, then
+#      both workers commit (debit/credit, journal, log); otherwise the holds are released
+# A worker journals each committed half together with its transfer id, in one journal
+# row, so the id is on disk exactly when the change is. The ids are then copied to
+# part<i>/2pc.committed, and a restarted worker adds back those found in its replayed
+# journal, so a commit resent after a crash is applied exactly once. Holds live in memory
+# only: a worker that restarts before the decision has simply voted no. On startup the
+# router resends the commits of decided transfers it never saw finish.
+#
+#   with PartitionedBank("partitions", partitions=4) as bank:
+#       acc = bank.create_account("Asha", 30, "Savings", 1000)
+#       bank.deposit(acc.account_number, 500)
+#       bank.apply_many([{"op": "transfer", "from": 1001, "to": 1002, "amount": 10}, ...])
+import itertools
+import json
+import multiprocessing
+import os
+import threading
+import time
+from typing import Dict, List, Optional
+
+import api
+import transactions as txn
+
+DEBIT, CREDIT = "debit", "credit"
+# Bank methods the router may call on a worker
+ROUTED_METHODS = {"create_account", "deposit", "withdraw", "balance_inquiry", "find_by_account_number",
+                  "close_account", "reopen_account", "rename_account_holder", "set_pin", "transfer_funds",
+                  "transaction_history", "count_active_accounts", "snapshot"}
+# api.py operations and the request field naming the account that decides the partition
+ACCOUNT_FIELD = {"deposit": "account", "withdraw": "account", "balance": "account", "close_account": "account",
+                 "reopen_account": "account", "rename": "account", "set_pin": "account", "history": "account",
+                 "simple_interest": "account", "find_by_number": "account", "transfer": "from"}
+# api.py operations that read or change the whole book: sent to every worker, results
+# merged by GLOBAL_MERGE. import goes to one worker, round-robin like create_account.
+GLOBAL_OPS = {"count_active", "list_active", "list_closed", "find_by_name", "top_n", "average_balance",
+              "youngest_oldest", "delete_all", "snapshot", "post_interest"}
+# operations whose result can't be put together from the workers' (one file, one log)
+UNPARTITIONED_OPS = {"export", "batch", "reconcile", "metrics"}
+ERRORS = {cls.__name__: cls for cls in (ValueError, TypeError, LookupError, PermissionError, OSError)}
+
+def _error(error_type, message):
+    return ERRORS.get(error_type, RuntimeError)(message)
+
+# ---------- merging whole-book results ----------
+def _by_number(results, req):
+    return sorted((a for accounts, _ in results for a in accounts), key=lambda a: a["account_number"])
+
+def _top_n(results, req):
+    # each worker sent its own top n
+    accounts = sorted((a for top, _ in results for a in top), key=lambda a: (-a["balance"], a["account_number"]))
+    return accounts[:max(0, int(req.get("n", 5)))]
+
+def _average(results, req):
+    # weighted by the size of each worker's book
+    total = sum(size for _, size in results)
+    return sum(average * size for average, size in results) / total if total else 0.0
+
+def _youngest_oldest(results, req):
+    # ties go to the lowest account number
+    youngest = [r["youngest"] for r, _ in results if r["youngest"] is not None]
+    oldest = [r["oldest"] for r, _ in results if r["oldest"] is not None]
+    return {"youngest": min(youngest, key=lambda a: (a["age"], a["account_number"]), default=None),
+            "oldest": min(oldest, key=lambda a: (-a["age"], a["account_number"]), default=None)}
+
+def _interest(results, req):
+    summary = dict(results[0][0], accounts=0, total=0.0, by_type={})
+    for result, _ in results:
+        summary["accounts"] += result["accounts"]
+        summary["total"] += result["total"]
+        for name, part in result["by_type"].items():
+            merged = summary["by_type"].setdefault(name, {"accounts": 0, "total": 0.0})
+            merged["accounts"] += part["accounts"]
+            merged["total"] = round(merged["total"] + part["total"], 2)
+    summary["total"] = round(summary["total"], 2)
+    return summary
+
+# op -> function of ([(worker's result, worker's book size)], request)
+GLOBAL_MERGE = {
+    "count_active": lambda results, req: sum(count for count, _ in results),
+    "list_active": _by_number,
+    "list_closed": _by_number,
+    "find_by_name": _by_number,
+    "top_n": _top_n,
+    "average_balance": _average,
+    "youngest_oldest": _youngest_oldest,
+    "delete_all": lambda results, req: all(result for result, _ in results),
+    "snapshot": lambda results, req: None,
+    "post_interest": _interest,
+}
+
+def _merge(req, replies):
+    # replies: one (api.py response, book size) per worker; the first failure stands for all
+    for response, _ in replies:
+        if not response["ok"]:
+            return response
+    merged = dict(replies[0][0])
+    merged["result"] = GLOBAL_MERGE[req["op"]]([(r["result"], size) for r, size in replies], req)
+    return merged
+
+def _refuse(req, message):
+    response = {"id": req["id"]} if "id" in req else {}
+    response.update(ok=False, error=message, error_type="ValueError")
+    return response
+
+# ---------- worker side ----------
+class _Participant:
+    # this worker's half of cross-partition transfers
+    def __init__(self, bank, dirname, fsync=False):
+        self.bank = bank
+        self.fsync = fsync  # fsync the markers too (log_mode=fsync)
+        self.prepared = {}  # (txid, side) -> amount held or checked
+        self.pending = {}   # account number -> (amount, count) of prepared debits, for the velocity limits
+        self.path = os.path.join(dirname, "2pc.committed")
+        self.committed = set()
+        if os.path.exists(self.path):
+            with open(self.path, "r") as f:
+                self.committed = {line.strip() for line in f if line.strip()}
+        self._log = open(self.path, "a")
+        # committed txids not yet in the markers file; at first, any halves whose journal
+        # row made it to disk before a crash cut off their marker line
+        self._unflushed = sorted(bank.journal.markers - self.committed)
+        self.committed.update(self._unflushed)
+        self.flush()
+        bank.journal.forget(self.committed)
+
+    def prepare(self, txid, side, account_number, amount):
+        # None to vote yes, (error type, message) to vote no
+        bank = self.bank
+        try:
+            acc = bank.find_by_account_number(account_number)
+            if side == DEBIT:
+                # the sender's half of Bank._check_transfer (the receiver is checked on its own worker)
+                bank._check_transfer(acc, acc, amount, bank._available(acc) if acc else 0.0,
+                                     self.pending.get(account_number, (0.0, 0)))
+                bank._holds[account_number] = bank._holds.get(account_number, 0.0) + amount
+                held, count = self.pending.get(account_number, (0.0, 0))
+                self.pending[account_number] = (held + amount, count + 1)
+            else:
+                if not acc:
+                    raise LookupError("One or both accounts not found.")
+                if acc.status != "Active":
+                    raise PermissionError("Both accounts must be active for transfer.")
+        except (ValueError, TypeError, LookupError, PermissionError) as e:
+            return type(e).__name__, str(e)
+        self.prepared[(txid, side)] = amount
+        return None
+
+    def _release(self, side, account_number, amount):
+        if side != DEBIT:
+            return
+        bank = self.bank
+        left = bank._holds.get(account_number, 0.0) - amount
+        if left > 0.005:
+            bank._holds[account_number] = left
+        else:
+            bank._holds.pop(account_number, None)
+        held, count = self.pending.get(account_number, (0.0, 0))
+        if count > 1:
+            self.pending[account_number] = (held - amount, count - 1)
+        else:
+            self.pending.pop(account_number, None)
+
+    def finish(self, txid, side, account_number, amount, commit):
+        # applies (commit) or drops the prepared half; returns the new balance on commit,
+        # or (error type, message) if the account is gone. Not durable until flush().
+        bank = self.bank
+        if (txid, side) in self.prepared:
+            del self.prepared[(txid, side)]
+            self._release(side, account_number, amount)
+        if not commit:
+            return None
+        acc = bank.find_by_account_number(account_number)
+        if txid in self.committed:
+            return acc.balance if acc else None
+        if acc is None:
+            # left unmarked: the router keeps the decision open and resends it on restart
+            return "LookupError", (f"Account {account_number} not found; its half of committed "
+                                   f"transfer {txid} was not applied.")
+        # applied even without a prepare (resent after a restart): the decision is final
+        if side == DEBIT:
+            acc.balance -= amount
+            bank._record_change(acc, marker=txid)
+            txn.log_transaction(account_number, "Transfer-Debit", amount, acc.balance)
+            bank.limits.record(account_number, amount)
+        else:
+            acc.balance += amount
+            bank._record_change(acc, marker=txid)
+            txn.log_transaction(account_number, "Transfer-Credit", amount, acc.balance)
+        self.committed.add(txid)
+        self._unflushed.append(txid)
+        return acc.balance
+
+    def flush(self):
+        # the log, then the journal (whose rows carry the txids), then the markers file;
+        # once a txid is in the markers file the journal no longer has to keep it
+        if not self._unflushed:
+            return
+        txn.flush_log()
+        self.bank.journal.flush()
+        self._log.writelines(txid + "\n" for txid in self._unflushed)
+        self._log.flush()
+        if self.fsync:
+            os.fsync(self._log.fileno())
+        self.bank.journal.forget(self._unflushed)
+        self._unflushed = []
+
+    def close(self):
+        self._log.close()
+
+def _call(bank, method, args):
+    if method not in ROUTED_METHODS:
+        return "error", ("ValueError", f"Method {method!r} cannot be routed to a partition.")
+    try:
+        return "ok", getattr(bank, method)(*args)
+    except (ValueError, TypeError, LookupError, PermissionError, OSError) as e:
+        return "error", (type(e).__name__, str(e))
+
+def _worker(index, partitions, dirname, log_mode, velocity_limits, conn):
+    from bank import Bank
+    os.makedirs(dirname, exist_ok=True)
+    txn.LOGFILE = os.path.join(dirname, "transactions.log")
+    txn.configure_log(log_mode)
+    bank = Bank(accounts_file=os.path.join(dirname, "accounts.csv"), journal_mode=log_mode,
+                velocity_limits=velocity_limits)
+    bank.stride_account_numbers(index, partitions)
+    participant = _Participant(bank, dirname, fsync=log_mode == txn.FLUSH_FSYNC)
+    conn.send("ready")
+    while True:
+        try:
+            kind, payload = conn.recv()
+        except EOFError:
+            kind, payload = "stop", None  # router went away: save and stop
+        if kind == "call":
+            reply = _call(bank, *payload)
+        elif kind == "batch":
+            # (requests, positions of whole-book operations); those are merged with the
+            # other workers' results, which needs this book's size
+            requests, whole_book = payload
+            reply = [(api.handle(bank, req), bank.stats.accounts) if i in whole_book else api.handle(bank, req)
+                     for i, req in enumerate(requests)]
+        elif kind == "prepare":
+            reply = [participant.prepare(*p) for p in payload]
+        elif kind == "finish":
+            reply = [participant.finish(*f) for f in payload]
+            participant.flush()
+        elif kind == "stop":
+            participant.close()
+            bank.autosave_and_exit(wait=True)
+            try:
+                conn.send(None)
+            except (BrokenPipeError, OSError):
+                pass
+            return
+        else:
+            reply = "error", ("ValueError", f"Unknown message {kind!r}")
+        conn.send(reply)
+
+# ---------- router ----------
+class PartitionedBank:
+    def __init__(self, directory="partitions", partitions: Optional[int] = None, log_mode=txn.FLUSH_BATCH,
+                 velocity_limits: Optional[Dict[str, dict]] = None):
+        self.directory = directory
+        os.makedirs(directory, exist_ok=True)
+        manifest = os.path.join(directory, "partitions.json")
+        if os.path.exists(manifest):
+            with open(manifest, "r") as f:
+                existing = json.load(f)["partitions"]
+            if partitions is not None and partitions != existing:
+                raise ValueError(f"{directory} is split into {existing} partitions, not {partitions}.")
+            partitions = existing
+        else:
+            partitions = partitions or os.cpu_count() or 1
+            with open(manifest, "w") as f:
+                json.dump({"partitions": partitions}, f)
+        self.partitions = partitions
+        self._conns = []
+        self._procs = []
+        self._locks = [threading.Lock() for _ in range(partitions)]
+        for i in range(partitions):
+            parent, child = multiprocessing.Pipe()
+            proc = multiprocessing.Process(
+                target=_worker, args=(i, partitions, os.path.join(directory, f"part{i}"), log_mode,
+                                      velocity_limits, child),
+                name=f"gdb-partition-{i}", daemon=True)
+            proc.start()
+            self._conns.append(parent)
+            self._procs.append(proc)
+        for conn in self._conns:
+            conn.recv()  # "ready": the worker's book is loaded
+        self._next_create = itertools.count()
+        self._txids = itertools.count()
+        self._txid_prefix = f"{time.time_ns():x}"
+        self._decisions_path = os.path.join(directory, "decisions.log")
+        self._decisions_lock = threading.Lock()
+        self._recover()
+        self._decisions = open(self._decisions_path, "a")
+
+    def owner(self, account_number):
+        return int(account_number) % self.partitions
+
+    # ---------- messaging ----------
+    def _scatter(self, messages: Dict[int, tuple]) -> Dict[int, object]:
+        # sends each worker its message, then collects the replies: the workers run at once
+        order = sorted(messages)
+        for p in order:
+            self._locks[p].acquire()
+        try:
+            for p in order:
+                self._conns[p].send(messages[p])
+            return {p: self._conns[p].recv() for p in order}
+        finally:
+            for p in reversed(order):
+                self._locks[p].release()
+
+    def _invoke(self, partition, method, *args):
+        status, value = self._scatter({partition: ("call", (method, args))})[partition]
+        if status == "error":
+            raise _error(*value)
+        return value
+
+    # ---------- single operations ----------
+    def create_account(self, name, age, acc_type, initial_deposit, pin=None):
+        # new accounts are spread round-robin; each worker only hands out numbers it owns
+        return self._invoke(next(self._next_create) % self.partitions, "create_account",
+                            name, age, acc_type, initial_deposit, pin)
+
+    def deposit(self, account_number, amount):
+        return self._invoke(self.owner(account_number), "deposit", account_number, amount)
+
+    def withdraw(self, account_number, amount):
+        return self._invoke(self.owner(account_number), "withdraw", account_number, amount)
+
+    def balance_inquiry(self, account_number):
+        # a copy of the account as the owning worker has it
+        return self._invoke(self.owner(account_number), "balance_inquiry", account_number)
+
+    def find_by_account_number(self, account_number):
+        return self._invoke(self.owner(account_number), "find_by_account_number", account_number)
+
+    def transaction_history(self, account_number, offset=0, limit=None, start=None, end=None):
+        return self._invoke(self.owner(account_number), "transaction_history",
+                            account_number, offset, limit, start, end)
+
+    def count_active_accounts(self):
+        replies = self._scatter({p: ("call", ("count_active_accounts", ())) for p in range(self.partitions)})
+        return sum(value for _, value in replies.values())
+
+    def transfer_funds(self, from_acc_num, to_acc_num, amount):
+        if self.owner(from_acc_num) == self.owner(to_acc_num):
+            return self._invoke(self.owner(from_acc_num), "transfer_funds", from_acc_num, to_acc_num, amount)
+        outcome = self._transfer_2pc([(int(from_acc_num), int(to_acc_num), float(amount))])[0]
+        if isinstance(outcome, tuple) and isinstance(outcome[0], str):
+            raise _error(*outcome)
+        return outcome
+
+    # ---------- batches ----------
+    def apply_many(self, requests: List[dict]) -> List[dict]:
+        # api.py requests (see api.OPERATIONS) in, api.py responses out, in the same order.
+        # Each worker runs its share in order; transfers between partitions go through the
+        # two-phase commit after the rest, so ops on different partitions are not ordered
+        # relative to each other. A whole-book operation (GLOBAL_OPS) is in every worker's
+        # share, at its place in the batch, and answered with the merged results.
+        responses: List[Optional[dict]] = [None] * len(requests)
+        shares: Dict[int, list] = {}
+        cross = []
+        fanned = []
+        for i, req in enumerate(requests):
+            try:
+                op = req.get("op")
+                if op in GLOBAL_OPS:
+                    if op == "post_interest" and req.get("report_file"):
+                        responses[i] = _refuse(req, "post_interest can't write one report_file from "
+                                                    "several partitions.")
+                        continue
+                    fanned.append(i)
+                    for p in range(self.partitions):
+                        shares.setdefault(p, []).append(i)
+                    continue
+                if op in UNPARTITIONED_OPS:
+                    responses[i] = _refuse(req, f"Operation {op!r} cannot run across partitions.")
+                    continue
+                if op in ("create_account", "import"):
+                    p = next(self._next_create) % self.partitions
+                elif op == "transfer" and self.owner(req["from"]) != self.owner(req["to"]):
+                    cross.append(i)
+                    continue
+                else:
+                    p = self.owner(req[ACCOUNT_FIELD[op]])
+            except (AttributeError, KeyError, TypeError, ValueError):
+                p = 0  # let a worker's api.handle produce the error response
+            shares.setdefault(p, []).append(i)
+        if shares:
+            fanned_set = set(fanned)
+            replies = self._scatter({p: ("batch", ([requests[i] for i in idx],
+                                                   {k for k, i in enumerate(idx) if i in fanned_set}))
+                                     for p, idx in shares.items()})
+            parts: Dict[int, list] = {i: [] for i in fanned}
+            for p, idx in shares.items():
+                for i, response in zip(idx, replies[p]):
+                    if i in fanned_set:
+                        parts[i].append(response)
+                    else:
+                        responses[i] = response
+            for i in fanned:
+                responses[i] = _merge(requests[i], parts[i])
+        if cross:
+            transfers = []
+            for i in cross:
+                req = requests[i]
+                try:
+                    transfers.append((int(req["from"]), int(req["to"]), float(req["amount"])))
+                except (KeyError, TypeError, ValueError) as e:
+                    transfers.append(e)
+            valid = [t for t in transfers if isinstance(t, tuple)]
+            outcomes = iter(self._transfer_2pc(valid))
+            for i, t in zip(cross, transfers):
+                response = {"id": requests[i]["id"]} if "id" in requests[i] else {}
+                outcome = next(outcomes) if isinstance(t, tuple) else ("ValueError", f"Invalid transfer: {t}")
+                if isinstance(outcome[0], str):
+                    response.update(ok=False, error=outcome[1], error_type=outcome[0])
+                else:
+                    response.update(ok=True, result={"from_balance": outcome[0], "to_balance": outcome[1]})
+                responses[i] = response
+        return responses
+
+    # ---------- two-phase commit ----------
+    def _transfer_2pc(self, transfers):
+        # transfers: (from, to, amount). Returns per transfer (from balance, to balance)
+        # or (error type, message).
+        txids = [f"{self._txid_prefix}-{next(self._txids)}" for _ in transfers]
+        halves: Dict[int, list] = {}
+        for txid, (src, dst, amount) in zip(txids, transfers):
+            halves.setdefault(self.owner(src), []).append((txid, DEBIT, src, amount))
+            halves.setdefault(self.owner(dst), []).append((txid, CREDIT, dst, amount))
+        votes = {}
+        for p, replies in self._scatter({p: ("prepare", h) for p, h in halves.items()}).items():
+            for (txid, side, _, _), vote in zip(halves[p], replies):
+                votes[(txid, side)] = vote
+        decided = []
+        for txid, (src, dst, amount) in zip(txids, transfers):
+            if votes[(txid, DEBIT)] is None and votes[(txid, CREDIT)] is None:
+                decided.append(f"C {txid} {src} {dst} {amount!r}\n")
+        if decided:
+            with self._decisions_lock:
+                self._decisions.writelines(decided)
+                self._decisions.flush()
+                os.fsync(self._decisions.fileno())
+        committed = {line.split()[1] for line in decided}
+        balances = {}
+        finishing = {p: ("finish", [h + (h[0] in committed,) for h in hs]) for p, hs in halves.items()}
+        for p, replies in self._scatter(finishing).items():
+            for (txid, side, _, _), balance in zip(halves[p], replies):
+                balances[(txid, side)] = balance
+        # a half that could not be applied keeps its decision open for the next recovery
+        failed = {txid for (txid, _), balance in balances.items() if isinstance(balance, tuple)}
+        if decided:
+            with self._decisions_lock:
+                self._decisions.writelines(f"D {txid}\n" for txid in committed - failed)
+                self._decisions.flush()
+        outcomes = []
+        for txid in txids:
+            if txid in failed:
+                debit, credit = balances[(txid, DEBIT)], balances[(txid, CREDIT)]
+                outcomes.append(debit if isinstance(debit, tuple) else credit)
+            elif txid in committed:
+                outcomes.append((balances[(txid, DEBIT)], balances[(txid, CREDIT)]))
+            else:
+                # the sender's reason first, as Bank._check_transfer would report it
+                outcomes.append(votes[(txid, DEBIT)] or votes[(txid, CREDIT)])
+        return outcomes
+
+    def _recover(self):
+        # resend the commits of transfers decided but not seen finished (workers skip
+        # the halves they already applied), then empty decisions.log
+        if not os.path.exists(self._decisions_path):
+            return
+        open_decisions = {}
+        with open(self._decisions_path, "r") as f:
+            for line in f:
+                parts = line.split()
+                if len(parts) == 5 and parts[0] == "C":
+                    open_decisions[parts[1]] = (int(parts[2]), int(parts[3]), float(parts[4]))
+                elif len(parts) == 2 and parts[0] == "D":
+                    open_decisions.pop(parts[1], None)
+        halves: Dict[int, list] = {}
+        for txid, (src, dst, amount) in open_decisions.items():
+            halves.setdefault(self.owner(src), []).append((txid, DEBIT, src, amount, True))
+            halves.setdefault(self.owner(dst), []).append((txid, CREDIT, dst, amount, True))
+        if halves:
+            self._scatter({p: ("finish", h) for p, h in halves.items()})
+        # everything in it is finished now
+        open(self._decisions_path, "w").close()
+
+    # ---------- lifecycle ----------
+    def close(self):
+        # every worker saves its book and exits
+        for p, conn in enumerate(self._conns):
+            with self._locks[p]:
+                try:
+                    conn.send(("stop", None))
+                    conn.recv()
+                except (BrokenPipeError, EOFError, OSError):
+                    pass
+        for proc in self._procs:
+            proc.join()
+        self._decisions.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
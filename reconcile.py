@@ -0,0 +1,211 @@
+# reconcile.py
+# Rebuilds every account's balance and status from the transaction log and diffs them
+# against the book. The log is cut into byte-range chunks that are replayed in a process
+# pool; each worker returns only per-account summaries for its chunk, and chunks are
+# merged in log order, so memory depends on the number of accounts, not on log length.
+#
+#   python reconcile.py --accounts accounts.csv --log transactions.log [--repair]
+#   python reconcile.py --accounts accounts.csv --segments transactions.d --report diff.csv
+import argparse
+import csv
+import gzip
+import os
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, List, Optional
+
+CHUNK_BYTES = 64 << 20
+TOLERANCE = 0.005  # balances are kept to paise
+CREDITS = {"deposit", "transfer-credit", "interest"}
+DEBITS = {"withdraw", "transfer-debit"}
+STATUS_AFTER = {"create": "Active", "reopen": "Active", "close": "Inactive"}
+REPORT_FIELDS = ["account_number", "kind", "book_balance", "log_balance", "book_status", "log_status"]
+
+# per-account chunk summary, a list for cheap pickling:
+FIRST_PREV, LAST, STATUS, ENTRIES, BREAKS = range(5)
+
+def _fields(line):
+    # (account, operation, amount, balance_after) from a log line, or None; same
+    # layouts as transactions._parse_line, without building a dict per line
+    parts = line.split(b",")
+    if len(parts) == 6:
+        del parts[1]
+    if len(parts) != 5:
+        return None
+    try:
+        return int(parts[1]), parts[2].decode().strip().lower(), float(parts[3]), float(parts[4])
+    except ValueError:
+        return None
+
+def _balance_before(op, amount, balance_after):
+    if op == "create":
+        return 0.0
+    if op in CREDITS:
+        return balance_after - amount
+    if op in DEBITS:
+        return balance_after + amount
+    return balance_after
+
+def _replay_lines(lines):
+    summary: Dict[int, list] = {}
+    for line in lines:
+        f = _fields(line)
+        if f is None:
+            continue
+        acc, op, amount, balance = f
+        s = summary.get(acc)
+        if s is None:
+            s = summary[acc] = [_balance_before(op, amount, balance), balance, None, 0, 0]
+        elif abs(_balance_before(op, amount, balance) - s[LAST]) > TOLERANCE:
+            s[BREAKS] += 1
+        s[LAST] = balance
+        s[ENTRIES] += 1
+        status = STATUS_AFTER.get(op)
+        if status is not None:
+            s[STATUS] = status
+    return summary
+
+def replay_chunk(path, start, end):
+    # runs in a worker: summary of the lines in [start, end) (the whole file for .gz)
+    if path.endswith(".gz"):
+        with gzip.open(path, "rb") as f:
+            return _replay_lines(f)
+
+    def lines(f):
+        pos = start
+        for line in f:
+            yield line
+            pos += len(line)
+            if pos >= end:
+                break
+
+    with open(path, "rb") as f:
+        f.seek(start)
+        return _replay_lines(lines(f))
+
+def chunk_ranges(path, chunk_bytes=CHUNK_BYTES):
+    # (path, start, end) byte ranges that start and end on line boundaries
+    if path.endswith(".gz"):
+        return [(path, 0, None)]
+    size = os.path.getsize(path)
+    ranges, start = [], 0
+    with open(path, "rb") as f:
+        while start < size:
+            end = start + chunk_bytes
+            if end >= size:
+                end = size
+            else:
+                f.seek(end)
+                f.readline()
+                end = f.tell()
+            ranges.append((path, start, end))
+            start = end
+    return ranges
+
+def replay(paths: List[str], workers: Optional[int] = None, chunk_bytes=CHUNK_BYTES):
+    # merged per-account summaries over the log files in order:
+    # account -> [first balance before, last balance, last status or None, entries, breaks]
+    tasks = [r for path in paths if os.path.exists(path) for r in chunk_ranges(path, chunk_bytes)]
+    merged: Dict[int, list] = {}
+
+    def merge(part):
+        for acc, s in part.items():
+            m = merged.get(acc)
+            if m is None:
+                merged[acc] = s
+                continue
+            if abs(s[FIRST_PREV] - m[LAST]) > TOLERANCE:
+                m[BREAKS] += 1
+            m[LAST] = s[LAST]
+            m[STATUS] = s[STATUS] or m[STATUS]
+            m[ENTRIES] += s[ENTRIES]
+            m[BREAKS] += s[BREAKS]
+
+    workers = workers if workers is not None else min(len(tasks), os.cpu_count() or 1)
+    if workers <= 1 or len(tasks) <= 1:
+        for task in tasks:
+            merge(replay_chunk(*task))
+        return merged
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        # at most 2 chunks per worker in flight, merged strictly in log order
+        pending = deque()
+        for task in tasks:
+            pending.append(pool.submit(replay_chunk, *task))
+            if len(pending) >= 2 * workers:
+                merge(pending.popleft().result())
+        while pending:
+            merge(pending.popleft().result())
+    return merged
+
+def diff(accounts, derived):
+    # discrepancies between the book and the replayed log
+    found = []
+    in_book = set()
+    for acc in accounts:
+        in_book.add(acc.account_number)
+        d = derived.get(acc.account_number)
+        if d is None:
+            found.append({"account_number": acc.account_number, "kind": "no_history",
+                          "book_balance": acc.balance, "log_balance": None,
+                          "book_status": acc.status, "log_status": None})
+            continue
+        balance_off = abs(acc.balance - d[LAST]) > TOLERANCE
+        status_off = d[STATUS] is not None and d[STATUS] != acc.status
+        if balance_off or status_off:
+            kind = "balance_and_status" if balance_off and status_off else ("balance" if balance_off else "status")
+            found.append({"account_number": acc.account_number, "kind": kind,
+                          "book_balance": acc.balance, "log_balance": d[LAST],
+                          "book_status": acc.status, "log_status": d[STATUS]})
+    for number in sorted(set(derived) - in_book):
+        d = derived[number]
+        found.append({"account_number": number, "kind": "missing_from_book",
+                      "book_balance": None, "log_balance": d[LAST],
+                      "book_status": None, "log_status": d[STATUS]})
+    return found
+
+def summarize(derived, discrepancies):
+    kinds = {}
+    for d in discrepancies:
+        kinds[d["kind"]] = kinds.get(d["kind"], 0) + 1
+    return {
+        "log_entries": sum(s[ENTRIES] for s in derived.values()),
+        "accounts_in_log": len(derived),
+        # entries whose balance_after doesn't follow from the previous entry's
+        "log_breaks": sum(s[BREAKS] for s in derived.values()),
+        "discrepancies": len(discrepancies),
+        "by_kind": kinds,
+    }
+
+def write_report(filename, discrepancies):
+    with open(filename, "w", newline="") as f:
+        writer = csv.DictWriter(f, fieldnames=REPORT_FIELDS)
+        writer.writeheader()
+        writer.writerows(discrepancies)
+
+def main():
+    parser = argparse.ArgumentParser(description="Replay the transaction log and reconcile it with the book")
+    parser.add_argument("--accounts", default="accounts.csv", help="accounts.csv, a sharded directory or bank.db")
+    parser.add_argument("--log", default="transactions.log")
+    parser.add_argument("--segments", help="day-segmented log directory (instead of --log)")
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument("--report", help="write discrepancies to this CSV")
+    parser.add_argument("--repair", action="store_true", help="set book balances/statuses to the log's")
+    args = parser.parse_args()
+
+    import transactions as txn
+    from bank import Bank
+    if args.segments:
+        txn.enable_segmented_log(args.segments)
+    else:
+        txn.LOGFILE = args.log
+    bank = Bank(accounts_file=args.accounts)
+    result = bank.reconcile(workers=args.workers, repair=args.repair, report_file=args.report)
+    for key in ("log_entries", "accounts_in_log", "log_breaks", "discrepancies", "repaired"):
+        print(f"{key:16} {result.get(key, 0)}")
+    for kind, count in sorted(result["by_kind"].items()):
+        print(f"  {kind:22} {count}")
+    if args.repair:
+        bank.autosave_and_exit()
+
+if __name__ == "__main__":
+    main()
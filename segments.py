@@ -0,0 +1,272 @@
+# segments.py
+# Day-segmented transaction log: <dir>/2026-10-18.log holds the entries logged on that
+# day, in the same line format as transactions.log. Once a day is over its segment is
+# sealed in the background:
+#   <day>.balances     last balance_after of every account the day touched (marshal)
+#   <day>.checkpoint   every CHECKPOINT_EVERY days: each account's balance as of that day
+#   <day>.manifest     time range, line count and sorted accounts touched (JSON; written
+#                      last, so its presence means the segment is sealed)
+# Readers use the manifests to open only the segments a query can hit, and sealed
+# segments older than compress_after_days are gzipped (reads are transparent).
+#
+#   python segments.py split transactions.log transactions.d
+#   GDB_LOG_SEGMENTS=transactions.d python main.py
+import argparse
+import datetime
+import gzip
+import json
+import marshal
+import os
+import shutil
+import threading
+from bisect import bisect_left
+from typing import Dict, Optional
+
+from transactions import _parse_line
+
+SEGMENT_SUFFIX = ".log"
+CHECKPOINT_EVERY = 7  # sealed days between full balance checkpoints
+
+def day_of(timestamp):
+    return timestamp[:10]
+
+def _write_atomic(path, data: bytes):
+    tmp = path + ".tmp"
+    with open(tmp, "wb") as f:
+        f.write(data)
+    os.replace(tmp, path)
+
+def _in_range(timestamp, start, end):
+    # start/end are "YYYY-MM-DD" or full timestamps; both ends inclusive
+    if start is not None and timestamp < start:
+        return False
+    if end is not None and timestamp[:len(end)] > end:
+        return False
+    return True
+
+class SegmentedLog:
+    def __init__(self, dirname, compress_after_days=None):
+        self.dirname = dirname
+        self.compress_after_days = compress_after_days
+        self.day = None  # day of the segment currently written to
+        os.makedirs(dirname, exist_ok=True)
+        self._manifests: Dict[str, dict] = {}  # sealed day -> manifest, read once
+        self._seal_lock = threading.Lock()
+        self._worker = None
+
+    # ---------- layout ----------
+    def _path(self, day, suffix):
+        return os.path.join(self.dirname, day + suffix)
+
+    def segment_path(self, day):
+        return self._path(day, SEGMENT_SUFFIX)
+
+    def days(self):
+        found = set()
+        for name in os.listdir(self.dirname):
+            if name.endswith(SEGMENT_SUFFIX) or name.endswith(SEGMENT_SUFFIX + ".gz"):
+                found.add(name.split(".", 1)[0])
+        return sorted(found)
+
+    def files(self):
+        # segment files in day order (gzipped ones under their .gz name)
+        paths = []
+        for day in self.days():
+            path = self.segment_path(day)
+            paths.append(path if os.path.exists(path) else path + ".gz")
+        return paths
+
+    def _open(self, day):
+        try:
+            return open(self.segment_path(day), "r")
+        except FileNotFoundError:
+            pass
+        try:
+            return gzip.open(self.segment_path(day) + ".gz", "rt")
+        except FileNotFoundError:
+            return None
+
+    def manifest(self, day) -> Optional[dict]:
+        manifest = self._manifests.get(day)
+        if manifest is None:
+            try:
+                with open(self._path(day, ".manifest"), "r") as f:
+                    manifest = json.load(f)
+            except FileNotFoundError:
+                return None
+            self._manifests[day] = manifest
+        return manifest
+
+    @staticmethod
+    def touches(manifest, account_number):
+        accounts = manifest["accounts"]
+        i = bisect_left(accounts, account_number)
+        return i < len(accounts) and accounts[i] == account_number
+
+    # ---------- reading ----------
+    def read_segment(self, day):
+        f = self._open(day)
+        if f is None:
+            return
+        with f:
+            for line in f:
+                t = _parse_line(line)
+                if t is not None:
+                    yield t
+
+    def read(self, start=None, end=None, account_number=None):
+        # entries in log order, limited to [start, end] and/or one account; only the
+        # segments whose day and manifest can match are opened
+        for day in self.days():
+            if (start is not None and day < day_of(start)) or (end is not None and day > day_of(end)):
+                continue
+            manifest = self.manifest(day)
+            if manifest is not None and account_number is not None and not self.touches(manifest, account_number):
+                continue
+            for t in self.read_segment(day):
+                if account_number is not None and t["account_number"] != account_number:
+                    continue
+                if _in_range(t["timestamp"], start, end):
+                    yield t
+
+    def _load_marshal(self, day, suffix):
+        try:
+            with open(self._path(day, suffix), "rb") as f:
+                return marshal.load(f)
+        except FileNotFoundError:
+            return None
+
+    def balance_at(self, account_number, day):
+        # balance_after of the account's last entry on or before day (None if it has none):
+        # walks back from day through segments that touch the account, stopping at the
+        # nearest checkpoint
+        for d in reversed([d for d in self.days() if d <= day]):
+            manifest = self.manifest(d)
+            if manifest is None:
+                last = None
+                for t in self.read_segment(d):
+                    if t["account_number"] == account_number:
+                        last = t["balance_after"]
+                if last is not None:
+                    return last
+                continue
+            if self.touches(manifest, account_number):
+                return self._load_marshal(d, ".balances")[account_number]
+            if manifest.get("checkpoint"):
+                return self._load_marshal(d, ".checkpoint").get(account_number)
+        return None
+
+    # ---------- sealing and compression (background) ----------
+    def seal(self, day):
+        first = last = None
+        lines = 0
+        balances = {}
+        for t in self.read_segment(day):
+            first = first or t["timestamp"]
+            last = t["timestamp"]
+            lines += 1
+            balances[t["account_number"]] = t["balance_after"]
+        _write_atomic(self._path(day, ".balances"), marshal.dumps(balances))
+        manifest = {"day": day, "first": first, "last": last, "lines": lines,
+                    "accounts": sorted(balances), "checkpoint": False}
+        if datetime.date.fromisoformat(day).toordinal() % CHECKPOINT_EVERY == 0:
+            _write_atomic(self._path(day, ".checkpoint"), marshal.dumps(self._checkpoint_through(day)))
+            manifest["checkpoint"] = True
+        _write_atomic(self._path(day, ".manifest"), json.dumps(manifest).encode())
+        self._manifests[day] = manifest
+
+    def _checkpoint_through(self, day):
+        # previous checkpoint plus the per-day balances sealed since, ending with day
+        earlier = [d for d in self.days() if d <= day]
+        balances, since = {}, []
+        for d in reversed(earlier):
+            manifest = self.manifest(d) if d != day else {"checkpoint": False}
+            if manifest is not None and manifest.get("checkpoint"):
+                balances = self._load_marshal(d, ".checkpoint")
+                break
+            since.append(d)
+        for d in reversed(since):
+            balances.update(self._load_marshal(d, ".balances") or {})
+        return balances
+
+    def compress(self, day):
+        path = self.segment_path(day)
+        with open(path, "rb") as src, gzip.open(path + ".gz.tmp", "wb") as dst:
+            shutil.copyfileobj(src, dst)
+        os.replace(path + ".gz.tmp", path + ".gz")
+        os.remove(path)
+
+    def maintain(self, today):
+        # seal every finished day in order, then compress the old ones
+        with self._seal_lock:
+            for day in self.days():
+                if day >= today:
+                    break
+                if self.manifest(day) is None:
+                    self.seal(day)
+            if self.compress_after_days is None:
+                return
+            cutoff = (datetime.date.fromisoformat(today)
+                      - datetime.timedelta(days=self.compress_after_days)).isoformat()
+            for day in self.days():
+                if day < cutoff and os.path.exists(self.segment_path(day)):
+                    self.compress(day)
+
+    def maintain_in_background(self, today):
+        # the writer never waits on sealing or compression
+        worker = threading.Thread(target=self.maintain, args=(today,), daemon=True)
+        worker.start()
+        self._worker = worker
+        return worker
+
+    def wait(self):
+        if self._worker is not None:
+            self._worker.join()
+
+    def clear(self):
+        self.wait()
+        with self._seal_lock:
+            for name in os.listdir(self.dirname):
+                os.remove(os.path.join(self.dirname, name))
+            self._manifests.clear()
+
+def split(logfile, dirname):
+    # one-off migration: splits an existing transactions.log into day segments
+    log = SegmentedLog(dirname)
+    out, day, lines = None, None, 0
+    with open(logfile, "r") as f:
+        for line in f:
+            t = _parse_line(line)
+            if t is None:
+                continue
+            if day_of(t["timestamp"]) != day:
+                if out is not None:
+                    out.close()
+                day = day_of(t["timestamp"])
+                out = open(log.segment_path(day), "a")
+            out.write(line if line.endswith("\n") else line + "\n")
+            lines += 1
+    if out is not None:
+        out.close()
+    log.maintain(datetime.date.today().isoformat())
+    return lines, len(log.days())
+
+def main():
+    parser = argparse.ArgumentParser(description="Day-segmented transaction log tools")
+    sub = parser.add_subparsers(dest="command", required=True)
+    s = sub.add_parser("split", help="split transactions.log into day segments")
+    s.add_argument("logfile")
+    s.add_argument("dirname")
+    c = sub.add_parser("compress", help="seal finished days and gzip segments older than --days")
+    c.add_argument("dirname")
+    c.add_argument("--days", type=int, default=7)
+    args = parser.parse_args()
+    if args.command == "split":
+        lines, days = split(args.logfile, args.dirname)
+        print(f"Split {lines} entries into {days} segments under {args.dirname}")
+    else:
+        SegmentedLog(args.dirname, compress_after_days=args.days).maintain(datetime.date.today().isoformat())
+        print("Done.")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,124 @@
+# server.py
+# asyncio front-end: newline-delimited JSON over TCP, one request object per line and
+# one response line per request, in order. Clients may pipeline as many requests as
+# they like; a connection's requests are handled in order, and reading stops while its
+# responses are not being consumed (back-pressure through writer.drain()).
+#
+#   python server.py --host 127.0.0.1 --port 8765
+#   echo '{"id": 1, "op": "balance", "account": 1001}' | nc 127.0.0.1 8765
+import argparse
+import asyncio
+import json
+import signal
+
+import api
+import limits
+import metrics
+import transactions as txn
+from bank import Bank
+
+MAX_LINE = 1 << 20  # longest accepted request line, in bytes
+
+class BankServer:
+    def __init__(self, bank: Bank, host="127.0.0.1", port=8765):
+        self.bank = bank
+        self.host = host
+        self.port = port
+        self._server = None
+        self._connections = set()
+        self._busy = set()  # connections in the middle of a request
+        self._stopping = None
+
+    async def start(self):
+        self._stopping = asyncio.Event()
+        self._server = await asyncio.start_server(self._serve_client, self.host, self.port, limit=MAX_LINE)
+        self.port = self._server.sockets[0].getsockname()[1]
+        return self
+
+    async def _dispatch(self, req):
+        if isinstance(req, dict) and req.get("op") in api.SLOW_OPERATIONS:
+            # file/whole-book work runs on a thread so other clients keep being served
+            return await asyncio.get_running_loop().run_in_executor(None, api.handle, self.bank, req)
+        return api.handle(self.bank, req)
+
+    async def _serve_client(self, reader, writer):
+        task = asyncio.current_task()
+        self._connections.add(task)
+        try:
+            while not self._stopping.is_set():
+                try:
+                    line = await reader.readline()
+                except (asyncio.LimitOverrunError, ValueError):
+                    writer.write(b'{"ok": false, "error": "Request line too long.", "error_type": "ValueError"}\n')
+                    break
+                if not line:
+                    break
+                if not line.strip():
+                    continue
+                self._busy.add(task)
+                try:
+                    req = api.loads(line)
+                except ValueError:
+                    response = {"ok": False, "error": "Invalid JSON.", "error_type": "ValueError"}
+                else:
+                    response = await self._dispatch(req)
+                writer.write(json.dumps(response).encode() + b"\n")
+                await writer.drain()
+                self._busy.discard(task)
+        except (ConnectionError, asyncio.CancelledError):
+            pass
+        finally:
+            self._busy.discard(task)
+            self._connections.discard(task)
+            writer.close()
+
+    async def stop(self, grace=5.0):
+        # stop accepting, let in-flight requests finish, then persist state the way
+        # autosave_and_exit does
+        self._stopping.set()
+        self._server.close()
+        await self._server.wait_closed()
+        for task in self._connections - self._busy:
+            # idle clients are just waiting for their next line
+            task.cancel()
+        if self._connections:
+            _, pending = await asyncio.wait(set(self._connections), timeout=grace)
+            for task in pending:
+                task.cancel()
+        self.bank.autosave_and_exit()
+
+    async def serve_until_signalled(self):
+        loop = asyncio.get_running_loop()
+        stop = asyncio.Event()
+        for sig in (signal.SIGINT, signal.SIGTERM):
+            try:
+                loop.add_signal_handler(sig, stop.set)
+            except (NotImplementedError, RuntimeError):
+                pass
+        print(f"Global Digital Bank listening on {self.host}:{self.port}")
+        await stop.wait()
+        print("Shutting down, saving state...")
+        await self.stop()
+
+async def _main(args):
+    bank = Bank(accounts_file=args.accounts, thread_safe=True,
+                velocity_limits=limits.load_config(args.limits) if args.limits else None)
+    server = await BankServer(bank, args.host, args.port).start()
+    await server.serve_until_signalled()
+
+def main():
+    parser = argparse.ArgumentParser(description="Global Digital Bank JSON-over-TCP server")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--accounts", default="accounts.csv")
+    parser.add_argument("--log-mode", default=txn.FLUSH_BATCH, choices=txn.LOG_MODES)
+    parser.add_argument("--limits", help="JSON file of per-account-type velocity limits (see limits.py)")
+    parser.add_argument("--metrics", action="store_true", help="record per-operation latency (op \"metrics\")")
+    args = parser.parse_args()
+    txn.configure_log(args.log_mode)
+    if args.metrics:
+        metrics.enable()
+    asyncio.run(_main(args))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,104 @@
+# sharding.py
+# Sharded account storage: a directory of N CSV files (same columns as accounts.csv),
+# account k living in shard k % N, plus a small manifest. Shards load and save in
+# parallel in a process pool, and a save only rewrites the shards that changed.
+#
+#   python sharding.py migrate accounts.csv accounts_shards --shards 16
+import argparse
+import json
+import os
+from concurrent.futures import ProcessPoolExecutor
+from typing import Iterable, List, Optional
+
+from account import Account
+from storage import load_accounts_from_file, save_rows_to_file
+
+MANIFEST = "manifest.json"
+INLINE_BELOW_BYTES = 4 << 20  # books smaller than this load/save without a pool
+
+def is_sharded(path):
+    return os.path.isfile(os.path.join(path, MANIFEST))
+
+def shard_path(dirname, shard):
+    return os.path.join(dirname, f"shard-{shard:03d}.csv")
+
+def shard_of(account_number, shards):
+    return account_number % shards
+
+def read_manifest(dirname):
+    with open(os.path.join(dirname, MANIFEST), "r") as f:
+        return json.load(f)
+
+def create_layout(dirname, shards):
+    if shards < 1:
+        raise ValueError("Number of shards must be at least 1.")
+    os.makedirs(dirname, exist_ok=True)
+    with open(os.path.join(dirname, MANIFEST), "w") as f:
+        json.dump({"shards": shards, "scheme": "account_number % shards"}, f)
+
+def _save_shard(path, rows):
+    # runs in a worker: rows are Account.to_dict() dicts, cheaper to pickle than Accounts
+    save_rows_to_file(rows, filename=path)
+    return path
+
+def _pool_size(dirname, workers):
+    if workers is not None:
+        return workers
+    total = sum(os.path.getsize(os.path.join(dirname, f)) for f in os.listdir(dirname))
+    return 0 if total < INLINE_BELOW_BYTES else (os.cpu_count() or 1)
+
+def load_sharded(dirname, workers=None) -> List[Account]:
+    shards = read_manifest(dirname)["shards"]
+    paths = [shard_path(dirname, i) for i in range(shards)]
+    workers = _pool_size(dirname, workers)
+    if workers == 0:
+        parts = [load_accounts_from_file(p) for p in paths]
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            parts = list(pool.map(load_accounts_from_file, paths))
+    accounts = [acc for part in parts for acc in part]
+    # shards interleave account numbers; merge back into account-number order
+    accounts.sort(key=lambda a: a.account_number)
+    return accounts
+
+def save_sharded(accounts: Iterable[Account], dirname, dirty: Optional[Iterable[int]] = None, workers=None):
+    # rewrites the shards listed in dirty (all shards when dirty is None)
+    shards = read_manifest(dirname)["shards"]
+    targets = set(range(shards)) if dirty is None else set(dirty)
+    if not targets:
+        return []
+    rows = {i: [] for i in targets}
+    for acc in accounts:
+        bucket = rows.get(acc.account_number % shards)
+        if bucket is not None:
+            bucket.append(acc.to_dict())
+    workers = _pool_size(dirname, workers)
+    jobs = [(shard_path(dirname, i), rows[i]) for i in sorted(targets)]
+    if workers == 0 or len(jobs) == 1:
+        return [_save_shard(path, r) for path, r in jobs]
+    with ProcessPoolExecutor(max_workers=min(workers, len(jobs))) as pool:
+        return list(pool.map(_save_shard, *zip(*jobs)))
+
+def migrate(csv_file, dirname, shards, workers=None):
+    # splits an existing accounts.csv into a sharded directory; the CSV is left as is
+    if is_sharded(dirname):
+        raise FileExistsError(f"{dirname} already holds a sharded book.")
+    accounts = load_accounts_from_file(csv_file)
+    create_layout(dirname, shards)
+    save_sharded(accounts, dirname, workers=workers)
+    return len(accounts)
+
+def main():
+    parser = argparse.ArgumentParser(description="Sharded account storage tools")
+    sub = parser.add_subparsers(dest="command", required=True)
+    m = sub.add_parser("migrate", help="split accounts.csv into shards")
+    m.add_argument("csv_file")
+    m.add_argument("dirname")
+    m.add_argument("--shards", type=int, default=16)
+    m.add_argument("--workers", type=int, default=None)
+    args = parser.parse_args()
+    n = migrate(args.csv_file, args.dirname, args.shards, args.workers)
+    print(f"Migrated {n} accounts into {args.shards} shards under {args.dirname}")
+
+if __name__ == "__main__":
+    main()
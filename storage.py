@@ -1,22 +1,41 @@
 # storage.py
 import csv
+import marshal
+import os
+import zlib
+from contextlib import contextmanager
 from account import Account
-from typing import List
+from typing import List, Optional, Tuple
 
 FIELDNAMES = ["account_number", "name", "age", "balance", "type", "status", "pin"]
 
+def account_row(acc: Account):
+    # the Account.to_dict() values as a FIELDNAMES-ordered tuple, without building a dict
+    return (acc.account_number, acc.name, acc.age, f"{acc.balance:.2f}", acc.account_type, acc.status,
+            "" if acc.pin is None else acc.pin)
+
 def save_accounts_to_file(accounts: List[Account], filename="accounts.csv"):
-    if not accounts:
-        # create empty CSV with header
-        with open(filename, "w", newline="") as f:
-            writer = csv.DictWriter(f, fieldnames=FIELDNAMES)
-            writer.writeheader()
-        return
-    with open(filename, "w", newline="") as f:
+    with _atomic_csv(filename) as f:
+        writer = csv.writer(f)
+        writer.writerow(FIELDNAMES)
+        writer.writerows(map(account_row, accounts))
+
+def save_rows_to_file(rows, filename="accounts.csv"):
+    # rows are Account.to_dict() dicts
+    with _atomic_csv(filename) as f:
         writer = csv.DictWriter(f, fieldnames=FIELDNAMES)
         writer.writeheader()
-        for acc in accounts:
-            writer.writerow(acc.to_dict())
+        writer.writerows(rows)
+
+@contextmanager
+def _atomic_csv(filename):
+    # written to a temp file and swapped in, so a crash never leaves a half-written CSV
+    tmp = filename + ".tmp"
+    with open(tmp, "w", newline="") as f:
+        yield f
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp, filename)
 
 def load_accounts_from_file(filename="accounts.csv"):
     accounts = []
@@ -32,3 +51,67 @@ def load_accounts_from_file(filename="accounts.csv"):
         # return empty list
         pass
     return accounts
+
+# ---------- binary snapshot cache ----------
+# accounts.csv.cache holds the same rows as accounts.csv in marshal form, plus the next
+# free account number, so startup skips CSV parsing. It is only trusted while the CSV
+# still has the size and mtime recorded in it and its payload checksum matches;
+# otherwise the CSV is parsed and the cache rebuilt.
+CACHE_MAGIC = b"GDBSNAP1"
+CACHE_FIELDS = ("account_number", "name", "age", "balance", "account_type", "status", "pin")
+
+def cache_path(accounts_file):
+    return accounts_file + ".cache"
+
+def _csv_stamp(filename):
+    st = os.stat(filename)
+    return st.st_size, st.st_mtime_ns
+
+def save_snapshot_cache(accounts: List[Account], filename="accounts.csv", next_account: Optional[int] = None):
+    # call right after accounts.csv itself was written
+    try:
+        size, mtime_ns = _csv_stamp(filename)
+    except FileNotFoundError:
+        return
+    rows = [(a.account_number, a.name, a.age, a.balance, a.account_type, a.status, a.pin) for a in accounts]
+    payload = marshal.dumps((size, mtime_ns, next_account, rows))
+    tmp = cache_path(filename) + ".tmp"
+    with open(tmp, "wb") as f:
+        f.write(CACHE_MAGIC)
+        f.write(zlib.crc32(payload).to_bytes(4, "little"))
+        f.write(payload)
+    os.replace(tmp, cache_path(filename))
+
+def _read_snapshot_cache(filename):
+    try:
+        with open(cache_path(filename), "rb") as f:
+            data = f.read()
+        stamp = _csv_stamp(filename)
+    except FileNotFoundError:
+        return None
+    if data[:8] != CACHE_MAGIC:
+        return None
+    payload = memoryview(data)[12:]
+    if zlib.crc32(payload) != int.from_bytes(data[8:12], "little"):
+        return None
+    try:
+        size, mtime_ns, next_account, rows = marshal.loads(payload)
+    except (EOFError, ValueError, TypeError):
+        return None
+    if (size, mtime_ns) != stamp:
+        return None
+    return rows, next_account
+
+def load_accounts_cached(filename="accounts.csv") -> Tuple[List[Account], Optional[int]]:
+    # returns (accounts, next free account number or None if unknown); falls back to
+    # the CSV and refreshes the cache when the cache is missing or stale
+    cached = _read_snapshot_cache(filename)
+    if cached is not None:
+        rows, next_account = cached
+        return [Account(*row) for row in rows], next_account
+    accounts = load_accounts_from_file(filename)
+    next_account = max((a.account_number for a in accounts), default=None)
+    if next_account is not None:
+        next_account += 1
+        save_snapshot_cache(accounts, filename, next_account)
+    return accounts, next_account
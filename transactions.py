@@ -1,47 +1,354 @@
 # transactions.py
+import atexit
 import datetime
 import os
+import threading
+import time
 
 LOGFILE = "transactions.log"
+DEBIT_OPERATIONS = ("withdraw", "transfer-debit")
+
+# durability modes for LogWriter
+FLUSH_ALWAYS = "always"  # write every entry through to the OS immediately
+FLUSH_BATCH = "batch"    # flush every batch_size entries or interval_ms
+FLUSH_FSYNC = "fsync"    # like batch, plus fsync on every group commit
+LOG_MODES = (FLUSH_ALWAYS, FLUSH_BATCH, FLUSH_FSYNC)
+
+class LogWriter:
+    # long-lived append handle that groups log entries into fewer writes
+    def __init__(self, filename, mode=FLUSH_ALWAYS, batch_size=256, interval_ms=50):
+        if mode not in LOG_MODES:
+            raise ValueError(f"Log mode must be one of {LOG_MODES}.")
+        self.filename = filename
+        self.mode = mode
+        self.batch_size = max(1, int(batch_size))
+        self.interval = max(0, interval_ms) / 1000.0
+        self._f = open(filename, "a")
+        self._buf = []
+        self._last_flush = time.monotonic()
+        self._lock = threading.Lock()
+        self._closed = False
+        self._flusher = None
+        if mode != FLUSH_ALWAYS and self.interval:
+            # flushes a quiet buffer so entries never sit longer than interval_ms
+            self._flusher = threading.Thread(target=self._flush_periodically, daemon=True)
+            self._flusher.start()
+
+    def write(self, entry):
+        return self.write_many((entry,))
+
+    def write_many(self, entries):
+        # False (nothing written) once closed: a rotation or close_log can close the writer
+        # between a caller's _get_writer() and this call, see _write_entries
+        with self._lock:
+            if self._closed:
+                return False
+            self._buf.extend(entries)
+            self._maybe_flush()
+            return True
+
+    def _maybe_flush(self):
+        if (self.mode == FLUSH_ALWAYS or len(self._buf) >= self.batch_size
+                or time.monotonic() - self._last_flush >= self.interval):
+            self._flush_locked()
+
+    def _flush_locked(self):
+        if self._buf:
+            self._f.write("".join(self._buf))
+            self._buf.clear()
+        self._f.flush()
+        if self.mode == FLUSH_FSYNC:
+            os.fsync(self._f.fileno())
+        self._last_flush = time.monotonic()
+
+    def _flush_periodically(self):
+        while not self._closed:
+            time.sleep(self.interval)
+            with self._lock:
+                if self._closed:
+                    break
+                if self._buf:
+                    self._flush_locked()
+
+    def flush(self):
+        with self._lock:
+            if not self._closed:
+                self._flush_locked()
+
+    def close(self):
+        with self._lock:
+            if self._closed:
+                return
+            self._flush_locked()
+            self._closed = True
+            self._f.close()
+
+_writer = None
+_module_lock = threading.RLock()  # guards swapping the writer / binary log, and binary appends
+_binary_log = None  # optional binlog.BinaryLog mirror, see enable_binary_log()
+_segments = None  # optional segments.SegmentedLog, see enable_segmented_log()
+_sql_log = None  # optional backends.SqliteBackend mirror, see enable_sql_log()
+_writer_options = {"mode": FLUSH_ALWAYS, "batch_size": 256, "interval_ms": 50}
+
+def configure_log(mode=FLUSH_ALWAYS, batch_size=256, interval_ms=50):
+    # takes effect for subsequent entries; anything buffered so far is flushed first
+    if mode not in LOG_MODES:
+        raise ValueError(f"Log mode must be one of {LOG_MODES}.")
+    close_log()
+    _writer_options.update(mode=mode, batch_size=batch_size, interval_ms=interval_ms)
+
+def _get_writer():
+    global _writer
+    writer = _writer
+    if writer is None or writer.filename != LOGFILE or writer._closed:
+        with _module_lock:
+            if _writer is None or _writer.filename != LOGFILE or _writer._closed:
+                if _writer is not None:
+                    _writer.close()
+                _writer = LogWriter(LOGFILE, **_writer_options)
+            writer = _writer
+    return writer
+
+def _write_entries(entries):
+    # retried on the current writer if the one fetched was closed in the meantime
+    while not _get_writer().write_many(entries):
+        pass
+
+def flush_log():
+    if _writer is not None:
+        _writer.flush()
+
+def close_log():
+    global _writer
+    if _writer is not None:
+        _writer.close()
+        _writer = None
+    if _binary_log is not None:
+        _binary_log.flush()
+
+def enable_binary_log(filename="transactions.bin"):
+    # mirror every entry into a fixed-width binary log with a per-account index,
+    # which serves paginated history without scanning the text log
+    global _binary_log
+    from binlog import BinaryLog
+    disable_binary_log()
+    _binary_log = BinaryLog(filename)
+    return _binary_log
+
+def disable_binary_log():
+    global _binary_log
+    if _binary_log is not None:
+        _binary_log.close()
+        _binary_log = None
+
+def enable_sql_log(backend):
+    # mirror every entry into the transactions table of an SQLite book (see backends.py),
+    # whose per-account index then serves history, date ranges included
+    global _sql_log
+    _sql_log = backend
+    return backend
+
+def disable_sql_log():
+    global _sql_log
+    _sql_log = None
+
+def enable_segmented_log(dirname="transactions.d", compress_after_days=None):
+    # log into one file per day under dirname instead of one ever-growing LOGFILE;
+    # LOGFILE then always names today's segment (see segments.py)
+    global _segments
+    from segments import SegmentedLog
+    with _module_lock:
+        close_log()
+        _segments = SegmentedLog(dirname, compress_after_days)
+        _rotate(datetime.date.today().isoformat())
+    return _segments
+
+def disable_segmented_log(logfile="transactions.log"):
+    global _segments, LOGFILE
+    with _module_lock:
+        close_log()
+        if _segments is not None:
+            _segments.wait()
+        _segments = None
+        LOGFILE = logfile
+
+def _rotate(day):
+    # switch writing to day's segment; the finished ones are sealed off the hot path
+    global LOGFILE
+    with _module_lock:
+        if _segments.day == day:
+            return
+        close_log()
+        _segments.day = day
+        LOGFILE = _segments.segment_path(day)
+        _segments.maintain_in_background(day)
+
+atexit.register(close_log)
 
 def log_transaction(account_number, operation, amount, balance_after):
     timestamp = datetime.datetime.now().isoformat(sep=" ", timespec="seconds")
+    if _segments is not None and _segments.day != timestamp[:10]:
+        _rotate(timestamp[:10])
     entry = f"{timestamp},{account_number},{operation},{amount:.2f},{balance_after:.2f}\n"
-    with open(LOGFILE, "a") as f:
-        f.write(entry)
+    _write_entries((entry,))
+    if _binary_log is not None:
+        with _module_lock:
+            _binary_log.append(timestamp, account_number, operation, amount, balance_after)
+    if _sql_log is not None:
+        _sql_log.append_transactions([(timestamp, account_number, operation, amount, balance_after)])
+
+def log_transactions(entries):
+    # bulk form of log_transaction: entries are (account_number, operation, amount, balance_after)
+    if not entries:
+        return
+    timestamp = datetime.datetime.now().isoformat(sep=" ", timespec="seconds")
+    if _segments is not None and _segments.day != timestamp[:10]:
+        _rotate(timestamp[:10])
+    _write_entries([f"{timestamp},{acc},{op},{amount:.2f},{bal:.2f}\n" for acc, op, amount, bal in entries])
+    if _binary_log is not None:
+        with _module_lock:
+            _binary_log.append_many([(timestamp, acc, op, amount, bal) for acc, op, amount, bal in entries])
+    if _sql_log is not None:
+        _sql_log.append_transactions([(timestamp, acc, op, amount, bal) for acc, op, amount, bal in entries])
+
+def _epoch_path(log_path=None):
+    # next to the log (or the segment directory), so clearing the log leaves it alone
+    if log_path is None:
+        log_path = _segments.dirname if _segments is not None else LOGFILE
+    return log_path.rstrip(os.sep) + ".epoch"
+
+def log_epoch(log_path=None):
+    # bumped by every clear_log, so readers holding byte offsets (cdc.py) can tell a
+    # truncated-and-regrown log from one that only grew. log_path names another log file
+    # or segment directory than this process's own (read-only readers).
+    try:
+        with open(_epoch_path(log_path), "r") as f:
+            return int(f.read().strip() or 0)
+    except (FileNotFoundError, ValueError):
+        return 0
+
+def clear_log():
+    close_log()
+    if _segments is not None:
+        _segments.clear()
+    open(LOGFILE, "w").close()
+    if _binary_log is not None:
+        _binary_log.truncate()
+    if _sql_log is not None:
+        _sql_log.clear_transactions()
+    # after truncating, so nobody resumes from 0 into the old entries
+    epoch = log_epoch() + 1
+    with open(_epoch_path() + ".tmp", "w") as f:
+        f.write(str(epoch))
+    os.replace(_epoch_path() + ".tmp", _epoch_path())
+
+def _parse_line(line):
+    parts = line.strip().split(",")
+    if len(parts) == 6:
+        # older entries written through the logging module carry ",<millis>" after the timestamp
+        parts = [parts[0]] + parts[2:]
+    if len(parts) != 5:
+        return None
+    timestamp, acc_num, operation, amount, balance = parts
+    try:
+        return {
+            "timestamp": timestamp,
+            "account_number": int(acc_num),
+            "operation": operation,
+            "amount": float(amount),
+            "balance_after": float(balance)
+        }
+    except ValueError:
+        return None
+
+def _read_lines_reversed(filename, block_size=64 * 1024):
+    # yields lines from the end of the file backwards without reading the whole file
+    with open(filename, "rb") as f:
+        f.seek(0, os.SEEK_END)
+        pos = f.tell()
+        tail = b""
+        while pos > 0:
+            step = min(block_size, pos)
+            pos -= step
+            f.seek(pos)
+            chunk = f.read(step) + tail
+            lines = chunk.split(b"\n")
+            tail = lines.pop(0)
+            for line in reversed(lines):
+                if line.strip():
+                    yield line.decode("utf-8", errors="replace")
+        if tail.strip():
+            yield tail.decode("utf-8", errors="replace")
 
 def read_transactions():
+    flush_log()
+    if _segments is not None:
+        return list(_segments.read())
     if not os.path.exists(LOGFILE):
         return []
     with open(LOGFILE, "r") as f:
         lines = [l.strip() for l in f if l.strip()]
-    # parse into tuple: (timestamp, account_number, operation, amount, balance_after)
+    # parse into dicts: timestamp, account_number, operation, amount, balance_after
     parsed = []
     for line in lines:
-        parts = line.split(",")
-        if len(parts) < 5:
-            continue
-        timestamp, acc_num, operation, amount, balance = parts
-        parsed.append({
-            "timestamp": timestamp,
-            "account_number": int(acc_num),
-            "operation": operation,
-            "amount": float(amount),
-            "balance_after": float(balance)
-        })
+        t = _parse_line(line)
+        if t is not None:
+            parsed.append(t)
     return parsed
 
+def log_files():
+    # every file holding log entries, oldest first
+    flush_log()
+    if _segments is not None:
+        return _segments.files()
+    return [LOGFILE]
+
 def get_account_transactions(account_number):
+    if _segments is not None:
+        flush_log()
+        return list(_segments.read(account_number=int(account_number)))
     all_tx = read_transactions()
     return [t for t in all_tx if t["account_number"] == int(account_number)]
 
-def todays_withdrawals_total(account_number):
-    import datetime
-    today = datetime.date.today().isoformat()
-    txs = get_account_transactions(account_number)
-    total = 0.0
-    for t in txs:
-        if t["operation"].lower() in ("withdraw", "transfer-debit"):
-            if t["timestamp"].split(" ")[0] == today:
-                total += t["amount"]
-    return total
+def get_transactions_between(start=None, end=None, account_number=None):
+    # start/end are "YYYY-MM-DD" dates or full timestamps, both inclusive. With a
+    # segmented log only the segments in range (and touching the account) are read.
+    if account_number is not None:
+        account_number = int(account_number)
+    if _segments is not None:
+        flush_log()
+        return list(_segments.read(start, end, account_number))
+    txs = get_account_transactions(account_number) if account_number is not None else read_transactions()
+    return [t for t in txs
+            if (start is None or t["timestamp"] >= start)
+            and (end is None or t["timestamp"][:len(end)] <= end)]
+
+def get_account_transactions_page(account_number, offset=0, limit=None, start=None, end=None):
+    if _sql_log is not None:
+        return _sql_log.history(int(account_number), offset, limit, start, end)
+    if start is not None or end is not None:
+        txs = get_transactions_between(start, end, account_number)
+    elif _binary_log is not None:
+        return _binary_log.history(account_number, offset, limit)
+    else:
+        txs = get_account_transactions(account_number)
+    return txs[offset:] if limit is None else txs[offset:offset + limit]
+
+def read_recent(since):
+    # entries logged at or after the timestamp since, newest first for a single log file
+    # (read backwards, stopping at the first older entry) and oldest first for segments
+    flush_log()
+    if _segments is not None:
+        return list(_segments.read(start=since))
+    recent = []
+    if not os.path.exists(LOGFILE):
+        return recent
+    for line in _read_lines_reversed(LOGFILE):
+        t = _parse_line(line)
+        if t is None:
+            continue
+        if t["timestamp"] < since:
+            # the log is append-only, everything further back is older
+            break
+        recent.append(t)
+    return recent